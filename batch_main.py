@@ -0,0 +1,101 @@
+import argparse
+import sys
+import os
+
+# Add src to the beginning of sys.path to ensure local imports override any installed package
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "src"))
+
+from synthflow.core.config_parser import ConfigParser
+from synthflow.core.batch_runner import BatchRunner, load_dataset
+from synthflow.core.blob_store import DEFAULT_THRESHOLD, BlobStore
+from synthflow.core.simulation import Simulator, latencies_from_audit
+from synthflow.core.browser_manager import BrowserContextManager
+from synthflow.utils.logger import setup_logger
+
+# Import Components
+from synthflow.components.element_locator import ElementLocator
+from synthflow.components.operation_executor import OperationExecutor
+from synthflow.components.review_service import ReviewService
+from synthflow.components.human_interaction import HumanInteraction
+from synthflow.components.data_processing import DataExtractor, DataEntry
+
+COMPONENTS = {
+    "element_locator": ElementLocator,
+    "operation_executor": OperationExecutor,
+    "review_service": ReviewService,
+    "human_interaction": HumanInteraction,
+    "data_extractor": DataExtractor,
+    "data_entry": DataEntry,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run many instances of a SynthFlow process concurrently")
+    parser.add_argument("config", help="Process configuration (YAML)")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--dataset", help="Instance data (.csv, .json or .jsonl); one instance per row")
+    source.add_argument("--count", type=int, help="Number of instances to run without input data")
+    parser.add_argument("--workers", type=int, default=4, help="Maximum concurrent instances")
+    parser.add_argument("--db", default="synthflow.db", help="Audit database path")
+    parser.add_argument("--audit", help="Audit storage: sqlite[:path], jsonl[:dir], memory or null (default: --db)")
+    parser.add_argument("--blobs", help="Directory storing large context values (page text, screenshots) by content hash")
+    parser.add_argument("--blob-threshold", type=int, default=DEFAULT_THRESHOLD,
+                        help="Values larger than this many bytes go to --blobs")
+    parser.add_argument("--headless", action="store_true", help="Run worker browsers headless")
+    simulation = parser.add_argument_group("simulation (virtual time, no browser or human needed)")
+    simulation.add_argument("--simulate", action="store_true", help="Predict throughput and utilisation instead of running")
+    simulation.add_argument("--reviewers", type=int, help="Human reviewers available (default: unbounded)")
+    simulation.add_argument("--arrival-rate", type=float, help="Instances started per second (default: all at once)")
+    simulation.add_argument("--latency", type=float, default=1.0, help="Step latency (s) when --db has no history for it")
+    simulation.add_argument("--seed", type=int, help="Random seed for reproducible predictions")
+    args = parser.parse_args()
+
+    logger = setup_logger()
+    process_model = ConfigParser().load_config(args.config)
+    logger.info(f"Process Loaded: {process_model.name} (v{process_model.version})")
+
+    dataset = load_dataset(args.dataset) if args.dataset else None
+    if args.simulate:
+        simulate(args, process_model, dataset, logger)
+        return
+
+    blob_store = BlobStore(args.blobs, threshold=args.blob_threshold) if args.blobs else None
+    # Started here, on the main thread, so its login state (browser_data) can be
+    # exported for the worker sessions
+    browser_manager = BrowserContextManager(headless=args.headless)
+    browser_manager.start()
+    try:
+        runner = BatchRunner(process_model, COMPONENTS, workers=args.workers, db_path=args.db,
+                             session_factory=browser_manager.isolated_session_factory(), storage=args.audit,
+                             blob_store=blob_store)
+        report = runner.run(dataset=dataset, count=args.count)
+    finally:
+        browser_manager.stop()
+
+    logger.info("--- Batch Finished ---")
+    for key, value in report.summary().items():
+        logger.info(f"{key}: {value}")
+    for result in report.results:
+        if result.error:
+            logger.error(f"Instance {result.index} ({result.trace_id}) failed: {result.error}")
+    sys.exit(0 if report.failed == 0 else 1)
+
+
+def simulate(args, process_model, dataset, logger):
+    # Replay historical step durations from the audit database when there are any
+    latency = latencies_from_audit(args.db) if os.path.exists(args.db) else {}
+    simulator = Simulator(process_model, latency=latency, default_latency=args.latency, seed=args.seed)
+    capacities = {"reviewer": args.reviewers} if args.reviewers else {}
+    report = simulator.run(dataset=dataset, count=args.count, workers=args.workers,
+                           capacities=capacities, arrival_rate=args.arrival_rate)
+
+    logger.info("--- Simulation Finished ---")
+    for key, value in report.summary().items():
+        if key != "resources":
+            logger.info(f"{key}: {value}")
+    for name, stats in report.summary()["resources"].items():
+        logger.info(f"resource {name}: {stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -63,7 +63,7 @@ def main():
         logger.error(f"Error: {result.error}")
     
     logger.info("--- Execution Timeline ---")
-    timeline = state_tracker.get_timeline()
+    timeline = state_tracker.get_timeline(full=True)
     for event in timeline.events:
         logger.info(f"[{event.timestamp.strftime('%H:%M:%S')}] Step: {event.step_id or 'System'} | Status: {event.status}")
         if event.details:
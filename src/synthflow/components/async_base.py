@@ -0,0 +1,15 @@
+from abc import abstractmethod
+from typing import Any, Dict
+
+from .base import Component
+
+
+class AsyncComponent(Component):
+    """
+    Base class for components whose execute() is a coroutine.
+    AsyncExecutionEngine awaits them directly; plain components are run in a thread.
+    """
+
+    @abstractmethod
+    async def execute(self, context: Any, params: Dict[str, Any]) -> Any:
+        pass
@@ -0,0 +1,61 @@
+import asyncio
+import time
+import uuid
+from typing import Any, Dict
+from .async_base import AsyncComponent
+from ..utils.logger import get_logger
+
+class AsyncHumanInteraction(AsyncComponent):
+    """Async counterpart of HumanInteraction: waits for the decision without holding a thread"""
+
+    def __init__(self):
+        self.logger = get_logger("AsyncHumanInteraction")
+
+    @property
+    def name(self) -> str:
+        return "human_interaction"
+        
+    @property
+    def version(self) -> str:
+        return "1.0.0"
+
+    def initialize(self, config: Dict[str, Any]) -> None:
+        pass
+        
+    async def execute(self, context: Any, params: Dict[str, Any]) -> Any:
+        instruction = params.get("instruction", "Waiting for user action...")
+        timeout = params.get("timeout", 300) # Default 5 minutes
+        options = params.get("options", ["execute", "skip", "stop"])
+        
+        tracker = context.get("_tracker")
+        control = context.get("_control")
+        if not tracker:
+            self.logger.warning("No StateTracker found in context. Using simulation mode.")
+            await (control.sleep_async(2) if control is not None else asyncio.sleep(2))
+            return {"status": "completed", "action": "execute"} # Default action
+
+        self.logger.info(f"=== HUMAN INTERACTION REQUIRED ===")
+        self.logger.info(f"Instruction: {instruction}")
+        
+        # 1. Register pending interaction
+        interaction_id = uuid.uuid4().hex
+        tracker.set_pending_interaction({
+            "id": interaction_id,
+            "instruction": instruction,
+            "options": options,
+            "timestamp": time.time()
+        })
+        
+        # 2. Wait for result (never longer than the step/process budget)
+        deadline = context.get("_deadline")
+        timeout = deadline.clamp(float(timeout)) if deadline is not None else float(timeout)
+        self.logger.info(f"Waiting for user input (timeout={timeout:.0f}s)...")
+        # Woken by resolve_interaction (or a cancel) as soon as it happens
+        result = await tracker.wait_for_interaction_result_async(timeout=timeout, control=control,
+                                                                 interaction_id=interaction_id)
+        if result:
+            self.logger.info(f"User responded: {result}")
+            return result
+
+        self.logger.error("Interaction timed out")
+        raise TimeoutError("Human interaction timed out")
@@ -0,0 +1,49 @@
+import asyncio
+from collections.abc import Mapping
+from typing import Any, Dict
+from .async_base import AsyncComponent
+from .operation_steps import OperationSteps, run_steps_async, DEFAULT_TIMEOUT_MS
+from ..utils.logger import get_logger
+from ..core.async_human_simulator import AsyncHumanSimulator
+
+class AsyncOperationExecutor(OperationSteps, AsyncComponent):
+    """
+    Async counterpart of OperationExecutor (playwright.async_api).
+    The page comes from the run's browser session, injected by AsyncExecutionEngine
+    as context["_browser"].
+    """
+
+    simulator_class = AsyncHumanSimulator
+
+    def __init__(self):
+        self.logger = get_logger("AsyncOperationExecutor")
+
+    @property
+    def name(self) -> str:
+        return "AsyncOperationExecutor"
+        
+    @property
+    def version(self) -> str:
+        return "1.0.0"
+
+    def initialize(self, config: Dict[str, Any]) -> None:
+        self.config = config
+
+    async def execute(self, context: Any, params: Dict[str, Any]) -> Any:
+        return await run_steps_async(self._operation(context, params))
+
+    async def _get_page(self, context: Any):
+        session = context.get("_browser") if isinstance(context, Mapping) else None
+        if session is None:
+            raise RuntimeError("No browser session in context; run this component with AsyncExecutionEngine")
+        page = await session.get_page()
+        page.set_default_timeout(self._budget_ms(context, DEFAULT_TIMEOUT_MS))
+        return page
+
+    async def _wait(self, page, context: Any, timeout_ms: float):
+        timeout_ms = self._budget_ms(context, timeout_ms)
+        control = context.get("_control") if isinstance(context, Mapping) else None
+        if control is not None:
+            await control.sleep_async(timeout_ms / 1000)
+        else:
+            await asyncio.sleep(timeout_ms / 1000)
@@ -22,4 +22,9 @@ class Component(ABC):
         
     @abstractmethod
     def execute(self, context: Any, params: Dict[str, Any]) -> Any:
+        """
+        Run the step. context["_timeout"] is the seconds left for the step (None when
+        unbounded) and context["_deadline"] the Deadline itself: step timeouts are
+        cooperative, so blocking waits should be bounded by them.
+        """
         pass
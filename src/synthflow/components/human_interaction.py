@@ -1,4 +1,5 @@
 import time
+import uuid
 from typing import Any, Dict
 from .base import Component
 from ..utils.logger import get_logger
@@ -24,16 +25,20 @@ class HumanInteraction(Component):
         options = params.get("options", ["execute", "skip", "stop"])
         
         tracker = context.get("_tracker")
+        control = context.get("_control")
         if not tracker:
             self.logger.warning("No StateTracker found in context. Using simulation mode.")
-            time.sleep(2)
+            if control is not None:
+                control.sleep(2)
+            else:
+                time.sleep(2)
             return {"status": "completed", "action": "execute"} # Default action
 
         self.logger.info(f"=== HUMAN INTERACTION REQUIRED ===")
         self.logger.info(f"Instruction: {instruction}")
         
         # 1. Register pending interaction
-        interaction_id = str(time.time())
+        interaction_id = uuid.uuid4().hex
         tracker.set_pending_interaction({
             "id": interaction_id,
             "instruction": instruction,
@@ -41,9 +46,11 @@ class HumanInteraction(Component):
             "timestamp": time.time()
         })
         
-        # 2. Wait for result
-        self.logger.info(f"Waiting for user input (timeout={timeout}s)...")
-        result = tracker.wait_for_interaction_result(timeout=int(timeout))
+        # 2. Wait for result (never longer than the step/process budget)
+        deadline = context.get("_deadline")
+        timeout = deadline.clamp(float(timeout)) if deadline is not None else float(timeout)
+        self.logger.info(f"Waiting for user input (timeout={timeout:.0f}s)...")
+        result = tracker.wait_for_interaction_result(timeout=timeout, control=control, interaction_id=interaction_id)
         
         if result:
             self.logger.info(f"User responded: {result}")
@@ -0,0 +1,208 @@
+from collections.abc import Mapping
+from functools import partial
+from typing import Any, Callable, Dict, Generator
+
+# Playwright's own default for actions and navigation
+DEFAULT_TIMEOUT_MS = 30000
+
+# A browser operation written once for the sync and async executors: a generator
+# that yields every Playwright / simulator call as a zero-argument callable and is
+# sent back its result (or thrown its exception). run_steps calls the yielded
+# callables, run_steps_async awaits them.
+Steps = Generator[Callable[[], Any], Any, Any]
+
+
+def run_steps(steps: Steps) -> Any:
+    """Drive an operation, calling each yielded callable; returns the operation's result"""
+    outcome, error = None, None
+    while True:
+        try:
+            call = steps.throw(error) if error is not None else steps.send(outcome)
+        except StopIteration as done:
+            return done.value
+        try:
+            outcome, error = call(), None
+        except Exception as e:
+            outcome, error = None, e
+
+
+async def run_steps_async(steps: Steps) -> Any:
+    """Drive an operation, awaiting each yielded callable; returns the operation's result"""
+    outcome, error = None, None
+    while True:
+        try:
+            call = steps.throw(error) if error is not None else steps.send(outcome)
+        except StopIteration as done:
+            return done.value
+        try:
+            outcome, error = await call(), None
+        except Exception as e:
+            outcome, error = None, e
+
+
+class OperationSteps:
+    """
+    L-A-V and legacy browser actions shared by OperationExecutor and
+    AsyncOperationExecutor. Subclasses provide the I/O: _get_page(context),
+    _wait(page, context, timeout_ms) and the simulator_class to use.
+    """
+
+    simulator_class = None
+
+    def _budget_ms(self, context: Any, timeout_ms: float) -> float:
+        deadline = context.get("_deadline") if isinstance(context, Mapping) else None
+        return deadline.clamp_ms(timeout_ms) if deadline is not None else timeout_ms
+
+    def _operation(self, context: Any, params: Dict[str, Any]) -> Steps:
+        # Check if we are using the new L-A-V structure
+        # If 'action' is a dict, it definitely comes from L-A-V model_dump
+        # Or if 'locator' is present.
+        if isinstance(params.get("action"), dict) or "locator" in params:
+            return self._lav_steps(context, params)
+
+        # Fallback to legacy mode
+        return self._legacy_steps(context, params)
+
+    def _simulator(self, page, context: Any, human_like: bool):
+        return self.simulator_class(page, control=context.get("_control")) if human_like else None
+
+    def _lav_steps(self, context: Any, config: Dict[str, Any]) -> Steps:
+        """
+        Execute using the new L-A-V-D structure
+        """
+        locator_conf = config.get("locator", {})
+        action_conf = config.get("action", {})
+        verify_conf = config.get("verification", {})
+
+        # 1. Locate
+        selector = locator_conf.get("value")
+        if not selector and action_conf.get("type") not in ["open", "wait"]:
+             raise ValueError("Locator value required")
+
+        # 2. Action
+        action_type = action_conf.get("type")
+        human_like = action_conf.get("human_like", True)
+        value = action_conf.get("value")
+
+        self.logger.info(f"[LAV] Action: {action_type} on {selector}")
+
+        page = yield partial(self._get_page, context)
+        simulator = self._simulator(page, context, human_like)
+
+        result = {}
+
+        try:
+            # Pre-action delay
+            if action_conf.get("delay_before"):
+                yield partial(self._wait, page, context, action_conf["delay_before"] * 1000)
+
+            # Execute Action
+            if action_type == "open":
+                if not value: raise ValueError("URL required for open")
+                yield partial(page.goto, str(value))
+
+            elif action_type == "click":
+                yield partial(simulator.click if human_like else page.click, selector)
+
+            elif action_type == "input" or action_type == "type":
+                yield partial(simulator.type if human_like else page.fill, selector, str(value))
+
+            elif action_type == "wait":
+                delay = float(value) if value else 1.0
+                yield partial(self._wait, page, context, delay * 1000)
+
+            elif action_type == "screenshot":
+                path = str(value) if value else "screenshot.png"
+                yield partial(page.screenshot, path=path)
+                result["path"] = path
+
+            elif action_type == "read_text":
+                # New action: Extract text
+                result["text"] = yield partial(page.text_content, selector)
+
+            else:
+                self.logger.warning(f"Unknown action: {action_type}")
+
+            # Post-action delay
+            if action_conf.get("delay_after"):
+                yield partial(self._wait, page, context, action_conf["delay_after"] * 1000)
+
+            # 3. Verification
+            if verify_conf:
+                yield from self._verify_steps(page, verify_conf, context)
+
+            result["status"] = "success"
+            return result
+
+        except Exception as e:
+            self.logger.error(f"[LAV] Failed: {e}")
+            raise e
+
+    def _verify_steps(self, page, conf: Dict[str, Any], context: Any = None) -> Steps:
+        check = conf.get("check")
+        selector = conf.get("selector")
+        timeout = self._budget_ms(context, conf.get("timeout", 5000))
+
+        try:
+            if check == "visible":
+                yield partial(page.wait_for_selector, selector, state="visible", timeout=timeout)
+            elif check == "url_contains":
+                # Simple check, might need retry logic
+                if conf.get("value") not in page.url:
+                    raise Exception(f"URL mismatch: expected {conf.get('value')} in {page.url}")
+        except Exception as e:
+            if conf.get("on_fail") == "ignore":
+                self.logger.warning(f"Verification failed (ignored): {e}")
+            else:
+                raise e
+
+    def _legacy_steps(self, context: Any, params: Dict[str, Any]) -> Steps:
+        action = params.get("action")
+        target = params.get("target") # selector
+        value = params.get("value")
+        human_like = params.get("human_like", True) # Default to True for this use case
+
+        self.logger.info(f"Performing '{action}' on '{target}' with value '{value}' (human_like={human_like})")
+
+        try:
+            page = yield partial(self._get_page, context)
+            simulator = self._simulator(page, context, human_like)
+
+            if action == "open":
+                if not value:
+                    raise ValueError("URL value is required for 'open' action")
+                yield partial(page.goto, value)
+                return {"status": "success", "url": page.url}
+
+            elif action == "click":
+                if not target:
+                    raise ValueError("Target selector is required for 'click' action")
+
+                yield partial(simulator.click if human_like else page.click, target)
+                return {"status": "success"}
+
+            elif action == "type" or action == "input":
+                if not target:
+                    raise ValueError("Target selector is required for 'type' action")
+
+                text = str(value) if value is not None else ""
+                yield partial(simulator.type if human_like else page.fill, target, text)
+                return {"status": "success"}
+
+            elif action == "screenshot":
+                path = value or "screenshot.png"
+                yield partial(page.screenshot, path=path)
+                return {"status": "success", "path": path}
+
+            elif action == "wait":
+                time_ms = float(value) * 1000 if value else 1000
+                yield partial(self._wait, page, context, time_ms)
+                return {"status": "success"}
+
+            else:
+                self.logger.warning(f"Unknown action: {action}")
+                return {"status": "skipped", "reason": "unknown_action"}
+
+        except Exception as e:
+            self.logger.error(f"Operation failed: {e}")
+            raise e
@@ -0,0 +1,81 @@
+from typing import Optional, Dict, Any, Union
+from playwright.async_api import async_playwright, Browser, BrowserContext, Page, Playwright
+
+
+class AsyncBrowserManager:
+    """
+    Shares one Playwright driver and one browser process between concurrent async runs.
+    Every run (or concurrent worker) gets its own BrowserContext, so cookies and pages
+    are isolated while the process cost is paid once per event loop.
+    """
+
+    def __init__(self,
+                 headless: bool = False,
+                 args: list = None,
+                 storage_state: Optional[Union[str, Dict[str, Any]]] = None):
+        """
+        Args:
+            headless: Whether to run in headless mode. Defaults to False (visible).
+            args: Additional command line arguments for the browser.
+            storage_state: Optional Playwright storage state (path or dict) used to seed
+                every new context, e.g. exported from the persistent sync context.
+        """
+        self.headless = headless
+        self.storage_state = storage_state
+        self.playwright: Optional[Playwright] = None
+        self.browser: Optional[Browser] = None
+        self.browser_args = args or [
+            "--no-sandbox",
+            "--disable-infobars",
+            "--disable-blink-features=AutomationControlled"
+        ]
+
+    async def start(self):
+        """Starts the shared browser if not already running."""
+        if self.browser:
+            return
+        self.playwright = await async_playwright().start()
+        self.browser = await self.playwright.chromium.launch(headless=self.headless, args=self.browser_args)
+
+    def new_session(self) -> "AsyncBrowserSession":
+        """Create a browser session; its context is opened lazily on first get_page()."""
+        return AsyncBrowserSession(self)
+
+    async def stop(self):
+        """Closes the browser and stops Playwright."""
+        if self.browser:
+            await self.browser.close()
+            self.browser = None
+        if self.playwright:
+            await self.playwright.stop()
+            self.playwright = None
+
+
+class AsyncBrowserSession:
+    """A BrowserContext + page on the shared browser, owned by one run or worker"""
+
+    def __init__(self, manager: AsyncBrowserManager):
+        self.manager = manager
+        self.context: Optional[BrowserContext] = None
+        self.page: Optional[Page] = None
+
+    async def get_page(self) -> Page:
+        if self.page is None:
+            await self.manager.start()
+            self.context = await self.manager.browser.new_context(
+                storage_state=self.manager.storage_state, viewport=None
+            )
+            # Anti-detection scripts (same as the sync BrowserContextManager)
+            await self.context.add_init_script("""
+                Object.defineProperty(navigator, 'webdriver', {
+                    get: () => undefined
+                });
+            """)
+            self.page = await self.context.new_page()
+        return self.page
+
+    async def close(self):
+        if self.context:
+            await self.context.close()
+            self.context = None
+        self.page = None
@@ -0,0 +1,456 @@
+import asyncio
+import contextvars
+import inspect
+import threading
+from typing import Dict, Any, Optional, List
+
+from .config_parser import ProcessModel
+from .execution_engine import ExecutionEngine, ExecutionResult, ExecutionStatus, _ExecutionFrame, _DagSchedule
+from .execution_plan import ExecutionScope, Instruction, KIND_LOOP, KIND_CONDITION, KIND_PARALLEL
+from .dependency_graph import DependencyGraph
+from .deadline import Deadline, DeadlineExceeded
+from .worker_pool import JobResult
+from .control import ExecutionCancelled
+from .result_cache import ComponentCache, MISS as CACHE_MISS
+from .async_browser_manager import AsyncBrowserManager, AsyncBrowserSession
+from .component_manager import ComponentManager
+from .strategy_manager import StrategyManager
+from .state_tracker import StateTracker
+from ..utils.logger import get_logger
+
+
+class AsyncExecutionEngine(ExecutionEngine):
+    """
+    基于 asyncio 的执行引擎：多个流程共享一个事件循环和一个浏览器进程
+
+    Runs the same compiled plans as ExecutionEngine, but every wait (human-like
+    delays, page loads, human decisions) is awaited instead of blocking a thread.
+    Create one engine (and StateTracker) per run and share one AsyncBrowserManager:
+
+        manager = AsyncBrowserManager(headless=True)
+        results = await asyncio.gather(*(
+            AsyncExecutionEngine(cm, sm, StateTracker(), manager).execute_async(model)
+            for _ in range(20)
+        ))
+
+    Register AsyncOperationExecutor / AsyncHumanInteraction for browser and human
+    steps; plain (sync) components are run in the default thread pool.
+    """
+
+    def __init__(self,
+                 component_manager: ComponentManager,
+                 strategy_manager: StrategyManager,
+                 state_tracker: StateTracker,
+                 browser_manager: Optional[AsyncBrowserManager] = None):
+        super().__init__(component_manager, strategy_manager, state_tracker)
+        self.browser_manager = browser_manager
+        # Frames follow asyncio tasks instead of threads
+        self._frame_var: contextvars.ContextVar = contextvars.ContextVar(f"synthflow_frame_{id(self)}", default=None)
+        self._deadline_var: contextvars.ContextVar = contextvars.ContextVar(f"synthflow_deadline_{id(self)}", default=None)
+        self.logger = get_logger("AsyncExecutionEngine")
+
+    def _current_frame(self) -> Optional[_ExecutionFrame]:
+        return self._frame_var.get()
+
+    def _enter_frame(self, frame: Optional[_ExecutionFrame]) -> Any:
+        return self._frame_var.set(frame)
+
+    def _exit_frame(self, token: Any):
+        self._frame_var.reset(token)
+
+    def _current_deadline(self) -> Deadline:
+        deadline = self._deadline_var.get()
+        return deadline if deadline is not None else self._deadline
+
+    def _push_deadline(self, deadline: Deadline) -> Any:
+        return self._deadline_var.set(deadline)
+
+    def _pop_deadline(self, token: Any):
+        self._deadline_var.reset(token)
+
+    def _is_running(self) -> bool:
+        # Never block the event loop here; pauses are awaited at step boundaries
+        self.control.raise_if_cancelled()
+        if self._status not in (ExecutionStatus.RUNNING, ExecutionStatus.PAUSED):
+            return False
+        frame = self._current_frame()
+        return frame is None or not frame.cancelled()
+
+    def _new_session(self) -> Optional[AsyncBrowserSession]:
+        return self.browser_manager.new_session() if self.browser_manager else None
+
+    def execute(self, process_model: ProcessModel) -> ExecutionResult:
+        """Blocking convenience wrapper (runs a private event loop)"""
+        return asyncio.run(self.execute_async(process_model))
+
+    async def execute_async(self, process_model: ProcessModel) -> ExecutionResult:
+        """
+        Execute the given process model on the running event loop
+        """
+        # Audit rows are appended (and flushed) off the event loop
+        self.tracker.persist_in_background()
+        try:
+            return await self._run_process_async(process_model)
+        finally:
+            # The run's audit trail is durable once the run returns
+            await asyncio.to_thread(self.tracker.persist_in_background, False)
+            await asyncio.to_thread(self.tracker.flush)
+
+    def resume_from_checkpoint(self, trace_id: str, process_model: Optional[ProcessModel] = None) -> ExecutionResult:
+        # The inherited implementation walks the plan with the sync _run_scope, which
+        # would call async components without awaiting them
+        raise NotImplementedError("Checkpoints are not supported by the async engine; "
+                                  "resume checkpointed runs with ExecutionEngine")
+
+    def resume(self, trace_id: Optional[str] = None, process_model: Optional[ProcessModel] = None):
+        """Continue a paused run; resuming a checkpointed run (trace_id) is not supported"""
+        if trace_id is not None:
+            return self.resume_from_checkpoint(trace_id, process_model)
+        super().resume()
+
+    async def _run_process_async(self, process_model: ProcessModel) -> ExecutionResult:
+        self.control.reset()
+        self._status = ExecutionStatus.RUNNING
+        self.tracker.snapshot(None, "started", {"process_name": process_model.name})
+        self._deadline = Deadline.after(process_model.timeout, "process")
+        self.browser = self._new_session()
+
+        try:
+            plan = self.compile(process_model)
+            self._releases, self._retention = plan.releases, process_model.output_retention
+            if process_model.checkpoint:
+                self.logger.warning("Checkpoints are not supported by the async engine; running without them.")
+            if plan.graph is not None:
+                await self._run_dag_async(plan.root, plan.graph, process_model.max_workers)
+            else:
+                await self._run_scope_async(plan.root)
+        except ExecutionCancelled:
+            self.logger.info("Process execution cancelled.")
+            return ExecutionResult(ExecutionStatus.CANCELLED)
+        except Exception as e:
+            self.logger.error(f"Process execution failed: {e}")
+            self.tracker.snapshot(None, "failed", {"error": str(e)})
+            return ExecutionResult(ExecutionStatus.FAILED, error=str(e))
+        finally:
+            if self.browser is not None:
+                await self.browser.close()
+                self.browser = None
+
+        self._status = ExecutionStatus.COMPLETED
+        self.tracker.snapshot(None, "completed")
+        return ExecutionResult(ExecutionStatus.COMPLETED)
+
+    async def _run_scope_async(self, scope: ExecutionScope) -> bool:
+        """Async counterpart of _run_scope"""
+        instructions = scope.instructions
+        if not instructions:
+            return True
+        releases = self._releases.get(scope.name)
+
+        ip = 0
+        while ip is not None and self._is_running():
+            instr = instructions[ip]
+            await self.control.checkpoint_async()
+            self._current_deadline().check()
+            try:
+                action = await self._dispatch_async(instr)
+                self._release_after(instr, releases)
+                # Step boundary: honours "step" durability and bounds the audit backlog
+                await self.tracker.drain_async()
+                if action == "skip":
+                    return True
+                elif action == "stop":
+                    return False
+                ip = instr.next_index
+            except Exception as e:
+                self._handle_step_error(instr, e)
+                self._release_after(instr, releases)
+                if instr.step.on_error == "skip":
+                    return True
+                ip = instr.fallthrough_index
+
+        return ip is None
+
+    async def _run_in_frame_async(self, scope: ExecutionScope, frame: _ExecutionFrame) -> bool:
+        token = self._enter_frame(frame)
+        try:
+            return await self._run_scope_async(scope)
+        finally:
+            self._exit_frame(token)
+
+    async def _dispatch_async(self, instr: Instruction) -> Optional[str]:
+        """Async counterpart of _dispatch (deadline and retry policy included)"""
+        if instr.step.timeout is None:
+            return await self._dispatch_with_retry_async(instr)
+        token = self._push_deadline(self._step_deadline(instr))
+        try:
+            return await self._dispatch_with_retry_async(instr)
+        finally:
+            self._pop_deadline(token)
+
+    async def _dispatch_with_retry_async(self, instr: Instruction) -> Optional[str]:
+        policy = instr.retry
+        if policy is None:
+            return await self._dispatch_once_async(instr)
+
+        attempt = 1
+        first_failure = None
+        while True:
+            try:
+                action = await self._dispatch_once_async(instr)
+            except Exception as e:
+                first_failure, delay = self._plan_retry(instr, attempt, e, first_failure)
+                await self.control.sleep_async(delay)
+                if instr.recovery is not None:
+                    await self._run_scope_async(instr.recovery)
+                attempt += 1
+                continue
+            if first_failure is not None:
+                self._record_retries(instr, attempt, first_failure, succeeded=True)
+            return action
+
+    async def _dispatch_once_async(self, instr: Instruction) -> Optional[str]:
+        if instr.kind == KIND_LOOP:
+            await self._execute_loop_async(instr)
+        elif instr.kind == KIND_CONDITION:
+            await self._execute_condition_async(instr)
+        elif instr.kind == KIND_PARALLEL:
+            await self._execute_parallel_async(instr)
+        else:
+            return self._flow_action(await self._execute_atomic_step_async(instr))
+        return None
+
+    async def _execute_atomic_step_async(self, instr: Instruction):
+        step = instr.step
+        self.tracker.snapshot(step.id, "executing", {"type": step.type})
+
+        final_params = self._prepare_params(instr)
+        component = self._resolve_component(instr.component_type)
+        key, cached = None, CACHE_MISS
+        if self._cache_policy(instr) is not None:
+            # The result cache may read its SQLite tier: keep that off the event loop
+            key, cached = await asyncio.to_thread(self._cache_lookup, instr, final_params)
+        if cached is not CACHE_MISS:
+            self._store_result(step, cached)
+            return cached
+
+        ctx = self._component_context(_cache=ComponentCache(self._get_result_cache, instr.component_type))
+        if inspect.iscoroutinefunction(component.execute):
+            call = component.execute(ctx, final_params)
+        else:
+            # Blocking component: keep it off the event loop (contextvars are carried over)
+            call = asyncio.to_thread(component.execute, ctx, final_params)
+        deadline = self._current_deadline()
+        try:
+            # Unlike the sync engine, a hung component is abandoned when the budget runs out
+            result = await asyncio.wait_for(call, timeout=deadline.remaining())
+        except asyncio.TimeoutError:
+            if not deadline.expired():
+                raise  # the component's own timeout
+            raise DeadlineExceeded(deadline.scope, deadline.budget)
+        if key is not None:
+            await asyncio.to_thread(self._cache_store, instr, key, result)
+        self._store_result(step, result)
+        return result
+
+    async def _execute_loop_async(self, instr: Instruction):
+        step = instr.step
+        self.tracker.snapshot(step.id, "loop_start", {"type": step.loop.type})
+        loop_config = step.loop
+
+        if loop_config.type == "count":
+            count = self._loop_count(loop_config)
+            for i in range(count):
+                if not self._is_running(): break
+                self._set_context("loop_index", i)
+                self.logger.info(f"Loop {step.id} iteration {i+1}/{count}")
+                await self._run_in_frame_async(instr.body, self._iteration_frame(step, i))
+
+        elif loop_config.type == "while_element":
+            selector = loop_config.condition
+            session = self._active_browser()
+            if session is None:
+                self.logger.warning("No browser session available. Cannot execute while_element loop.")
+                return
+            page = await session.get_page()
+            i = 0
+            while self._is_running():
+                if not await page.is_visible(selector):
+                    self.logger.info(f"Loop condition ended: {selector} not visible.")
+                    break
+                self._set_context("loop_index", i)
+                self.logger.info(f"Loop {step.id} iteration {i+1} (while {selector})")
+                await self._run_in_frame_async(instr.body, self._iteration_frame(step, i))
+                i += 1
+
+        elif loop_config.type == "for_each":
+            await self._execute_for_each_async(instr)
+
+        else:
+            raise ValueError(f"Unsupported loop type: {loop_config.type}")
+
+    async def _execute_for_each_async(self, instr: Instruction):
+        """
+        for_each on the event loop: with concurrency > 1, that many worker tasks pull
+        items from a queue, each worker on its own browser context.
+        """
+        step = instr.step
+        loop_config = step.loop
+        items = self._resolve_loop_items(loop_config.items)
+        item_var = loop_config.item_var
+        concurrency = min(loop_config.concurrency, len(items)) if items else 1
+        parent = self._current_frame()
+
+        def item_vars(i: int, item: Any) -> Dict[str, Any]:
+            return {"loop_index": i, item_var: item}
+
+        outputs = []
+        if concurrency <= 1:
+            for i, item in enumerate(items):
+                if not self._is_running(): break
+                self.logger.info(f"Loop {step.id} item {i+1}/{len(items)}")
+                frame = _ExecutionFrame(parent, self._loop_vars(step, i, **{item_var: item}))
+                await self._run_in_frame_async(instr.body, frame)
+                self._merge_frame(frame, item_vars(i, item))
+                outputs.append(frame.written)
+            self._set_context(f"{step.id}.output", outputs)
+            return
+
+        self.logger.info(f"Loop {step.id}: {len(items)} items, concurrency={concurrency}")
+        stop_event = threading.Event()
+        queue: asyncio.Queue = asyncio.Queue()
+        for entry in enumerate(items):
+            queue.put_nowait(entry)
+        frames: List[Optional[_ExecutionFrame]] = [None] * len(items)
+        errors: List[Optional[BaseException]] = [None] * len(items)
+
+        async def worker():
+            session = self._new_session()
+            try:
+                while not stop_event.is_set() and not queue.empty():
+                    i, item = queue.get_nowait()
+                    frame = _ExecutionFrame(parent, self._loop_vars(step, i, **{item_var: item}),
+                                            browser=session, cancel_event=stop_event)
+                    try:
+                        await self._run_in_frame_async(instr.body, frame)
+                        frames[i] = frame
+                    except Exception as e:
+                        errors[i] = e
+                        stop_event.set()
+            finally:
+                if session is not None:
+                    await session.close()
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        for error in errors:
+            if error is not None:
+                raise error
+        for i, frame in enumerate(frames):
+            if frame is None:
+                continue
+            self._merge_frame(frame, item_vars(i, items[i]))
+            outputs.append(frame.written)
+        self._set_context(f"{step.id}.output", outputs)
+
+    async def _execute_condition_async(self, instr: Instruction):
+        scope = self._select_branch(instr)
+        if scope is not None:
+            await self._run_scope_async(scope)
+
+    async def _execute_parallel_async(self, instr: Instruction):
+        """
+        Async counterpart of _execute_parallel. Branches run as tasks; once the join
+        is satisfied the remaining branches are cancelled immediately.
+        """
+        join, active, max_workers = self._parallel_branches(instr)
+        if not active:
+            return
+
+        semaphore = asyncio.Semaphore(max_workers)
+        parent = self._current_frame()
+
+        async def run_branch(index: int, branch, scope):
+            async with semaphore:
+                # The first branch keeps the run's own page, the others get their own context
+                session = None if index == 0 else self._new_session()
+                frame = _ExecutionFrame(parent, {}, browser=session)
+                try:
+                    try:
+                        finished = await self._run_in_frame_async(scope, frame)
+                    except Exception as e:
+                        return self._branch_failed(branch, scope, frame, e)
+                    return frame, None, finished
+                finally:
+                    if session is not None:
+                        await session.close()
+
+        tasks = [asyncio.ensure_future(run_branch(i, branch, scope)) for i, (branch, scope) in enumerate(active)]
+        stop_when = self._join_condition(join)
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            # Same join policy as WorkerPool.map(fail_fast=join != "first_success", stop_when=...)
+            satisfied = False
+            for task in done:
+                res = self._task_result(tasks.index(task), task)
+                if res.error is not None and join != "first_success":
+                    satisfied = True
+                elif stop_when is not None and stop_when(res):
+                    satisfied = True
+            if satisfied:
+                for task in pending:
+                    task.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+                break
+
+        results = [self._task_result(i, task) for i, task in enumerate(tasks)]
+        self._join_parallel(instr, join, active, results)
+
+    @staticmethod
+    def _task_result(index: int, task: asyncio.Future) -> JobResult:
+        if task.cancelled():
+            return JobResult(index)
+        if task.exception() is not None:
+            return JobResult(index, error=task.exception(), executed=True)
+        return JobResult(index, value=task.result(), executed=True)
+
+    async def _run_dag_async(self, scope: ExecutionScope, graph: DependencyGraph, max_workers: Optional[int] = None):
+        """Async counterpart of _run_dag: independent steps run as concurrent tasks"""
+        instructions = scope.instructions
+        schedule = _DagSchedule(graph, lambda node, e: self._handle_step_error(instructions[node], e))
+        semaphore = asyncio.Semaphore(max_workers or 4)
+        running: Dict[asyncio.Future, int] = {}
+
+        async def run_node(node: int):
+            async with semaphore:
+                return await self._dispatch_async(instructions[node])
+
+        while True:
+            if not schedule.halted and self._is_running():
+                node = schedule.take(running)
+                while node is not None:
+                    if graph.effects[node].barrier:
+                        try:
+                            action, error = await self._dispatch_async(instructions[node]), None
+                        except Exception as e:
+                            action, error = None, e
+                        schedule.settle(node, action, error)
+                    else:
+                        running[asyncio.ensure_future(run_node(node))] = node
+                    node = schedule.take(running)
+            else:
+                schedule.halted = True
+
+            if not running:
+                if schedule.halted or not schedule.ready:
+                    break
+                continue
+
+            done, _ = await asyncio.wait(list(running), return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                node = running.pop(task)
+                error = task.exception()
+                schedule.settle(node, None if error is not None else task.result(), error)
+
+        if schedule.failure is not None:
+            raise schedule.failure
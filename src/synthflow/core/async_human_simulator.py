@@ -0,0 +1,75 @@
+import asyncio
+import random
+from playwright.async_api import Page
+
+
+class AsyncHumanSimulator:
+    """
+    Async counterpart of HumanSimulator: the same human-like mouse and keyboard
+    behaviour, but delays are awaited so other runs on the event loop keep going.
+    """
+    def __init__(self, page: Page, control=None):
+        self.page = page
+        self.control = control
+
+    async def _sleep(self, seconds: float):
+        if self.control is not None:
+            await self.control.sleep_async(seconds)
+        else:
+            await asyncio.sleep(seconds)
+
+    async def _random_sleep(self, min_s: float = 0.1, max_s: float = 0.5):
+        await self._sleep(random.uniform(min_s, max_s))
+
+    async def move_mouse_to(self, selector: str) -> bool:
+        """
+        Moves mouse to the target element with randomized trajectory logic (simplified).
+        Returns True if successful, False if element not found/visible.
+        """
+        try:
+            loc = self.page.locator(selector).first
+            if not await loc.is_visible():
+                return False
+
+            box = await loc.bounding_box()
+            if not box:
+                return False
+
+            # Target point: Randomize within the element's bounding box (inner 80%)
+            target_x = box['x'] + (box['width'] * random.uniform(0.1, 0.9))
+            target_y = box['y'] + (box['height'] * random.uniform(0.1, 0.9))
+
+            steps = random.randint(10, 30)
+            await self.page.mouse.move(target_x, target_y, steps=steps)
+            return True
+        except Exception as e:
+            print(f"[AsyncHumanSimulator] Move failed: {e}")
+            return False
+
+    async def click(self, selector: str):
+        """
+        Human-like click: Move to element -> Pause -> Mouse Down -> Pause -> Mouse Up.
+        """
+        if await self.move_mouse_to(selector):
+            await self._random_sleep(0.1, 0.3) # Hesitation before click
+            await self.page.mouse.down()
+            await self._random_sleep(0.05, 0.15) # Click duration
+            await self.page.mouse.up()
+        else:
+            # Fallback to standard click if manual move fails
+            await self.page.click(selector)
+
+    async def type(self, selector: str, text: str, delay_range: tuple = (0.05, 0.2)):
+        """
+        Human-like typing: Click to focus -> Type char by char with variable delays.
+        """
+        await self.click(selector)
+
+        for char in text:
+            await self.page.keyboard.type(char)
+            # Random delay between keystrokes
+            await self._sleep(random.uniform(*delay_range))
+
+            # Occasionally pause longer (simulating thinking or checking source)
+            if random.random() < 0.05:
+                await self._random_sleep(0.3, 0.8)
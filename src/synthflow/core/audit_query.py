@@ -0,0 +1,175 @@
+import heapq
+import json
+import sqlite3
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+from .audit_retention import default_archive_dir, read_archived_rows
+from .audit_writer import ensure_trace_summary
+
+# Created with the audit_log table (and on older databases by AuditQuery)
+AUDIT_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS idx_audit_trace_id ON audit_log(trace_id, id)",
+    "CREATE INDEX IF NOT EXISTS idx_audit_step_status ON audit_log(step_id, status)",
+    "CREATE INDEX IF NOT EXISTS idx_audit_timestamp ON audit_log(timestamp)",
+)
+
+MAX_PAGE_SIZE = 1000
+
+TimeBound = Optional[Union[str, datetime]]
+
+
+@dataclass
+class AuditRecord:
+    id: int
+    trace_id: str
+    timestamp: str
+    step_id: Optional[str]
+    status: str
+    details: Dict[str, Any] = field(default_factory=dict)
+    duration: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass
+class AuditPage:
+    records: List[AuditRecord]
+    # Pass as `after` to get the next page; None on the last page
+    next_cursor: Optional[int] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"events": [r.to_dict() for r in self.records], "next": self.next_cursor}
+
+
+class AuditQuery:
+    """
+    负责按条件查询审计日志（索引查询、键集分页、流式遍历），不加载上下文快照
+    """
+
+    def __init__(self, db_path: str = "synthflow.db", archive_dir: Optional[str] = None):
+        self.db_path = db_path
+        # Where AuditArchiver moved expired traces; trace lookups fall back to it
+        self.archive_dir = archive_dir or default_archive_dir(db_path)
+        with sqlite3.connect(self.db_path) as conn:
+            exists = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'audit_log'").fetchone()
+            if exists:
+                for statement in AUDIT_INDEXES:
+                    conn.execute(statement)
+                ensure_trace_summary(conn)
+
+    def page(self,
+             trace_id: Optional[str] = None,
+             step_id: Optional[str] = None,
+             status: Optional[str] = None,
+             since: TimeBound = None,
+             until: TimeBound = None,
+             after: Optional[int] = None,
+             limit: int = 100,
+             descending: bool = False) -> AuditPage:
+        """
+        One page of events matching the filters, ordered by id. `after` is the
+        cursor of the previous page (keyset pagination: cost does not grow with depth).
+        since is inclusive, until exclusive.
+        """
+        limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+        clauses, args = [], []
+        for column, value in (("trace_id", trace_id), ("step_id", step_id), ("status", status)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                args.append(value)
+        if since is not None:
+            clauses.append("timestamp >= ?")
+            args.append(self._time(since))
+        if until is not None:
+            clauses.append("timestamp < ?")
+            args.append(self._time(until))
+        if after is not None:
+            clauses.append("id < ?" if descending else "id > ?")
+            args.append(int(after))
+
+        sql = "SELECT id, trace_id, timestamp, step_id, status, details, duration FROM audit_log"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += f" ORDER BY id {'DESC' if descending else 'ASC'} LIMIT ?"
+        args.append(limit + 1)
+
+        with sqlite3.connect(self.db_path) as conn:
+            rows = conn.execute(sql, args).fetchall()
+        records = [self._record(row) for row in rows[:limit]]
+        next_cursor = records[-1].id if len(rows) > limit else None
+        return AuditPage(records, next_cursor)
+
+    def iter(self, batch_size: int = 500, **filters) -> Iterator[AuditRecord]:
+        """Stream every matching event, one page (and one short read) at a time"""
+        after = filters.pop("after", None)
+        while True:
+            page = self.page(after=after, limit=batch_size, **filters)
+            yield from page.records
+            if page.next_cursor is None:
+                return
+            after = page.next_cursor
+
+    def trace(self, trace_id: str) -> List[AuditRecord]:
+        """The full timeline of one run, live or archived"""
+        return list(self.iter_trace(trace_id))
+
+    def iter_trace(self, trace_id: str) -> Iterator[AuditRecord]:
+        """
+        Archived and live events of one run, merged in id order: a trace resumed
+        after it was archived is partly in each (an event in both, left by an
+        interrupted archive run, is read once)
+        """
+        archived = (self._record(tuple(row[c] for c in ("id", "trace_id", "timestamp", "step_id",
+                                                        "status", "details", "duration")))
+                    for row in read_archived_rows(self.archive_dir, trace_id, self.db_path))
+        last_id = None
+        for record in heapq.merge(archived, self.iter(trace_id=trace_id), key=lambda r: r.id):
+            if record.id != last_id:
+                last_id = record.id
+                yield record
+
+    def traces(self, limit: int = 50, before: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Most recent runs, newest first: trace id, process name, first/last timestamp,
+        last status and event count. `before` is the `first_id` of the last run of the previous page.
+        Read from the audit_traces summary: a page costs `limit` index lookups.
+        """
+        limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+        sql = """
+            SELECT s.trace_id, s.first_id, json_extract(f.details, '$.process_name'),
+                   f.timestamp, l.timestamp, l.status, s.events
+            FROM audit_traces s
+            JOIN audit_log f ON f.id = s.first_id
+            JOIN audit_log l ON l.id = s.last_id
+        """
+        args: List[Any] = []
+        if before is not None:
+            sql += " WHERE s.first_id < ?"
+            args.append(int(before))
+        sql += " ORDER BY s.first_id DESC LIMIT ?"
+        args.append(limit)
+        with sqlite3.connect(self.db_path) as conn:
+            runs = conn.execute(sql, args).fetchall()
+        keys = ("trace_id", "first_id", "process_name", "started", "updated", "last_status", "events")
+        return [dict(zip(keys, run)) for run in runs]
+
+    @staticmethod
+    def _time(value: Union[str, datetime]) -> str:
+        # Timestamps are stored as ISO strings, which sort chronologically
+        return value.isoformat() if isinstance(value, datetime) else str(value)
+
+    @staticmethod
+    def _record(row) -> AuditRecord:
+        record_id, trace_id, timestamp, step_id, status, details, duration = row
+        return AuditRecord(
+            id=record_id,
+            trace_id=trace_id,
+            timestamp=timestamp,
+            step_id=step_id,
+            status=status,
+            details=json.loads(details) if details else {},
+            duration=duration or 0.0,
+        )
@@ -0,0 +1,299 @@
+import glob
+import gzip
+import json
+import os
+import sqlite3
+import threading
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple, Union
+
+from ..utils.logger import get_logger
+from .blob_store import DEFAULT_PRUNE_GRACE, BlobStore
+from .audit_writer import ensure_trace_summary
+
+ARCHIVE_COLUMNS = ("id", "trace_id", "timestamp", "step_id", "status", "details",
+                   "context_snapshot", "duration", "snapshot_kind")
+
+# Run-level events (step_id NULL) after which a trace receives no more rows
+TERMINAL_STATUSES = ("completed", "failed", "cancelled")
+
+
+SUMMARIZE_TRACE = """
+    INSERT INTO audit_traces (trace_id, first_id, last_id, events, bytes, run_status)
+    SELECT trace_id, MIN(id), MAX(id), COUNT(*),
+           SUM(COALESCE(LENGTH(details), 0) + COALESCE(LENGTH(context_snapshot), 0)),
+           (SELECT r.status FROM audit_log r WHERE r.trace_id = b.trace_id AND r.step_id IS NULL
+            ORDER BY r.id DESC LIMIT 1)
+    FROM audit_log b WHERE trace_id = ? GROUP BY trace_id
+"""
+
+@dataclass
+class RetentionPolicy:
+    """Traces matching any limit are archived; None disables a limit"""
+    max_age_days: Optional[float] = None # By the trace's last event
+    max_traces: Optional[int] = None # Keep the most recently active N traces
+    max_bytes: Optional[int] = None # Keep the live event payloads below this size
+    # Traces still running (no terminal event) are never archived, unless idle this
+    # long: runs whose process died without finishing
+    abandoned_after_days: Optional[float] = None
+
+
+def archive_parts(archive_dir: str, day: str) -> List[str]:
+    """A day's archive files: each archive run adds one part (audit-<day>.jsonl.gz is the oldest layout)"""
+    return sorted(glob.glob(os.path.join(glob.escape(archive_dir), f"audit-{day}*.jsonl.gz")))
+
+
+def new_archive_part(archive_dir: str, day: str) -> str:
+    stamp = datetime.now().strftime("%Y%m%dT%H%M%S%f")
+    return os.path.join(archive_dir, f"audit-{day}.{stamp}-{uuid.uuid4().hex[:8]}.jsonl.gz")
+
+
+def default_archive_dir(db_path: str) -> str:
+    return os.path.join(os.path.dirname(os.path.abspath(db_path)), "audit_archive")
+
+
+def read_archived_rows(archive_dir: str, trace_id: str, db_path: str) -> Iterator[Dict[str, Any]]:
+    """Rows of an archived trace (all columns, JSON columns still serialized), in id order"""
+    with sqlite3.connect(db_path) as conn:
+        exists = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'audit_archive'").fetchone()
+        entry = conn.execute("SELECT day FROM audit_archive WHERE trace_id = ?", (trace_id,)).fetchone() if exists else None
+    if entry is None:
+        return
+    # Keyed by id: a run interrupted before deleting the rows it archived leaves them
+    # to be archived again, in a later part
+    rows: Dict[int, Dict[str, Any]] = {}
+    for path in archive_parts(archive_dir, entry[0]):
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                row = json.loads(line)
+                if row["trace_id"] == trace_id:
+                    rows[row["id"]] = row
+    for record_id in sorted(rows):
+        yield rows[record_id]
+
+
+def _fsync_directory(directory: str):
+    """Make a rename in directory durable (not supported, nor needed, on Windows)"""
+    if os.name == "nt":
+        return
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class AuditArchiver:
+    """
+    负责审计日志的保留策略：将过期轨迹迁移到按天压缩的归档文件，并增量回收数据库空间
+    """
+
+    def __init__(self, db_path: str = "synthflow.db", archive_dir: Optional[str] = None,
+                 blob_store: Optional[Union[str, BlobStore]] = None,
+                 blob_grace: float = DEFAULT_PRUNE_GRACE):
+        self.db_path = db_path
+        self.archive_dir = archive_dir or default_archive_dir(db_path)
+        # The runs' blob store (see StateTracker): swept of blobs no row or checkpoint refers to
+        self.blob_store = BlobStore(blob_store) if isinstance(blob_store, str) else blob_store
+        self.blob_grace = blob_grace
+        self.logger = get_logger("AuditArchiver")
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS audit_archive (
+                    trace_id TEXT PRIMARY KEY,
+                    day TEXT,
+                    events INTEGER,
+                    archived_at TEXT
+                )
+            """)
+            if conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'audit_log'").fetchone():
+                ensure_trace_summary(conn)
+
+    def expired_traces(self, policy: RetentionPolicy) -> List[str]:
+        """
+        Trace ids the policy moves out of the live table, least recently active first.
+        Running traces count towards the limits but are never expired.
+        """
+        with sqlite3.connect(self.db_path) as conn:
+            # (trace_id, last timestamp, payload bytes, run status), most recently active first;
+            # from the audit_traces summary, one primary key lookup per trace
+            traces = conn.execute("""
+                SELECT s.trace_id, l.timestamp, s.bytes, s.run_status
+                FROM audit_traces s JOIN audit_log l ON l.id = s.last_id
+                ORDER BY s.last_id DESC
+            """).fetchall()
+
+        expired = set()
+        if policy.max_age_days is not None:
+            cutoff = (datetime.now() - timedelta(days=policy.max_age_days)).isoformat()
+            expired.update(t[0] for t in traces if t[1] < cutoff)
+        if policy.max_traces is not None:
+            expired.update(t[0] for t in traces[policy.max_traces:])
+        if policy.max_bytes is not None:
+            kept = 0
+            for trace_id, _, size, _ in traces:
+                kept += size or 0
+                if kept > policy.max_bytes:
+                    expired.add(trace_id)
+        abandoned = None
+        if policy.abandoned_after_days is not None:
+            abandoned = (datetime.now() - timedelta(days=policy.abandoned_after_days)).isoformat()
+        for trace_id, last_timestamp, _, status in traces:
+            if status not in TERMINAL_STATUSES and (abandoned is None or last_timestamp >= abandoned):
+                expired.discard(trace_id)
+        return [t[0] for t in reversed(traces) if t[0] in expired]
+
+    def archive(self, trace_ids: List[str]) -> int:
+        """
+        Move traces to gzip archives (by day of the trace's start); returns events moved.
+        Each run writes its rows as a new part of the day's archive (a temporary file,
+        synced and renamed into place) before they leave the live table, so archiving
+        costs only the rows moved, and a crash in between only leaves rows in both
+        places: archived again by the next run, they are read once.
+        """
+        os.makedirs(self.archive_dir, exist_ok=True)
+        moved = 0
+        with sqlite3.connect(self.db_path) as conn:
+            # day -> {trace_id: (last id, events, events archived before)}
+            days: Dict[str, Dict[str, Tuple[int, int, int]]] = {}
+            for trace_id in trace_ids:
+                summary = conn.execute(
+                    "SELECT s.last_id, s.events, f.timestamp FROM audit_traces s JOIN audit_log f ON f.id = s.first_id "
+                    "WHERE s.trace_id = ?", (trace_id,)
+                ).fetchone()
+                if summary is None:
+                    continue
+                last_id, count, started = summary
+                # A trace archived before (e.g. resumed later) stays under its original day
+                previous = conn.execute("SELECT day, events FROM audit_archive WHERE trace_id = ?", (trace_id,)).fetchone()
+                day, previous_events = previous if previous else (started[:10], 0)
+                days.setdefault(day, {})[trace_id] = (last_id, count, previous_events or 0)
+
+            for day, traces in days.items():
+                self._write_archive(conn, day, traces)
+                moved += self._delete_archived(conn, day, traces)
+        return moved
+
+    def _delete_archived(self, conn: sqlite3.Connection, day: str, traces: Dict[str, Tuple[int, int, int]]) -> int:
+        """
+        Drop archived rows from the live table, once their archive is durable. Rows a
+        resumed run added meanwhile (ids past last_id) stay live.
+        """
+        moved = 0
+        with conn:
+            for trace_id, (last_id, count, previous_events) in traces.items():
+                conn.execute("DELETE FROM audit_log WHERE trace_id = ? AND id <= ?", (trace_id, last_id))
+                conn.execute("DELETE FROM audit_traces WHERE trace_id = ?", (trace_id,))
+                # Summarize what stays live (rows of a resumed run), if anything
+                conn.execute(SUMMARIZE_TRACE, (trace_id,))
+                conn.execute(
+                    "INSERT OR REPLACE INTO audit_archive (trace_id, day, events, archived_at) VALUES (?, ?, ?, ?)",
+                    (trace_id, day, count + previous_events, datetime.now().isoformat())
+                )
+                moved += count
+        return moved
+
+    def _write_archive(self, conn: sqlite3.Connection, day: str, traces: Dict[str, Tuple[int, int, int]]):
+        """Write the traces' live rows as a new part of the day's archive, atomically"""
+        path = new_archive_part(self.archive_dir, day)
+        tmp = f"{path}.tmp"
+        try:
+            with gzip.open(tmp, "wt", encoding="utf-8") as out:
+                for trace_id, (last_id, _, _) in traces.items():
+                    rows = conn.execute(
+                        f"SELECT {', '.join(ARCHIVE_COLUMNS)} FROM audit_log WHERE trace_id = ? AND id <= ? ORDER BY id",
+                        (trace_id, last_id)
+                    )
+                    for row in rows:
+                        out.write(json.dumps(dict(zip(ARCHIVE_COLUMNS, row))) + "\n")
+            with open(tmp, "rb") as f:
+                os.fsync(f.fileno())
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        _fsync_directory(self.archive_dir)
+
+    def vacuum(self, max_pages: Optional[int] = None, chunk: int = 1000):
+        """
+        Return free pages to the file system a chunk at a time (short write locks).
+        The first call on a database created without incremental auto-vacuum
+        converts it with one full VACUUM.
+        """
+        with sqlite3.connect(self.db_path) as conn:
+            if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+                self.logger.info(f"Enabling incremental auto-vacuum on {self.db_path} (one-time full VACUUM)")
+                conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+                conn.execute("VACUUM")
+                return
+            free = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            pages = free if max_pages is None else min(free, max_pages)
+            while pages > 0:
+                step = min(chunk, pages)
+                # Frees one page per VM step; executescript runs it to completion
+                # (a plain execute() steps it once and frees a single page)
+                conn.executescript(f"PRAGMA incremental_vacuum({step});")
+                pages -= step
+
+    def blob_references(self) -> Set[str]:
+        """
+        Digests referenced by audit rows, live or archived, and checkpoints (from the
+        audit_blobs and checkpoint_blobs indexes their writers keep)
+        """
+        referenced: Set[str] = set()
+        with sqlite3.connect(self.db_path) as conn:
+            tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+            for table in ("audit_blobs", "checkpoint_blobs"):
+                if table in tables:
+                    referenced.update(row[0] for row in conn.execute(f"SELECT DISTINCT digest FROM {table}"))
+        return referenced
+
+    def prune_blobs(self) -> int:
+        """Delete the blobs no audit row (archived ones included) or checkpoint refers to; returns how many"""
+        if self.blob_store is None:
+            return 0
+        return self.blob_store.prune(self.blob_references(), self.blob_grace)
+
+    def run(self, policy: RetentionPolicy) -> Dict[str, int]:
+        """Apply the policy once: archive expired traces, reclaim their space, then prune blobs"""
+        expired = self.expired_traces(policy)
+        moved = self.archive(expired) if expired else 0
+        if moved:
+            self.vacuum()
+        pruned = self.prune_blobs()
+        self.logger.info(f"Retention: archived {len(expired)} traces ({moved} events), pruned {pruned} blobs")
+        return {"traces": len(expired), "events": moved, "blobs": pruned}
+
+
+class RetentionWorker:
+    """Applies a retention policy in a background thread every `interval` seconds"""
+
+    def __init__(self, archiver: AuditArchiver, policy: RetentionPolicy, interval: float = 3600):
+        self.archiver = archiver
+        self.policy = policy
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="synthflow-retention", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.archiver.run(self.policy)
+            except Exception as e:
+                self.archiver.logger.error(f"Retention run failed: {e}")
+            self._stop.wait(self.interval)
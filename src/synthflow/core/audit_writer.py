@@ -0,0 +1,245 @@
+import atexit
+import os
+import queue
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from ..utils.logger import get_logger
+from .blob_store import find_references
+
+# "step": snapshots that finish a step wait until they are committed
+# "batch": commit every batch_size events
+# "interval": commit at most flush_interval seconds after an event (or earlier, every batch_size events)
+DURABILITY_LEVELS = ("step", "batch", "interval")
+
+INSERT_AUDIT_ROW = (
+    "INSERT INTO audit_log (trace_id, timestamp, step_id, status, details, context_snapshot, duration, snapshot_kind) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+)
+
+# One row per trace, kept up to date by the writer in the same transaction as its
+# events, so listing runs and applying retention never aggregate the whole audit_log
+TRACE_SUMMARY_TABLE = """
+    CREATE TABLE IF NOT EXISTS audit_traces (
+        trace_id TEXT PRIMARY KEY,
+        first_id INTEGER,
+        last_id INTEGER,
+        events INTEGER,
+        bytes INTEGER,
+        run_status TEXT
+    )
+"""
+TRACE_SUMMARY_INDEX = "CREATE INDEX IF NOT EXISTS idx_audit_traces_first ON audit_traces(first_id)"
+
+# Folds the events with ids in [?1, ?2] into the summary: bytes counts the details and
+# context payloads, run_status is the latest run-level (step_id NULL) status
+UPDATE_TRACE_SUMMARY = """
+    INSERT INTO audit_traces (trace_id, first_id, last_id, events, bytes, run_status)
+    SELECT trace_id, MIN(id), MAX(id), COUNT(*),
+           SUM(COALESCE(LENGTH(details), 0) + COALESCE(LENGTH(context_snapshot), 0)),
+           (SELECT r.status FROM audit_log r WHERE r.trace_id = b.trace_id AND r.id BETWEEN ?1 AND ?2
+            AND r.step_id IS NULL ORDER BY r.id DESC LIMIT 1)
+    FROM audit_log b
+    WHERE id BETWEEN ?1 AND ?2 AND trace_id IS NOT NULL GROUP BY trace_id
+    ON CONFLICT(trace_id) DO UPDATE SET
+        last_id = excluded.last_id,
+        events = events + excluded.events,
+        bytes = bytes + excluded.bytes,
+        run_status = COALESCE(excluded.run_status, run_status)
+"""
+
+# Blobs (see BlobStore) each trace's rows refer to, archived rows included: what
+# AuditArchiver.prune_blobs must keep, without scanning the rows themselves
+AUDIT_BLOBS_TABLE = """
+    CREATE TABLE IF NOT EXISTS audit_blobs (
+        digest TEXT,
+        trace_id TEXT,
+        PRIMARY KEY (digest, trace_id)
+    ) WITHOUT ROWID
+"""
+INSERT_AUDIT_BLOB = "INSERT OR IGNORE INTO audit_blobs (digest, trace_id) VALUES (?, ?)"
+
+_STOP = object()
+
+
+def blob_links(rows) -> set:
+    """(digest, trace_id) of every blob reference in audit rows (ROW_COLUMNS order)"""
+    return {(digest, row[0]) for row in rows for text in (row[4], row[5]) for digest in find_references(text)}
+
+
+def ensure_trace_summary(conn: sqlite3.Connection):
+    """
+    Create the audit_traces summary and the audit_blobs references, filling them
+    from audit_log on databases that predate them
+    """
+    if not conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'audit_blobs'").fetchone():
+        conn.execute(AUDIT_BLOBS_TABLE)
+        rows = conn.execute(
+            "SELECT trace_id, NULL, NULL, NULL, details, context_snapshot FROM audit_log "
+            "WHERE details LIKE '%\"$blob\"%' OR context_snapshot LIKE '%\"$blob\"%'"
+        )
+        conn.executemany(INSERT_AUDIT_BLOB, blob_links(rows))
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(audit_traces)")]
+    if columns and "run_status" not in columns:
+        # Summary from before it counted bytes and statuses: rebuilt below
+        conn.execute("DROP TABLE audit_traces")
+    conn.execute(TRACE_SUMMARY_TABLE)
+    conn.execute(TRACE_SUMMARY_INDEX)
+    if "run_status" not in columns:
+        conn.execute(UPDATE_TRACE_SUMMARY, (0, 2 ** 63 - 1))
+
+
+class AuditWriter:
+    """
+    负责在后台线程中批量写入审计日志（单一长连接、WAL 模式、有界队列）
+    """
+
+    def __init__(self, db_path: str, durability: str = "interval", batch_size: int = 200,
+                 flush_interval: float = 0.5, max_queue: int = 10000):
+        if durability not in DURABILITY_LEVELS:
+            raise ValueError(f"Unknown durability '{durability}', expected one of {DURABILITY_LEVELS}")
+        self.db_path = db_path
+        self.durability = durability
+        self.batch_size = max(1, int(batch_size))
+        self.flush_interval = flush_interval
+        # Bounded: a writer that falls behind slows producers down instead of growing without limit
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.written = 0
+        self.batches = 0
+        self.logger = get_logger("AuditWriter")
+
+    def submit(self, row: Tuple):
+        """Queue one audit_log row (trace_id, timestamp, step_id, status, details, context_snapshot, duration, snapshot_kind)"""
+        if self._thread is None:
+            self._start()
+        self._queue.put(row)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until everything submitted so far is committed"""
+        if self._thread is None:
+            return True
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self):
+        """Commit what is queued and stop the writer thread (a later submit restarts it)"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join()
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="synthflow-audit-writer", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+        except sqlite3.Error as e:
+            self.logger.warning(f"Could not enable WAL mode for {self.db_path}: {e}")
+        try:
+            ensure_trace_summary(conn)
+            conn.commit()
+        except sqlite3.Error as e:
+            self.logger.warning(f"Could not create the trace summary for {self.db_path}: {e}")
+
+        pending = []
+        waiters = []
+        oldest = 0.0
+        try:
+            while True:
+                timeout = None
+                if pending and self.durability == "interval" and self.flush_interval is not None:
+                    timeout = max(0.0, oldest + self.flush_interval - time.monotonic())
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    item = None
+
+                stop = item is _STOP
+                if isinstance(item, threading.Event):
+                    waiters.append(item)
+                elif item is not None and not stop:
+                    if not pending:
+                        oldest = time.monotonic()
+                    pending.append(item)
+
+                due = (stop or waiters or len(pending) >= self.batch_size
+                       or (item is None and pending))
+                if due:
+                    self._commit(conn, pending)
+                    pending = []
+                    for waiter in waiters:
+                        waiter.set()
+                    waiters = []
+                if stop:
+                    return
+        finally:
+            conn.close()
+
+    def _commit(self, conn: sqlite3.Connection, rows):
+        if not rows:
+            return
+        try:
+            with conn:
+                conn.executemany(INSERT_AUDIT_ROW, rows)
+                # Ids of one transaction are consecutive: no other writer can interleave
+                last = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+                conn.execute(UPDATE_TRACE_SUMMARY, (last - len(rows) + 1, last))
+                conn.executemany(INSERT_AUDIT_BLOB, blob_links(rows))
+            self.written += len(rows)
+            self.batches += 1
+        except Exception as e:
+            self.logger.error(f"Failed to persist {len(rows)} audit rows: {e}")
+
+    # --- One writer per database, shared by all trackers writing to it ---
+
+    _shared: Dict[str, "AuditWriter"] = {}
+    _shared_lock = threading.Lock()
+
+    @classmethod
+    def shared(cls, db_path: str, **settings) -> "AuditWriter":
+        """
+        The process-wide writer for db_path. Settings (durability, batch_size,
+        flush_interval) apply when the writer is created or are updated in place.
+        """
+        key = os.path.abspath(db_path)
+        with cls._shared_lock:
+            writer = cls._shared.get(key)
+            if writer is None:
+                writer = cls._shared[key] = cls(db_path, **settings)
+            elif settings:
+                writer.configure(**settings)
+            return writer
+
+    def configure(self, durability: Optional[str] = None, batch_size: Optional[int] = None,
+                  flush_interval: Optional[float] = None):
+        if durability is not None:
+            if durability not in DURABILITY_LEVELS:
+                raise ValueError(f"Unknown durability '{durability}', expected one of {DURABILITY_LEVELS}")
+            self.durability = durability
+        if batch_size is not None:
+            self.batch_size = max(1, int(batch_size))
+        if flush_interval is not None:
+            self.flush_interval = flush_interval
+
+    @classmethod
+    def close_all(cls):
+        with cls._shared_lock:
+            writers = list(cls._shared.values())
+        for writer in writers:
+            writer.close()
+
+
+# Nothing queued is lost on a normal interpreter exit
+atexit.register(AuditWriter.close_all)
@@ -0,0 +1,202 @@
+import csv
+import json
+import math
+import os
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Dict, Any, Optional, List, Type, Callable, Union
+
+from .config_parser import ProcessModel
+from .component_manager import ComponentManager
+from .strategy_manager import StrategyManager
+from .state_tracker import StateTracker
+from .audit_storage import AuditStorage, open_storage
+from .blob_store import BlobStore
+from .execution_engine import ExecutionEngine, ExecutionStatus
+from .worker_pool import WorkerPool, WorkerSlot
+from .result_cache import ResultCache
+from ..components.base import Component
+from ..utils.logger import get_logger
+
+
+def percentile(values: List[float], p: float) -> float:
+    """Linearly interpolated percentile (p in 0..100) of an unsorted list"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * p / 100.0
+    low, high = math.floor(rank), math.ceil(rank)
+    if low == high:
+        return ordered[low]
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def load_dataset(path: str) -> List[Dict[str, Any]]:
+    """Load instance rows from a .csv, .json (list of objects) or .jsonl file"""
+    ext = os.path.splitext(path)[1].lower()
+    with open(path, "r", encoding="utf-8") as f:
+        if ext == ".csv":
+            return [dict(row) for row in csv.DictReader(f)]
+        if ext == ".jsonl":
+            return [json.loads(line) for line in f if line.strip()]
+        if ext == ".json":
+            data = json.load(f)
+            if not isinstance(data, list):
+                raise ValueError(f"Dataset {path} must contain a JSON list of objects")
+            return data
+    raise ValueError(f"Unsupported dataset format: {path}")
+
+
+@dataclass
+class InstanceResult:
+    index: int
+    trace_id: str
+    status: ExecutionStatus
+    duration: float
+    error: Optional[str] = None
+
+
+@dataclass
+class BatchReport:
+    results: List[InstanceResult] = field(default_factory=list)
+    wall_time: float = 0.0
+
+    @property
+    def succeeded(self) -> int:
+        return sum(1 for r in self.results if r.status == ExecutionStatus.COMPLETED)
+
+    @property
+    def failed(self) -> int:
+        return len(self.results) - self.succeeded
+
+    @property
+    def throughput(self) -> float:
+        """Finished instances per second of wall time"""
+        return len(self.results) / self.wall_time if self.wall_time > 0 else 0.0
+
+    def latency(self, p: float) -> float:
+        return percentile([r.duration for r in self.results], p)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "instances": len(self.results),
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "wall_time": round(self.wall_time, 3),
+            "throughput_per_s": round(self.throughput, 3),
+            "latency_p50": round(self.latency(50), 3),
+            "latency_p90": round(self.latency(90), 3),
+            "latency_p99": round(self.latency(99), 3),
+        }
+
+
+class BatchRunner:
+    """
+    负责在有界工作线程池上批量执行多个流程实例（每个实例拥有独立的状态和组件）
+    """
+
+    def __init__(self,
+                 process_model: ProcessModel,
+                 components: Dict[str, Type[Component]],
+                 workers: int = 4,
+                 db_path: str = "synthflow.db",
+                 session_factory: Optional[Callable[[], Any]] = None,
+                 result_cache: Optional[ResultCache] = None,
+                 storage: Union[str, AuditStorage, None] = None,
+                 blob_store: Union[str, BlobStore, None] = None):
+        """
+        Args:
+            process_model: The process every instance runs.
+            components: Component registry (type -> class); each instance gets fresh instances.
+            workers: Maximum number of instances running at the same time.
+            db_path: Audit database shared by all instances (rows are told apart by trace_id).
+            session_factory: Creates a browser session per worker thread (e.g.
+                BrowserContextManager().isolated_session_factory()). Sessions open lazily,
+                so processes without browser steps never start a browser.
+            result_cache: Step result cache shared by all instances (cached steps
+                then hit across rows); each engine creates its own when omitted.
+            storage: Audit storage shared by all instances (see open_storage); db_path when omitted.
+            blob_store: Blob store (or its directory) for large values, shared so that
+                the same page or screenshot captured by many rows is stored once.
+        """
+        self.process_model = process_model
+        self.components = dict(components)
+        self.workers = max(1, int(workers))
+        self.db_path = db_path
+        self.session_factory = session_factory
+        self.result_cache = result_cache
+        # Opened once: every instance appends to the same log
+        self.storage = open_storage(storage) if storage is not None else None
+        self.blob_store = BlobStore(blob_store) if isinstance(blob_store, str) else blob_store
+        self._active: Dict[int, ExecutionEngine] = {}
+        self._active_lock = threading.Lock()
+        self._pool: Optional[WorkerPool] = None
+        self.logger = get_logger("BatchRunner")
+
+    def run(self, dataset: Optional[List[Dict[str, Any]]] = None, count: Optional[int] = None) -> BatchReport:
+        """
+        Run one instance per dataset row (the row's fields are seeded into the
+        instance context), or `count` instances without input data.
+        """
+        if dataset is None:
+            dataset = [{} for _ in range(count or 0)]
+        batch_id = uuid.uuid4().hex[:8]
+        self.logger.info(f"Batch {batch_id}: {len(dataset)} instances of '{self.process_model.name}' on {self.workers} workers")
+
+        pool = WorkerPool(self.workers, session_factory=self.session_factory, name=f"synthflow-batch-{batch_id}")
+        self._pool = pool
+        start = time.perf_counter()
+        # Instances are independent: one failing must not stop the others
+        jobs = pool.map(lambda i, row, slot: self._run_instance(batch_id, i, row, slot), dataset, fail_fast=False)
+        report = BatchReport(wall_time=time.perf_counter() - start)
+
+        for job in jobs:
+            if not job.executed:
+                report.results.append(InstanceResult(job.index, "", ExecutionStatus.CANCELLED, 0.0))
+            elif job.error is not None:
+                report.results.append(InstanceResult(job.index, "", ExecutionStatus.FAILED, 0.0, str(job.error)))
+            else:
+                report.results.append(job.value)
+        self.logger.info(f"Batch {batch_id} finished: {report.summary()}")
+        return report
+
+    def _run_instance(self, batch_id: str, index: int, row: Dict[str, Any], slot: WorkerSlot) -> InstanceResult:
+        trace_id = f"{batch_id}-{index:06d}-{uuid.uuid4().hex[:8]}"
+        engine = self.create_engine(trace_id)
+        for key, value in row.items():
+            engine.tracker.set_context(key, value)
+        engine.tracker.set_context("batch_index", index)
+        if slot.has_browser:
+            engine.browser = slot
+
+        start = time.perf_counter()
+        with self._active_lock:
+            if self._pool is not None and self._pool.stop_event.is_set():
+                return InstanceResult(index, trace_id, ExecutionStatus.CANCELLED, 0.0)
+            self._active[index] = engine
+        try:
+            result = engine.execute(self.process_model)
+        finally:
+            with self._active_lock:
+                self._active.pop(index, None)
+        return InstanceResult(index, trace_id, result.status, time.perf_counter() - start, result.error)
+
+    def cancel(self):
+        """Drain the batch: start no new instances and cancel the running ones"""
+        if self._pool is not None:
+            self._pool.stop_event.set()
+        with self._active_lock:
+            engines = list(self._active.values())
+        for engine in engines:
+            engine.cancel()
+
+    def create_engine(self, trace_id: str) -> ExecutionEngine:
+        """Build an engine with its own tracker, strategy manager and component instances"""
+        component_manager = ComponentManager()
+        for component_type, component_cls in self.components.items():
+            component_manager.register_component(component_type, component_cls)
+        tracker = StateTracker(db_path=self.db_path, trace_id=trace_id, storage=self.storage,
+                               blob_store=self.blob_store)
+        return ExecutionEngine(component_manager, StrategyManager(), tracker, result_cache=self.result_cache)
@@ -0,0 +1,250 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Iterable, Iterator, Set, Tuple, Union
+
+# Values (serialized) larger than this go to the blob store
+DEFAULT_THRESHOLD = 64 * 1024
+# Recently read blobs kept in memory, in bytes
+DEFAULT_CACHE_BYTES = 32 * 1024 * 1024
+
+REF_KEYS = frozenset(("$blob", "kind", "size"))
+
+# A reference inside serialized JSON (audit rows, checkpoints, json blobs)
+REF_PATTERN = re.compile(r'"\$blob":\s*"([0-9a-f]{64})"')
+_DIGEST = re.compile(r"[0-9a-f]{64}")
+
+# Unreferenced blobs younger than this are kept: a running step may have stored
+# one that no audit row or checkpoint mentions yet
+DEFAULT_PRUNE_GRACE = 3600
+
+
+class BlobRef(dict):
+    """
+    Reference to a stored value: {"$blob": <sha256>, "kind": "text"|"bytes"|"json", "size": <bytes>}.
+    A plain dict, so the context and audit rows serialize it as is.
+    """
+
+    @property
+    def digest(self) -> str:
+        return self["$blob"]
+
+
+def is_ref(value: Any) -> bool:
+    """A BlobRef, or a dict of the same shape read back from JSON (audit rows, checkpoints)"""
+    return isinstance(value, dict) and len(value) == 3 and value.keys() == REF_KEYS
+
+
+def find_references(text: Union[str, bytes, None]) -> Set[str]:
+    """Digests referenced in serialized JSON"""
+    if not text:
+        return set()
+    if isinstance(text, bytes):
+        text = text.decode("utf-8", "replace")
+    if '"$blob"' not in text:
+        return set()
+    return set(REF_PATTERN.findall(text))
+
+
+def _revive(value: dict) -> dict:
+    return BlobRef(value) if is_ref(value) else value
+
+
+def _exceeds(value: Any, limit: int) -> bool:
+    """Whether the serialized value is roughly larger than limit, stopping as soon as it is"""
+    size = 0
+    stack = [value]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, BlobRef):
+            size += 96
+        elif isinstance(item, dict):
+            size += 2 + 4 * len(item) + sum(len(str(k)) for k in item)
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple)):
+            size += 2 + 2 * len(item)
+            stack.extend(item)
+        elif isinstance(item, (str, bytes)):
+            size += len(item) + 2
+        else:
+            size += 8
+        if size > limit:
+            return True
+    return False
+
+
+class BlobStore:
+    """
+    负责按内容寻址存储大对象（页面文本、提取结果、截图），上下文与审计日志中只保留引用
+
+    Blobs are files named by the SHA-256 of their content under
+    <directory>/<first two hex digits>/, written once through a temporary file
+    and an atomic rename, so identical values (the same page in many runs) are
+    stored once and concurrent writers never see a partial file.
+    """
+
+    def __init__(self, directory: str = "blobs", threshold: int = DEFAULT_THRESHOLD,
+                 cache_bytes: int = DEFAULT_CACHE_BYTES):
+        self.directory = directory
+        self.threshold = max(1, int(threshold))
+        self.cache_bytes = max(0, int(cache_bytes))
+        self._cache: "OrderedDict[str, bytes]" = OrderedDict()
+        self._cached = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, digest: str) -> str:
+        return os.path.join(self.directory, digest[:2], digest)
+
+    def put(self, data: bytes) -> str:
+        """Store bytes; returns their digest (nothing is written when they are already stored)"""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path(digest)
+        try:
+            # Stored already: refresh its age, so a concurrent prune() keeps it
+            os.utime(path)
+        except FileNotFoundError:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        return digest
+
+    def get(self, digest: str) -> bytes:
+        with self._lock:
+            data = self._cache.get(digest)
+            if data is not None:
+                self._cache.move_to_end(digest)
+                return data
+        with open(self.path(digest), "rb") as f:
+            data = f.read()
+        if len(data) <= self.cache_bytes:
+            with self._lock:
+                if digest not in self._cache:
+                    self._cache[digest] = data
+                    self._cached += len(data)
+                while self._cached > self.cache_bytes:
+                    _, evicted = self._cache.popitem(last=False)
+                    self._cached -= len(evicted)
+        return data
+
+    def __contains__(self, digest: str) -> bool:
+        return os.path.exists(self.path(digest))
+
+    def digests(self) -> Iterator[str]:
+        """Digests of every stored blob"""
+        for _, _, files in os.walk(self.directory):
+            for name in files:
+                if _DIGEST.fullmatch(name):
+                    yield name
+
+    def prune(self, referenced: Iterable[str], grace: float = DEFAULT_PRUNE_GRACE) -> int:
+        """
+        Delete the blobs not in referenced (nor referenced from a json blob that
+        is) and not written or re-stored in the last `grace` seconds; returns how
+        many were deleted
+        """
+        live: Set[str] = set()
+        pending = list(referenced)
+        while pending:
+            digest = pending.pop()
+            if digest in live:
+                continue
+            live.add(digest)
+            try:
+                with open(self.path(digest), "rb") as f:
+                    # Only json blobs (objects and arrays) hold references
+                    head = f.read(1)
+                    if head in (b"{", b"["):
+                        pending.extend(find_references(head + f.read()) - live)
+            except FileNotFoundError:
+                pass
+        cutoff = time.time() - grace
+        removed = 0
+        for digest in list(self.digests()):
+            if digest in live:
+                continue
+            path = self.path(digest)
+            try:
+                if os.path.getmtime(path) > cutoff:
+                    continue
+                os.remove(path)
+            except FileNotFoundError:
+                continue
+            removed += 1
+            with self._lock:
+                data = self._cache.pop(digest, None)
+                if data is not None:
+                    self._cached -= len(data)
+        return removed
+
+    def put_value(self, value: Union[str, bytes, dict, list]) -> BlobRef:
+        if isinstance(value, bytes):
+            kind, data = "bytes", value
+        elif isinstance(value, str):
+            kind, data = "text", value.encode("utf-8")
+        else:
+            kind, data = "json", json.dumps(value, default=str, ensure_ascii=False).encode("utf-8")
+        return BlobRef({"$blob": self.put(data), "kind": kind, "size": len(data)})
+
+    def load(self, ref: BlobRef) -> Any:
+        """The value behind one reference (a json blob may hold further references)"""
+        data = self.get(ref["$blob"])
+        if ref["kind"] == "bytes":
+            return data
+        if ref["kind"] == "text":
+            return data.decode("utf-8")
+        return json.loads(data, object_hook=_revive)
+
+    def resolve(self, value: Any) -> Any:
+        """value with every reference in it replaced by the stored value; unchanged parts are not copied"""
+        if isinstance(value, BlobRef):
+            return self.resolve(self.load(value))
+        if isinstance(value, dict):
+            resolved = {k: self.resolve(v) for k, v in value.items()}
+            return value if all(resolved[k] is value[k] for k in value) else resolved
+        if isinstance(value, list):
+            resolved = [self.resolve(v) for v in value]
+            return value if all(a is b for a, b in zip(resolved, value)) else resolved
+        return value
+
+    def spill(self, value: Any) -> Tuple[Any, bool]:
+        """
+        (value with large parts stored and replaced by references, whether it holds
+        any reference). Strings and bytes over the threshold are stored on their
+        own; a dict or list still over it after that is stored whole.
+        """
+        value, spilled = self._spill(value)
+        if isinstance(value, (dict, list, tuple)) and not isinstance(value, BlobRef) \
+                and _exceeds(value, self.threshold):
+            return self.put_value(value), True
+        return value, spilled
+
+    def _spill(self, value: Any) -> Tuple[Any, bool]:
+        if isinstance(value, BlobRef):
+            return value, True
+        if isinstance(value, (str, bytes)):
+            if len(value) > self.threshold:
+                return self.put_value(value), True
+            return value, False
+        if isinstance(value, dict):
+            if is_ref(value):
+                return BlobRef(value), True
+            spilled = False
+            result = {}
+            for k, v in value.items():
+                result[k], child = self._spill(v)
+                spilled = spilled or child
+            return (result if spilled else value), spilled
+        if isinstance(value, (list, tuple)):
+            items = [self._spill(v) for v in value]
+            if any(child for _, child in items):
+                return [v for v, _ in items], True
+            return value, False
+        return value, False
@@ -1,6 +1,6 @@
 import os
 import shutil
-from typing import Optional, Dict, Any
+from typing import Any, Callable, Dict, Optional
 from playwright.sync_api import sync_playwright, BrowserContext, Page, Playwright
 
 class BrowserContextManager:
@@ -98,6 +98,37 @@ class BrowserContextManager:
         # Return the last active page (usually the visible one)
         return self.context.pages[-1]
 
+    def export_storage_state(self) -> Optional[Dict[str, Any]]:
+        """
+        Cookies/local storage of the persistent context (None when it is not running).
+        Must be called from the thread that started the context.
+        """
+        if not self.context:
+            return None
+        try:
+            return self.context.storage_state()
+        except Exception as e:
+            print(f"[BrowserContextManager] Could not export storage state for workers: {e}")
+            return None
+
+    def isolated_session_factory(self) -> Callable[[], "IsolatedBrowserSession"]:
+        """
+        Factory of browser sessions for concurrent workers, seeded with the persistent
+        context's cookies/local storage. The state is exported once, here, on the
+        calling thread (the one owning the persistent context); the factory only
+        builds sessions, so workers can call it from their own threads.
+        """
+        storage_state = self.export_storage_state()
+        headless, args = self.headless, self.browser_args
+
+        def create() -> "IsolatedBrowserSession":
+            return IsolatedBrowserSession(headless=headless, args=args, storage_state=storage_state)
+        return create
+
+    def create_isolated_session(self) -> "IsolatedBrowserSession":
+        """A single worker session; call from the thread owning the persistent context"""
+        return self.isolated_session_factory()()
+
     def open_url(self, url: str) -> Page:
         """Navigates to a URL using the active page."""
         page = self.get_page()
@@ -117,3 +148,47 @@ class BrowserContextManager:
     def __del__(self):
         """Destructor to ensure cleanup."""
         self.stop()
+
+
+class IsolatedBrowserSession:
+    """
+    A browser context owned by a single worker thread.
+
+    Sync Playwright objects may only be used from the thread that created them, so
+    concurrent workers cannot share the persistent context. Each session starts its
+    own Playwright driver and browser lazily, on first get_page(), in the calling thread.
+    """
+
+    def __init__(self, headless: bool = False, args: list = None, storage_state: Optional[Dict[str, Any]] = None):
+        self.headless = headless
+        self.browser_args = args or []
+        self.storage_state = storage_state
+        self.playwright: Optional[Playwright] = None
+        self.browser = None
+        self.context: Optional[BrowserContext] = None
+        self.page: Optional[Page] = None
+
+    def get_page(self) -> Page:
+        if self.page is None:
+            self.playwright = sync_playwright().start()
+            self.browser = self.playwright.chromium.launch(headless=self.headless, args=self.browser_args)
+            self.context = self.browser.new_context(storage_state=self.storage_state, viewport=None)
+            self.context.add_init_script("""
+                Object.defineProperty(navigator, 'webdriver', {
+                    get: () => undefined
+                });
+            """)
+            self.page = self.context.new_page()
+        return self.page
+
+    def close(self):
+        if self.context:
+            self.context.close()
+            self.context = None
+        if self.browser:
+            self.browser.close()
+            self.browser = None
+        if self.playwright:
+            self.playwright.stop()
+            self.playwright = None
+        self.page = None
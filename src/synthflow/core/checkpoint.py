@@ -0,0 +1,196 @@
+import sqlite3
+import json
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Any, Optional, List
+
+from .blob_store import find_references
+from .context_store import apply_delta, diff_context
+from ..utils.logger import get_logger
+
+
+@dataclass
+class Checkpoint:
+    trace_id: str
+    process_name: str
+    process_json: str
+    # Scope stack, outermost first: {"scope": name, "ip": next instruction, "iteration": loop index}
+    cursor: List[Dict[str, Any]]
+    context: Dict[str, Any]
+    status: str
+    updated_at: str
+
+
+class CheckpointStore:
+    """
+    负责持久化执行游标（作用域栈、循环索引和上下文），用于崩溃后恢复执行
+
+    Saved at every step boundary, so a save must stay cheap however large the
+    context grows: the store keeps one connection, and writes only the top-level
+    context keys changed since the run's previous checkpoint (a full snapshot
+    every full_every saves, which also drops the deltas it supersedes).
+    """
+
+    def __init__(self, db_path: str = "synthflow.db", full_every: int = 100):
+        self.db_path = db_path
+        self.full_every = max(1, int(full_every))
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        # Per running trace: the context last written and the deltas since its full snapshot
+        self._saved: Dict[str, Dict[str, Any]] = {}
+        self._deltas: Dict[str, int] = {}
+        self.logger = get_logger("CheckpointStore")
+        self._init_db()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            # Shared by the engine's threads, serialized by self._lock
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            try:
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            except sqlite3.Error as e:
+                self.logger.warning(f"Could not enable WAL mode for {self.db_path}: {e}")
+        return self._conn
+
+    def _init_db(self):
+        with self._lock, self._connection() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS checkpoints (
+                    trace_id TEXT PRIMARY KEY,
+                    process_name TEXT,
+                    process_json TEXT,
+                    cursor TEXT,
+                    context_snapshot TEXT,
+                    status TEXT,
+                    updated_at TEXT
+                )
+            """)
+            # Context changes since the full context_snapshot, replayed in seq order on load
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS checkpoint_deltas (
+                    trace_id TEXT,
+                    seq INTEGER,
+                    context_delta TEXT,
+                    PRIMARY KEY (trace_id, seq)
+                )
+            """)
+            # Blobs (see BlobStore) the stored contexts refer to, kept by AuditArchiver.prune_blobs
+            exists = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'checkpoint_blobs'").fetchone()
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS checkpoint_blobs (
+                    digest TEXT,
+                    trace_id TEXT,
+                    PRIMARY KEY (digest, trace_id)
+                ) WITHOUT ROWID
+            """)
+            if not exists:
+                for trace_id, text in conn.execute(
+                        "SELECT trace_id, context_snapshot FROM checkpoints UNION ALL "
+                        "SELECT trace_id, context_delta FROM checkpoint_deltas").fetchall():
+                    self._link_blobs(conn, trace_id, text)
+
+    def start(self, trace_id: str, process_name: str, process_json: str):
+        """Register a run; replaces any earlier checkpoint of the same trace"""
+        with self._lock, self._connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO checkpoints (trace_id, process_name, process_json, cursor, context_snapshot, status, updated_at) "
+                "VALUES (?, ?, ?, '[]', '{}', 'running', ?)",
+                (trace_id, process_name, process_json, datetime.now().isoformat())
+            )
+            conn.execute("DELETE FROM checkpoint_deltas WHERE trace_id = ?", (trace_id,))
+            conn.execute("DELETE FROM checkpoint_blobs WHERE trace_id = ?", (trace_id,))
+            # The first save writes the full context
+            self._saved.pop(trace_id, None)
+            self._deltas.pop(trace_id, None)
+
+    def save(self, trace_id: str, cursor: List[Dict[str, Any]], context: Dict[str, Any]):
+        """Store the latest cursor and context of a run (a StateTracker.get_all_context() snapshot)"""
+        now = datetime.now().isoformat()
+        with self._lock, self._connection() as conn:
+            previous = self._saved.get(trace_id)
+            count = self._deltas.get(trace_id, 0)
+            if previous is None or count >= self.full_every:
+                # First save of this store for the run (e.g. a resumed one), or time for a keyframe
+                snapshot = json.dumps(context, default=str)
+                conn.execute(
+                    "UPDATE checkpoints SET cursor = ?, context_snapshot = ?, status = 'running', updated_at = ? WHERE trace_id = ?",
+                    (json.dumps(cursor), snapshot, now, trace_id)
+                )
+                conn.execute("DELETE FROM checkpoint_deltas WHERE trace_id = ?", (trace_id,))
+                conn.execute("DELETE FROM checkpoint_blobs WHERE trace_id = ?", (trace_id,))
+                self._link_blobs(conn, trace_id, snapshot)
+                count = 0
+            else:
+                delta = diff_context(previous, context)
+                if delta:
+                    count += 1
+                    text = json.dumps(delta, default=str)
+                    conn.execute("INSERT OR REPLACE INTO checkpoint_deltas (trace_id, seq, context_delta) VALUES (?, ?, ?)",
+                                 (trace_id, count, text))
+                    self._link_blobs(conn, trace_id, text)
+                conn.execute("UPDATE checkpoints SET cursor = ?, status = 'running', updated_at = ? WHERE trace_id = ?",
+                             (json.dumps(cursor), now, trace_id))
+            self._saved[trace_id] = dict(context)
+            self._deltas[trace_id] = count
+
+    def set_status(self, trace_id: str, status: str):
+        with self._lock, self._connection() as conn:
+            conn.execute("UPDATE checkpoints SET status = ?, updated_at = ? WHERE trace_id = ?",
+                         (status, datetime.now().isoformat(), trace_id))
+            # The run is over in this process; a resume starts from a fresh snapshot
+            self._saved.pop(trace_id, None)
+            self._deltas.pop(trace_id, None)
+
+    def load(self, trace_id: str) -> Optional[Checkpoint]:
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute(
+                "SELECT trace_id, process_name, process_json, cursor, context_snapshot, status, updated_at "
+                "FROM checkpoints WHERE trace_id = ?", (trace_id,)
+            ).fetchone()
+            deltas = conn.execute(
+                "SELECT context_delta FROM checkpoint_deltas WHERE trace_id = ? ORDER BY seq", (trace_id,)
+            ).fetchall()
+        if row is None:
+            return None
+        context = json.loads(row[4])
+        for (delta,) in deltas:
+            apply_delta(context, json.loads(delta))
+        return Checkpoint(
+            trace_id=row[0],
+            process_name=row[1],
+            process_json=row[2],
+            cursor=json.loads(row[3]),
+            context=context,
+            status=row[5],
+            updated_at=row[6],
+        )
+
+    def list_resumable(self) -> List[Dict[str, Any]]:
+        """Runs that did not complete (crashed, failed or cancelled)"""
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT trace_id, process_name, status, updated_at FROM checkpoints "
+                "WHERE status != 'completed' ORDER BY updated_at DESC"
+            ).fetchall()
+        return [{"trace_id": r[0], "process_name": r[1], "status": r[2], "updated_at": r[3]} for r in rows]
+
+    def delete(self, trace_id: str):
+        with self._lock, self._connection() as conn:
+            conn.execute("DELETE FROM checkpoints WHERE trace_id = ?", (trace_id,))
+            conn.execute("DELETE FROM checkpoint_deltas WHERE trace_id = ?", (trace_id,))
+            conn.execute("DELETE FROM checkpoint_blobs WHERE trace_id = ?", (trace_id,))
+            self._saved.pop(trace_id, None)
+            self._deltas.pop(trace_id, None)
+
+    @staticmethod
+    def _link_blobs(conn: sqlite3.Connection, trace_id: str, text: Optional[str]):
+        conn.executemany("INSERT OR IGNORE INTO checkpoint_blobs (digest, trace_id) VALUES (?, ?)",
+                         ((digest, trace_id) for digest in find_references(text)))
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
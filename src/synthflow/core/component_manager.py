@@ -1,3 +1,4 @@
+import threading
 from typing import Dict, Type, Optional, Any
 from ..components.base import Component
 from ..utils.logger import get_logger
@@ -10,6 +11,7 @@ class ComponentManager:
     def __init__(self):
         self._components: Dict[str, Type[Component]] = {}
         self._instances: Dict[str, Component] = {}
+        self._lock = threading.Lock()
         self.logger = get_logger("ComponentManager")
 
     def register_component(self, component_type: str, component_cls: Type[Component]):
@@ -30,14 +32,20 @@ class ComponentManager:
         # Here let's cache instances by type (singleton per type for now, or per request if needed)
         # The design implies "getComponent" might return an instance.
         
-        if component_type not in self._instances:
-            cls = self._components[component_type]
-            instance = cls()
-            if config:
-                instance.initialize(config)
-            else:
-                instance.initialize({})
-            self._instances[component_type] = instance
+        instance = self._instances.get(component_type)
+        if instance is not None:
+            return instance
+
+        # Steps may run concurrently (for_each/parallel/dag); create each singleton once
+        with self._lock:
+            if component_type not in self._instances:
+                cls = self._components[component_type]
+                instance = cls()
+                if config:
+                    instance.initialize(config)
+                else:
+                    instance.initialize({})
+                self._instances[component_type] = instance
             
         return self._instances[component_type]
 
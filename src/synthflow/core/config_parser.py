@@ -2,7 +2,9 @@ import yaml
 import json
 import os
 from typing import Dict, Any, List, Optional, Union
-from pydantic import BaseModel, Field, ValidationError
+from pydantic import BaseModel, Field, ValidationError, PrivateAttr
+
+from .expression import compile_condition
 
 # --- L-A-V-D Data Structures ---
 
@@ -37,11 +39,46 @@ class LoopModel(BaseModel):
     count: Optional[int] = None
     condition: Optional[str] = None
     items: Optional[str] = None # For for_each, e.g., "${list_variable}"
+    item_var: str = "loop_item" # For for_each: context name of the current item
+    concurrency: int = Field(1, ge=1) # For for_each: items processed at once, each on its own page
     steps: List['StepModel'] = Field(default_factory=list)
 
 class BranchModel(BaseModel):
-    condition: str
+    # No condition means the branch always matches (else-branch / unconditional parallel branch)
+    condition: Optional[str] = None
     steps: List['StepModel'] = Field(default_factory=list)
+    # For parallel steps: namespace of the branch outputs and its error policy
+    name: Optional[str] = None
+    on_error: Optional[str] = None # None/"fail" fails the parallel step, "continue" records the error
+
+    # Compiled condition closure, built on first use
+    _compiled_condition: Any = PrivateAttr(default=None)
+
+    def compiled_condition(self):
+        if self._compiled_condition is None:
+            if self.condition is None or not self.condition.strip():
+                self._compiled_condition = lambda lookup: True
+            else:
+                self._compiled_condition = compile_condition(self.condition)
+        return self._compiled_condition
+
+class RetryModel(BaseModel):
+    attempts: int = Field(3, ge=1) # Total attempts, including the first one
+    backoff: float = Field(0.5, ge=0) # Delay before the first retry (seconds)
+    multiplier: float = Field(2.0, ge=1) # Exponential growth of the delay per retry
+    max_delay: float = Field(30.0, ge=0)
+    jitter: float = Field(0.1, ge=0, le=1) # +/- fraction of randomness added to each delay
+    retry_on: List[str] = Field(default_factory=list) # Exception class names; empty = any error
+    recovery: List['StepModel'] = Field(default_factory=list) # Run before each retry, e.g. reload page
+
+class CacheModel(BaseModel):
+    enabled: bool = True
+    ttl: Optional[float] = Field(None, gt=0) # Seconds; None = until invalidated/evicted
+    persist: bool = False # Also store in the SQLite tier (survives restarts)
+
+class ParallelModel(BaseModel):
+    join: str = Field("all", description="e.g., all, any, first_success")
+    max_workers: Optional[int] = Field(None, ge=1) # Defaults to one worker per branch
 
 class StepModel(BaseModel):
     id: str
@@ -60,20 +97,43 @@ class StepModel(BaseModel):
     # Logic structures
     loop: Optional[LoopModel] = None
     branches: Optional[List[BranchModel]] = None
+    parallel: Optional[ParallelModel] = None # Join settings for type "parallel" (branches run concurrently)
+
+    # Seconds for the whole step, retries and nested steps included. Enforcement is
+    # cooperative: components get the remaining budget (context "_deadline"/"_timeout") and
+    # must bound their own waits; the sync engine checks the deadline between steps and
+    # when a component returns, so a component that ignores it can overrun (the async
+    # engine abandons it instead)
+    timeout: Optional[float] = Field(None, gt=0)
 
     next_step: Optional[str] = None
-    on_error: Optional[str] = None
+    on_error: Optional[str] = None # fail (default), continue, skip (end current scope), retry
+    retry: Optional[RetryModel] = None
+    cache: Optional[CacheModel] = None # Memoize the result by component type + resolved params
+    keep_output: bool = False # Exempt "<id>.output" from the process output_retention policy
 
 # Resolve forward references
 StepModel.update_forward_refs()
 LoopModel.update_forward_refs()
 BranchModel.update_forward_refs()
+RetryModel.update_forward_refs()
 
 class ProcessModel(BaseModel):
     name: str
     version: str = "1.0"
     description: Optional[str] = None
     steps: List[StepModel]
+    # "dag" runs independent top-level steps concurrently, inferring dependencies from templates/bindings
+    execution_mode: str = "sequential"
+    max_workers: Optional[int] = Field(None, ge=1)
+    # Persist an execution cursor at step boundaries so the run can be resumed (sequential mode)
+    checkpoint: bool = False
+    timeout: Optional[float] = Field(None, gt=0) # Seconds for the whole run
+    # What happens to step outputs no later step references: "keep", "drop" or "spill" (to the audit log)
+    output_retention: str = "keep"
+
+    # Execution plan compiled from this model, built on first run (see ExecutionEngine.compile)
+    _plan: Any = PrivateAttr(default=None)
     
     def get_step(self, step_id: str) -> Optional[StepModel]:
         for step in self.steps:
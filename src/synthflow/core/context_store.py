@@ -0,0 +1,278 @@
+import threading
+from collections.abc import Mapping
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterator, Optional, Sequence, Tuple, Union
+
+from .blob_store import BlobRef, BlobStore
+
+# Path index entries kept before the index is reset (paths come from templates, so few)
+MAX_INDEXED_PATHS = 4096
+
+_MISSING = object()
+
+
+# In a context delta: top-level keys removed since the previous record
+DELETED_KEY = "__deleted__"
+
+
+def diff_context(previous: Dict[str, Any], current: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Delta between two snapshots (top-level keys set or replaced, plus DELETED_KEY).
+    Values are never mutated in place by ContextStore, so identity tells what changed.
+    """
+    delta = {key: value for key, value in current.items() if previous.get(key, _MISSING) is not value}
+    deleted = [key for key in previous if key not in current]
+    if deleted:
+        delta[DELETED_KEY] = deleted
+    return delta
+
+
+def apply_delta(context: Dict[str, Any], delta: Dict[str, Any]):
+    """Apply a delta from diff_context()/ContextStore.take_changes() to a plain dict, in place"""
+    for key in delta.get(DELETED_KEY, ()):
+        context.pop(key, None)
+    context.update((key, value) for key, value in delta.items() if key != DELETED_KEY)
+
+
+@lru_cache(maxsize=4096)
+def split_path(path: str) -> Tuple[str, ...]:
+    """'step_x.output.text' -> ('step_x', 'output', 'text'); parsed once per path"""
+    return tuple(path.split("."))
+
+
+class ContextStore:
+    """
+    负责存储流程上下文：真正的嵌套结构、按路径索引的 O(1) 读取、读不加锁
+
+    Dotted keys are stored nested ("step_x.output" is root["step_x"]["output"]).
+    Writers serialize on a lock and never mutate a dict a reader may hold: the
+    dicts along the written path are copied and the new top-level value is put
+    in place with a single assignment. Reads take no lock, so a reader (e.g. the
+    web thread) never blocks the engine, and a snapshot is one shallow copy.
+
+    Resolved paths are memoized per top-level key version, so a hot path such as
+    "step_x.output" is one dict lookup after the first read.
+
+    With a BlobStore, large values are stored there on write and only their
+    references kept (and snapshotted); reads load them back transparently.
+    """
+
+    def __init__(self, initial: Optional[Dict[str, Any]] = None, blobs: Optional[BlobStore] = None):
+        self._root: Dict[str, Any] = {}
+        self._blobs = blobs
+        # Top-level keys that may hold blob references (read without the path index)
+        self._blob_keys: set = set()
+        self._lock = threading.Lock()
+        # Bumped on every write below a top-level key; invalidates its index entries
+        self._versions: Dict[str, int] = {}
+        self._index: Dict[str, Tuple[int, Any]] = {}
+        # Top-level keys written since the last take_changes()/snapshot(clear_changes=True)
+        self._dirty: set = set()
+        if initial:
+            self.update(initial)
+
+    def get(self, path: str, default: Any = None) -> Any:
+        if "." not in path:
+            if path in self._blob_keys:
+                return self._blobs.resolve(self._root.get(path, default))
+            return self._root.get(path, default)
+        keys = split_path(path)
+        top = keys[0]
+        if top in self._blob_keys:
+            # Not memoized: the index would pin the loaded values in memory
+            value = self._walk(keys)
+            return default if value is _MISSING else self._blobs.resolve(value)
+        entry = self._index.get(path)
+        # Read the version before walking: a write racing this read then leaves
+        # an entry stamped with the old version, which is simply never used
+        version = self._versions.get(top, 0)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+        value = self._walk(keys)
+        if value is _MISSING:
+            return default
+        if len(self._index) >= MAX_INDEXED_PATHS:
+            self._index = {}
+        self._index[path] = (version, value)
+        return value
+
+    def _walk(self, keys: Tuple[str, ...]) -> Any:
+        value = self._root
+        for key in keys:
+            if isinstance(value, BlobRef) and self._blobs is not None:
+                value = self._blobs.load(value)
+            if not isinstance(value, dict) or key not in value:
+                return _MISSING
+            value = value[key]
+        return value
+
+    def owns(self, key: str) -> bool:
+        """Whether a top-level key is set here (for layered lookups that shadow whole names)"""
+        return key in self._root
+
+    def __contains__(self, path: str) -> bool:
+        return self.get(path, _MISSING) is not _MISSING
+
+    def set(self, path: str, value: Any):
+        keys = split_path(path)
+        top = keys[0]
+        spilled = False
+        if self._blobs is not None:
+            # Stored outside the lock: hashing and writing large values must not stall other writers
+            value, spilled = self._blobs.spill(value)
+        with self._lock:
+            if len(keys) > 1:
+                # Copy the dicts along the path (a non-dict in the way is replaced)
+                value = self._assoc(self._root.get(top), keys[1:], value)
+            self._root[top] = value
+            if spilled:
+                self._blob_keys.add(top)
+            elif len(keys) == 1:
+                self._blob_keys.discard(top)
+            # After the value is in place (see get)
+            self._versions[top] = self._versions.get(top, 0) + 1
+            self._dirty.add(top)
+
+    def _assoc(self, node: Any, keys: Tuple[str, ...], value: Any) -> Dict[str, Any]:
+        if isinstance(node, BlobRef):
+            # Writing below a stored value: it becomes an inline dict again
+            node = self._blobs.load(node)
+        node = dict(node) if isinstance(node, dict) else {}
+        node[keys[0]] = value if len(keys) == 1 else self._assoc(node.get(keys[0]), keys[1:], value)
+        return node
+
+    def delete(self, path: str):
+        keys = split_path(path)
+        top = keys[0]
+        with self._lock:
+            if top not in self._root:
+                return
+            if len(keys) == 1:
+                del self._root[top]
+                self._blob_keys.discard(top)
+            else:
+                parent = self._walk(keys[:-1])
+                if not isinstance(parent, dict) or keys[-1] not in parent:
+                    return
+                trimmed = dict(parent)
+                del trimmed[keys[-1]]
+                if len(keys) == 2:
+                    self._root[top] = trimmed
+                else:
+                    self._root[top] = self._assoc(self._root[top], keys[1:-1], trimmed)
+            self._versions[top] = self._versions.get(top, 0) + 1
+            self._dirty.add(top)
+
+    def update(self, values: Dict[str, Any]):
+        for key, value in values.items():
+            self.set(key, value)
+
+    def replace(self, values: Dict[str, Any]):
+        """Swap in a whole new context (flat dotted keys, e.g. from old checkpoints, are nested)"""
+        store = ContextStore(values, blobs=self._blobs)
+        with self._lock:
+            for key in set(self._root) | set(store._root):
+                self._versions[key] = self._versions.get(key, 0) + 1
+            # Keys only in the old context are recorded as deleted
+            self._dirty = set(self._root) | set(store._root)
+            self._root = store._root
+            self._blob_keys = store._blob_keys
+
+    def snapshot(self, clear_changes: bool = False) -> Dict[str, Any]:
+        """
+        Shallow copy of the whole context. Nested dicts are never mutated in
+        place by the store, so the copy stays consistent without a deep copy.
+        Stored values appear as their references.
+        """
+        if not clear_changes:
+            # dict.copy() runs without releasing the GIL: consistent, and lock-free
+            return self._root.copy()
+        with self._lock:
+            self._dirty.clear()
+            return self._root.copy()
+
+    def take_changes(self) -> Dict[str, Any]:
+        """
+        Delta since the previous call (see apply_delta): top-level keys written,
+        with their values, and those deleted under DELETED_KEY
+        """
+        with self._lock:
+            changes = {key: self._root[key] for key in self._dirty if key in self._root}
+            deleted = sorted(key for key in self._dirty if key not in self._root)
+            self._dirty.clear()
+        if deleted:
+            changes[DELETED_KEY] = deleted
+        return changes
+
+    def keys(self):
+        return self._root.copy().keys()
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._root.copy())
+
+    def __len__(self) -> int:
+        return len(self._root)
+
+
+class ContextView(Mapping):
+    """
+    Read-only overlay handed to components: layers are searched in order (the
+    injected handles, then the frame scopes innermost first, then the context),
+    like a ChainMap, without copying any of them. Dotted paths resolve through
+    the nested stores. Writes go through set(), which the engine routes to the
+    scope the component runs in.
+    """
+
+    __slots__ = ("_layers", "_writer")
+
+    def __init__(self, layers: Sequence[Union[ContextStore, Dict[str, Any]]],
+                 writer: Optional[Callable[[str, Any], None]] = None):
+        self._layers = tuple(layers)
+        self._writer = writer
+
+    def _find(self, key: str) -> Any:
+        root = split_path(key)[0] if "." in key else key
+        for layer in self._layers:
+            if isinstance(layer, ContextStore):
+                # A layer holding a top-level name owns every path below it
+                if layer.owns(root):
+                    return layer.get(key, _MISSING)
+            elif key in layer:
+                return layer[key]
+        return _MISSING
+
+    def __getitem__(self, key: str) -> Any:
+        value = self._find(key)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = self._find(key)
+        return default if value is _MISSING else value
+
+    def __contains__(self, key: object) -> bool:
+        return isinstance(key, str) and self._find(key) is not _MISSING
+
+    def __iter__(self) -> Iterator[str]:
+        seen = set()
+        for layer in self._layers:
+            for key in layer:
+                if key not in seen:
+                    seen.add(key)
+                    yield key
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __setitem__(self, key: str, value: Any):
+        raise TypeError("The component context is read-only; use context.set(key, value) to write")
+
+    def set(self, key: str, value: Any):
+        """Write a value to the scope the step runs in (the process context, or its loop item / branch)"""
+        if self._writer is None:
+            raise TypeError("This context view is read-only")
+        self._writer(key, value)
+
+    def __repr__(self) -> str:
+        return f"ContextView({len(self._layers)} layers)"
@@ -0,0 +1,119 @@
+import asyncio
+import threading
+import time
+from typing import Callable, List, Optional
+
+
+class ExecutionCancelled(Exception):
+    """Raised inside a run once it has been cancelled"""
+
+    def __init__(self, message: str = "Execution cancelled"):
+        super().__init__(message)
+
+
+class ExecutionControl:
+    """
+    负责向执行引擎和组件传递暂停/恢复/取消信号，使阻塞等待可以被及时中断
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._running = threading.Event()
+        self._running.set()
+        self._cancelled = threading.Event()
+        # Callbacks woken on every state change (condition waits elsewhere, event loops)
+        self._wakers: List[Callable[[], None]] = []
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    @property
+    def paused(self) -> bool:
+        return not self._running.is_set()
+
+    def pause(self):
+        self._running.clear()
+        self._wake()
+
+    def resume(self):
+        self._running.set()
+        self._wake()
+
+    def cancel(self):
+        self._cancelled.set()
+        # Parked runs must wake up to observe the cancellation
+        self._running.set()
+        self._wake()
+
+    def reset(self):
+        """Clear a previous cancel/pause before a new run"""
+        self._cancelled.clear()
+        self._running.set()
+
+    def add_waker(self, waker: Callable[[], None]):
+        with self._lock:
+            self._wakers.append(waker)
+
+    def remove_waker(self, waker: Callable[[], None]):
+        with self._lock:
+            if waker in self._wakers:
+                self._wakers.remove(waker)
+
+    def _wake(self):
+        with self._lock:
+            wakers = list(self._wakers)
+        for waker in wakers:
+            waker()
+
+    def raise_if_cancelled(self):
+        if self._cancelled.is_set():
+            raise ExecutionCancelled()
+
+    def checkpoint(self):
+        """Park while paused (blocking, no polling); raise ExecutionCancelled once cancelled"""
+        self.raise_if_cancelled()
+        if not self._running.is_set():
+            self._running.wait()
+        self.raise_if_cancelled()
+
+    def sleep(self, seconds: float):
+        """time.sleep that ends early on cancel; a pause extends it until resumed"""
+        if seconds > 0 and self._cancelled.wait(seconds):
+            raise ExecutionCancelled()
+        self.checkpoint()
+
+    async def checkpoint_async(self):
+        """Awaitable checkpoint(): parks the task, not the event loop"""
+        while True:
+            self.raise_if_cancelled()
+            if self._running.is_set():
+                return
+            await self._wait_for_change(None)
+
+    async def sleep_async(self, seconds: float):
+        """asyncio.sleep that ends early on cancel; a pause extends it until resumed"""
+        end = time.monotonic() + seconds
+        while True:
+            self.raise_if_cancelled()
+            remaining = end - time.monotonic()
+            if remaining <= 0:
+                break
+            await self._wait_for_change(remaining)
+        await self.checkpoint_async()
+
+    async def _wait_for_change(self, timeout: Optional[float]):
+        loop = asyncio.get_running_loop()
+        changed = asyncio.Event()
+        waker = lambda: loop.call_soon_threadsafe(changed.set)
+        self.add_waker(waker)
+        try:
+            # Re-check after registering so a change in between is not missed
+            if self.cancelled or (timeout is None and self._running.is_set()):
+                return
+            try:
+                await asyncio.wait_for(changed.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        finally:
+            self.remove_waker(waker)
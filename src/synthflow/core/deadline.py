@@ -0,0 +1,73 @@
+import time
+from typing import Optional
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when a step or process runs past its time budget"""
+
+    def __init__(self, scope: str, budget: Optional[float] = None):
+        self.scope = scope
+        self.budget = budget
+        detail = f" ({budget:g}s)" if budget is not None else ""
+        super().__init__(f"Deadline exceeded for {scope}{detail}")
+
+
+class Deadline:
+    """
+    An absolute point in (monotonic) time by which work must finish.
+    Nested deadlines never extend their parent: child() returns the earlier of the two.
+    """
+
+    __slots__ = ("expires_at", "scope", "budget")
+
+    def __init__(self, expires_at: Optional[float] = None, scope: str = "process", budget: Optional[float] = None):
+        self.expires_at = expires_at
+        self.scope = scope
+        self.budget = budget
+
+    @classmethod
+    def after(cls, seconds: Optional[float], scope: str = "process") -> "Deadline":
+        if seconds is None:
+            return cls(None, scope)
+        return cls(time.monotonic() + seconds, scope, seconds)
+
+    @property
+    def bounded(self) -> bool:
+        return self.expires_at is not None
+
+    def child(self, seconds: Optional[float], scope: str) -> "Deadline":
+        if seconds is None:
+            return self
+        candidate = Deadline.after(seconds, scope)
+        if self.expires_at is not None and self.expires_at <= candidate.expires_at:
+            return self
+        return candidate
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left (never negative), or None when unbounded"""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return self.expires_at is not None and time.monotonic() >= self.expires_at
+
+    def check(self):
+        if self.expired():
+            raise DeadlineExceeded(self.scope, self.budget)
+
+    def clamp(self, seconds: float) -> float:
+        """Limit a wait (seconds) to the remaining budget"""
+        remaining = self.remaining()
+        return seconds if remaining is None else min(seconds, remaining)
+
+    def clamp_ms(self, timeout_ms: float) -> float:
+        """Limit a Playwright timeout (milliseconds); at least 1 ms, as 0 means 'no timeout' there"""
+        remaining = self.remaining()
+        if remaining is None:
+            return timeout_ms
+        return max(1.0, min(timeout_ms, remaining * 1000))
+
+
+# Shared unbounded deadline
+NO_DEADLINE = Deadline()
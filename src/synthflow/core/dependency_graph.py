@@ -0,0 +1,140 @@
+from dataclasses import dataclass
+from typing import List, Set, FrozenSet, Tuple
+
+from .config_parser import StepModel
+from .execution_plan import ExecutionScope, COMPONENT_ALIASES
+from .expression import condition_refs
+from .template import compile_value, compile_template
+
+# Component types that drive the shared browser or the shared human-interaction slot
+BARRIER_COMPONENTS = {"operation_executor", "human_interaction"}
+
+
+@dataclass(frozen=True)
+class StepEffects:
+    """Context paths a step reads and writes, and whether it must be serialized"""
+    reads: FrozenSet[str]
+    writes: FrozenSet[str]
+    barrier: bool
+
+
+def overlaps(a: str, b: str) -> bool:
+    """True if one path equals or contains the other ('x.output' vs 'x.output.text')"""
+    if a == b:
+        return True
+    longer, shorter = (a, b) if len(a) > len(b) else (b, a)
+    return longer.startswith(shorter) and longer[len(shorter)] in ".["
+
+
+def _any_overlap(paths_a: FrozenSet[str], paths_b: FrozenSet[str]) -> bool:
+    return any(overlaps(a, b) for a in paths_a for b in paths_b)
+
+
+def step_reads(step: StepModel) -> FrozenSet[str]:
+    """Context paths the step itself reads (templates, loop items, branch conditions), nested steps excluded"""
+    reads: Set[str] = set(compile_value(step.params or {}).refs)
+    for section in (step.locator, step.action, step.verification):
+        if section is not None:
+            reads.update(compile_value(section.model_dump()).refs)
+    if step.type == "loop" and step.loop and step.loop.items:
+        items = step.loop.items
+        if "${" in items:
+            reads.update(compile_template(items).refs)
+        else:
+            reads.add(items)
+    if step.type in ("condition", "parallel"):
+        for branch in step.branches or []:
+            if branch.condition:
+                reads.update(condition_refs(branch.condition))
+    return frozenset(reads)
+
+
+def analyze_step(step: StepModel) -> StepEffects:
+    """
+    Infer read/write sets from ${...} templates, conditions, loop items and data bindings.
+    Steps that touch the browser, wait for a human or use explicit next_step jumps are
+    barriers: they run alone, after everything before them and before everything after.
+    """
+    reads: Set[str] = set(step_reads(step))
+    writes: Set[str] = {f"{step.id}.output"}
+    barrier = bool(step.next_step)
+
+    if step.data and step.data.outputs:
+        writes.update(step.data.outputs.keys())
+
+    if step.type == "loop" and step.loop:
+        loop = step.loop
+        writes.add("loop_index")
+        if loop.type == "for_each":
+            writes.add(loop.item_var)
+        if loop.type == "while_element":
+            barrier = True
+        nested = [analyze_step(s) for s in loop.steps]
+    elif step.type in ("condition", "parallel"):
+        nested = []
+        for i, branch in enumerate(step.branches or []):
+            if step.type == "parallel":
+                writes.add(f"{step.id}.{branch.name or f'branch_{i}'}")
+            nested.extend(analyze_step(s) for s in branch.steps)
+    else:
+        nested = []
+        component = COMPONENT_ALIASES.get(step.type, step.type)
+        if component in BARRIER_COMPONENTS or step.locator or step.action:
+            barrier = True
+
+    for effects in nested:
+        reads.update(effects.reads)
+        if step.type != "parallel":
+            # Parallel branches publish their writes under the branch namespace only
+            writes.update(effects.writes)
+        barrier = barrier or effects.barrier
+
+    # Recovery steps run in the step's own scope before a retry
+    for effects in (analyze_step(s) for s in (step.retry.recovery if step.retry else [])):
+        reads.update(effects.reads)
+        writes.update(effects.writes)
+        barrier = barrier or effects.barrier
+
+    return StepEffects(reads=frozenset(reads), writes=frozenset(writes), barrier=barrier)
+
+
+@dataclass(frozen=True)
+class DependencyGraph:
+    """Dependencies between the instructions of one scope (indices into scope.instructions)"""
+    effects: Tuple[StepEffects, ...]
+    deps: Tuple[FrozenSet[int], ...]
+
+    @property
+    def size(self) -> int:
+        return len(self.deps)
+
+    def dependents(self) -> List[List[int]]:
+        result: List[List[int]] = [[] for _ in self.deps]
+        for node, deps in enumerate(self.deps):
+            for dep in deps:
+                result[dep].append(node)
+        return result
+
+
+def build_dependency_graph(scope: ExecutionScope) -> DependencyGraph:
+    steps = [instr.step for instr in scope.instructions]
+    jump_targets = {s.next_step for s in steps if s.next_step}
+    effects = []
+    for s in steps:
+        e = analyze_step(s)
+        if s.id in jump_targets and not e.barrier:
+            e = StepEffects(reads=e.reads, writes=e.writes, barrier=True)
+        effects.append(e)
+
+    deps = []
+    for j, later in enumerate(effects):
+        node_deps = set()
+        for i in range(j):
+            earlier = effects[i]
+            if (earlier.barrier or later.barrier
+                    or _any_overlap(later.reads, earlier.writes)    # read after write
+                    or _any_overlap(later.writes, earlier.reads)    # write after read
+                    or _any_overlap(later.writes, earlier.writes)): # write after write
+                node_deps.add(i)
+        deps.append(frozenset(node_deps))
+    return DependencyGraph(effects=tuple(effects), deps=tuple(deps))
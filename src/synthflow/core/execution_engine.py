@@ -1,11 +1,23 @@
 import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
 from typing import Dict, Any, Optional, List
 from enum import Enum
 
-from .config_parser import ProcessModel, StepModel
+from .config_parser import ProcessModel, CacheModel
+from .execution_plan import PlanCompiler, ExecutionPlan, ExecutionScope, Instruction, KIND_LOOP, KIND_CONDITION, KIND_PARALLEL
 from .component_manager import ComponentManager
+from .dependency_graph import DependencyGraph
 from .strategy_manager import StrategyManager
 from .state_tracker import StateTracker
+from .context_store import ContextStore, ContextView, split_path
+from .checkpoint import CheckpointStore
+from .retry import is_retryable, retry_delay
+from .deadline import Deadline, DeadlineExceeded, NO_DEADLINE
+from .control import ExecutionControl, ExecutionCancelled
+from .result_cache import ResultCache, ComponentCache, cache_key, MISS as CACHE_MISS
+from .template import compile_template, compile_path, MISSING
+from .worker_pool import WorkerPool, WorkerSlot, JobResult
 from ..utils.logger import get_logger
 
 class ExecutionStatus(Enum):
@@ -22,6 +34,85 @@ class ExecutionResult:
         self.data = data or {}
         self.error = error
 
+class _ExecutionFrame:
+    """
+    A scope pushed for a loop iteration or for a body running on its own.
+
+    `scope` holds the frame's own variables (loop_index, the item variable,
+    "<loop_id>.index"); they shadow outer values for reads only, so nested
+    loops each see their own index whatever inner loops publish. Reads fall
+    through to the parent frame and then to the tracker context. An isolated
+    frame (one for_each item, one parallel branch) keeps its writes until they
+    are merged back; a transparent one (a count/while iteration) passes them on
+    to the enclosing scope.
+    """
+    __slots__ = ("parent", "scope", "variables", "written", "isolated", "browser", "cancel_event", "deadline")
+
+    def __init__(self, parent: Optional["_ExecutionFrame"], scope: Dict[str, Any],
+                 browser: Optional[WorkerSlot] = None, cancel_event: Optional[threading.Event] = None,
+                 deadline: Optional[Deadline] = None, isolated: bool = True):
+        self.parent = parent
+        self.scope = ContextStore(scope)
+        self.isolated = isolated
+        self.variables = ContextStore()
+        # Flat record of the frame's writes, in order (becomes "<loop_id>.output" entries)
+        self.written: Dict[str, Any] = {}
+        self.browser = browser if browser is not None else (parent.browser if parent else None)
+        self.cancel_event = cancel_event if cancel_event is not None else (parent.cancel_event if parent else None)
+        # Deadline in force where the frame was created (worker threads pick it up from here)
+        self.deadline = deadline if deadline is not None else (parent.deadline if parent else None)
+
+    def set(self, key: str, value: Any):
+        self.variables.set(key, value)
+        self.written[key] = value
+
+    def cancelled(self) -> bool:
+        return self.cancel_event is not None and self.cancel_event.is_set()
+
+class _DagSchedule:
+    """
+    Ready-set bookkeeping of a dependency-graph run, shared by the thread-pool and
+    asyncio schedulers: which node may start next, and what a finished node releases.
+    """
+
+    def __init__(self, graph: DependencyGraph, on_error):
+        self.graph = graph
+        self.remaining = [set(d) for d in graph.deps]
+        self.dependents = graph.dependents()
+        self.ready = [i for i, d in enumerate(self.remaining) if not d]
+        # on_error(node, error) re-raises unless the step's on_error allows continuing
+        self.on_error = on_error
+        self.failure: Optional[Exception] = None
+        self.halted = False
+
+    def take(self, running) -> Optional[int]:
+        """Next node to start, or None if none may start while `running` are in flight"""
+        if self.halted or not self.ready:
+            return None
+        self.ready.sort()
+        node = self.ready[0]
+        if self.graph.effects[node].barrier and running:
+            # Barriers depend on everything before them; nothing else can be running
+            return None
+        return self.ready.pop(0)
+
+    def settle(self, node: int, action: Optional[str], error: Optional[Exception]):
+        """Record a finished node; a failure, skip or stop halts scheduling"""
+        if error is not None:
+            try:
+                self.on_error(node, error)
+            except Exception as e:
+                self.failure = self.failure or e
+                self.halted = True
+                return
+        for dependent in self.dependents[node]:
+            self.remaining[dependent].discard(node)
+            if not self.remaining[dependent]:
+                self.ready.append(dependent)
+        if action in ("skip", "stop"):
+            self.halted = True
+
+
 class ExecutionEngine:
     """
     负责协调流程执行，管理组件生命周期
@@ -30,316 +121,885 @@ class ExecutionEngine:
     def __init__(self, 
                  component_manager: ComponentManager,
                  strategy_manager: StrategyManager,
-                 state_tracker: StateTracker):
+                 state_tracker: StateTracker,
+                 checkpoint_store: Optional[CheckpointStore] = None,
+                 result_cache: Optional[ResultCache] = None):
         self.cm = component_manager
         self.sm = strategy_manager
         self.tracker = state_tracker
         self._status = ExecutionStatus.PENDING
         # self._context removed, use tracker context
+        self.compiler = PlanCompiler()
+        self._local = threading.local()
+        # Default browser session for this run when no frame provides one
+        # (e.g. the worker's session assigned by BatchRunner); None = shared persistent page
+        self.browser = None
+        # Deadline of the whole run; step deadlines are layered on top per thread/frame
+        self._deadline: Deadline = NO_DEADLINE
+        # Pause/resume/cancel signals, shared with components and blocking waits
+        self.control = ExecutionControl()
+        self.checkpoints = checkpoint_store
+        # Step result memoization (shared instances can be passed in, e.g. across a batch)
+        self.result_cache = result_cache
+        self._cache_policies: Dict[str, CacheModel] = {}
+        # Dead-output releases of the running plan (empty under output_retention "keep")
+        self._releases: Dict[str, Dict[int, Any]] = {}
+        self._retention = "keep"
+        # Scope stack of the running process when checkpointing, and the stack to resume into
+        self._cursor: Optional[List[Dict[str, Any]]] = None
+        self._resume: List[Dict[str, Any]] = []
         self.logger = get_logger("ExecutionEngine")
 
-    def _resolve_params(self, params: Dict[str, Any]) -> Dict[str, Any]:
-        resolved = {}
-        if not params:
-            return {}
-        for k, v in params.items():
-            if isinstance(v, str) and v.startswith("${") and v.endswith("}"):
-                key_path = v[2:-1] 
-                val = self.tracker.get_context(key_path)
-                # Simple fallback for step_id.output nesting if stored as flat keys or dicts
-                # Assuming tracker.get_context handles exact keys. 
-                # If not found, try to look into dicts
-                if val is None and "." in key_path:
-                    parts = key_path.split(".", 1)
-                    base_obj = self.tracker.get_context(parts[0])
-                    if isinstance(base_obj, dict):
-                        val = base_obj.get(parts[1])
-                
-                resolved[k] = val if val is not None else v
-            else:
-                resolved[k] = v
-        return resolved
+    def _current_frame(self) -> Optional[_ExecutionFrame]:
+        return getattr(self._local, "frame", None)
+
+    def _enter_frame(self, frame: Optional[_ExecutionFrame]) -> Any:
+        """Make frame current; returns a token for _exit_frame"""
+        previous = self._current_frame()
+        self._local.frame = frame
+        return previous
+
+    def _exit_frame(self, token: Any):
+        self._local.frame = token
+
+    def _active_browser(self):
+        frame = self._current_frame()
+        if frame is not None and frame.browser is not None:
+            return frame.browser
+        return self.browser
+
+    def _current_deadline(self) -> Deadline:
+        deadline = getattr(self._local, "deadline", None)
+        if deadline is None:
+            frame = self._current_frame()
+            deadline = frame.deadline if frame is not None and frame.deadline is not None else self._deadline
+        return deadline
+
+    def _push_deadline(self, deadline: Deadline) -> Any:
+        """Make deadline current for nested work; returns a token for _pop_deadline"""
+        previous = getattr(self._local, "deadline", None)
+        self._local.deadline = deadline
+        return previous
+
+    def _pop_deadline(self, token: Any):
+        self._local.deadline = token
+
+    def _step_deadline(self, instr: Instruction) -> Deadline:
+        return self._current_deadline().child(instr.step.timeout, f"step {instr.step_id}")
+
+    def _lookup(self, key: str) -> Any:
+        frame = self._current_frame()
+        if frame is not None:
+            # A frame that holds a top-level name owns every path below it
+            root = split_path(key)[0]
+            while frame is not None:
+                for layer in (frame.scope, frame.variables):
+                    if layer.owns(root):
+                        return layer.get(key)
+                frame = frame.parent
+        return self.tracker.get_context(key)
+
+    def _writable_frame(self) -> Optional[_ExecutionFrame]:
+        """The innermost isolated frame, which receives writes (None: the tracker context)"""
+        frame = self._current_frame()
+        while frame is not None and not frame.isolated:
+            frame = frame.parent
+        return frame
+
+    def _set_context(self, key: str, value: Any):
+        frame = self._writable_frame()
+        if frame is not None:
+            frame.set(key, value)
+        else:
+            self.tracker.set_context(key, value)
+
+    @staticmethod
+    def _loop_vars(step, i: int, **extra) -> Dict[str, Any]:
+        """Variables an iteration's frame scopes: loop_index, "<loop_id>.index" (reachable from nested loops) and extras"""
+        return {"loop_index": i, f"{step.id}.index": i, **extra}
+
+    def _iteration_frame(self, step, i: int) -> _ExecutionFrame:
+        """Transparent frame for one count/while iteration"""
+        return _ExecutionFrame(self._current_frame(), self._loop_vars(step, i),
+                               deadline=self._current_deadline(), isolated=False)
+
+    def _is_running(self) -> bool:
+        # Parks here while paused; raises ExecutionCancelled once cancelled
+        self.control.checkpoint()
+        if self._status not in (ExecutionStatus.RUNNING, ExecutionStatus.PAUSED):
+            return False
+        frame = self._current_frame()
+        return frame is None or not frame.cancelled()
+
+    def compile(self, process_model: ProcessModel) -> ExecutionPlan:
+        """
+        Compile the process model into an execution plan (cached on the model
+        instance, so it lives exactly as long as the model)
+        """
+        plan = process_model._plan
+        # A model copy carries its original's private attributes: recompile for it
+        if plan is None or plan.process is not process_model:
+            plan = self.compiler.compile(process_model)
+            process_model._plan = plan
+        return plan
 
     def execute(self, process_model: ProcessModel) -> ExecutionResult:
         """
         Execute the given process model
         """
+        self.control.reset()
         self._status = ExecutionStatus.RUNNING
         self.tracker.snapshot(None, "started", {"process_name": process_model.name})
-        
         try:
-            self._execute_sequence(process_model.steps)
+            return self._run_process(process_model)
+        finally:
+            # The run's audit trail is durable once execute() returns
+            self.tracker.flush()
+
+    def resume_from_checkpoint(self, trace_id: str, process_model: Optional[ProcessModel] = None) -> ExecutionResult:
+        """
+        Continue a checkpointed run from its last step boundary.
+        The step that was running when the run died is executed again; the process
+        definition stored with the checkpoint is used unless one is given.
+        """
+        store = self._checkpoint_store()
+        checkpoint = store.load(trace_id)
+        if checkpoint is None:
+            raise ValueError(f"No checkpoint found for trace {trace_id}")
+        if checkpoint.status == "completed":
+            raise ValueError(f"Run {trace_id} already completed")
+        if process_model is None:
+            process_model = ProcessModel.model_validate_json(checkpoint.process_json)
+
+        self.tracker.trace_id = trace_id
+        self.tracker.restore_context(checkpoint.context)
+        self._resume = [dict(entry) for entry in checkpoint.cursor]
+        self.control.reset()
+        self._status = ExecutionStatus.RUNNING
+        self.tracker.snapshot(None, "resumed", {"process_name": process_model.name, "cursor": checkpoint.cursor})
+        try:
+            return self._run_process(process_model, resumed=True)
+        finally:
+            self.tracker.flush()
+
+    def _run_process(self, process_model: ProcessModel, resumed: bool = False) -> ExecutionResult:
+        self._deadline = Deadline.after(process_model.timeout, "process")
+        try:
+            plan = self.compile(process_model)
+            self._releases, self._retention = plan.releases, process_model.output_retention
+            if plan.graph is not None:
+                if process_model.checkpoint:
+                    self.logger.warning("Checkpoints are not supported in dag mode; running without them.")
+                self._run_dag(plan.root, plan.graph, process_model.max_workers)
+            else:
+                if process_model.checkpoint or resumed:
+                    self._start_checkpoints(process_model, resumed)
+                self._run_scope(plan.root)
+        except ExecutionCancelled:
+            self.logger.info("Process execution cancelled.")
+            self._finish_checkpoints("cancelled")
+            return ExecutionResult(ExecutionStatus.CANCELLED)
         except Exception as e:
             self.logger.error(f"Process execution failed: {e}")
+            self.tracker.snapshot(None, "failed", {"error": str(e)})
+            self._finish_checkpoints("failed")
             return ExecutionResult(ExecutionStatus.FAILED, error=str(e))
-                
+
+        interrupted = self._status in (ExecutionStatus.CANCELLED, ExecutionStatus.PAUSED)
+        self._finish_checkpoints(self._status.value if interrupted else "completed")
         self._status = ExecutionStatus.COMPLETED
         self.tracker.snapshot(None, "completed")
         return ExecutionResult(ExecutionStatus.COMPLETED)
 
-    def _execute_sequence(self, steps: List[StepModel]):
+    def _checkpoint_store(self) -> CheckpointStore:
+        if self.checkpoints is None:
+            self.checkpoints = CheckpointStore(self.tracker.db_path)
+        return self.checkpoints
+
+    def _start_checkpoints(self, process_model: ProcessModel, resumed: bool):
+        store = self._checkpoint_store()
+        if not resumed:
+            store.start(self.tracker.trace_id, process_model.name, process_model.model_dump_json())
+        self._cursor = []
+
+    def _finish_checkpoints(self, status: str):
+        if self._cursor is None:
+            return
+        self._cursor = None
+        self._resume = []
+        try:
+            self.checkpoints.set_status(self.tracker.trace_id, status)
+        except Exception as e:
+            self.logger.error(f"Failed to update checkpoint: {e}")
+
+    def _checkpointing(self) -> bool:
+        # Isolated frames (for_each items, parallel branches) are restarted as a
+        # whole, so only positions outside them are recorded
+        return self._cursor is not None and self._writable_frame() is None
+
+    def _push_cursor(self, scope_name: str, iteration: Optional[int] = None) -> Dict[str, Any]:
+        """Open a cursor entry for a scope, positioned where a resumed run left off"""
+        resumed = self._take_resume(scope_name)
+        entry = {"scope": scope_name, "ip": resumed["ip"] if resumed else 0}
+        if iteration is not None:
+            entry["iteration"] = iteration
+        self._cursor.append(entry)
+        return entry
+
+    def _save_checkpoint(self):
+        try:
+            self.checkpoints.save(self.tracker.trace_id, self._cursor, self.tracker.get_all_context())
+        except Exception as e:
+            self.logger.error(f"Failed to persist checkpoint: {e}")
+
+    def _peek_resume(self, scope_name: str) -> Optional[Dict[str, Any]]:
+        if self._resume and self._resume[0]["scope"] == scope_name:
+            return self._resume[0]
+        return None
+
+    def _take_resume(self, scope_name: str) -> Optional[Dict[str, Any]]:
+        entry = self._peek_resume(scope_name)
+        if entry is not None:
+            self._resume.pop(0)
+        return entry
+
+    def _resume_iteration(self, scope_name: str) -> int:
+        entry = self._peek_resume(scope_name)
+        return entry.get("iteration", 0) if entry else 0
+
+    def _run_scope(self, scope: ExecutionScope, iteration: Optional[int] = None) -> bool:
         """
-        Execute a sequence of steps.
-        Handles linear flow and explicit jumps within the sequence.
+        Execute a compiled scope.
+        Handles linear flow and explicit jumps using the precomputed instruction indices.
+        Returns False if the scope was interrupted (stop, pause/cancel or a cancelled frame).
         """
-        if not steps:
-            return
+        instructions = scope.instructions
+        if not instructions:
+            return True
+
+        entry = self._push_cursor(scope.name, iteration) if self._checkpointing() else None
+        try:
+            return self._run_instructions(instructions, entry, self._releases.get(scope.name))
+        finally:
+            if entry is not None:
+                self._cursor.pop()
+
+    def _run_instructions(self, instructions, entry: Optional[Dict[str, Any]],
+                          releases: Optional[Dict[int, Any]] = None) -> bool:
+        ip = entry["ip"] if entry is not None else 0
+        while ip is not None and self._is_running():
+            instr = instructions[ip]
+            # An expired enclosing deadline ends the scope; the owning step's on_error decides
+            self._current_deadline().check()
+            if entry is not None:
+                entry["ip"] = ip
+                self._save_checkpoint()
 
-        step_map = {step.id: i for i, step in enumerate(steps)}
-        current_step_id = steps[0].id
-        
-        while current_step_id and self._status == ExecutionStatus.RUNNING:
-            if current_step_id not in step_map:
-                raise ValueError(f"Step ID {current_step_id} not found in current scope")
-            
-            step = steps[step_map[current_step_id]]
-            
             try:
-                if step.type == "loop":
-                    self._execute_loop(step)
-                elif step.type == "condition":
-                    self._execute_condition(step)
-                else:
-                    result = self._execute_atomic_step(step)
-                    # Check for Flow Control (Skip/Stop)
-                    if isinstance(result, dict) and "action" in result:
-                        action = result["action"]
-                        if action == "skip":
-                            self.logger.info("Flow Control: SKIP requested.")
-                            break # Break sequence? No, skip means 'continue' in loop context.
-                            # But _execute_sequence is the body of the loop.
-                            # If we break here, we return to _execute_loop, which proceeds to next iteration.
-                            # So 'break' is correct for 'continue loop'.
-                            # Wait, what if this sequence is NOT a loop body but the main process?
-                            # If main process, 'break' ends the process (completed).
-                            # This seems acceptable.
-                        elif action == "stop":
-                            self.logger.info("Flow Control: STOP requested.")
-                            self._status = ExecutionStatus.COMPLETED # Or cancelled?
-                            return # Stop everything
-
-                # Determine next step
-                if step.next_step:
-                    current_step_id = step.next_step
-                else:
-                    # Default: next in list
-                    current_idx = step_map[step.id]
-                    if current_idx + 1 < len(steps):
-                        current_step_id = steps[current_idx + 1].id
-                    else:
-                        current_step_id = None
+                action = self._dispatch(instr)
+                self._release_after(instr, releases)
+                if action == "skip":
+                    # Ends the current scope: inside a loop body this continues
+                    # with the next iteration, at top level it completes the process.
+                    return True
+                elif action == "stop":
+                    return False # Stop everything
+
+                ip = instr.next_index
                         
             except Exception as e:
-                self.logger.error(f"Step {step.id} failed: {e}")
-                self.tracker.snapshot(step.id, "failed", {"error": str(e)})
-                if step.on_error == "continue":
-                    self.logger.info(f"Continuing after error in step {step.id}")
-                    # Try to move next
-                    current_idx = step_map[step.id]
-                    if current_idx + 1 < len(steps):
-                        current_step_id = steps[current_idx + 1].id
-                    else:
-                        current_step_id = None
+                self._handle_step_error(instr, e)
+                self._release_after(instr, releases)
+                if instr.step.on_error == "skip":
+                    return True
+                ip = instr.fallthrough_index
+
+        return ip is None
+
+    def _dispatch(self, instr: Instruction) -> Optional[str]:
+        """Execute one instruction within its deadline, retrying it according to its retry policy"""
+        if instr.step.timeout is None:
+            return self._dispatch_with_retry(instr)
+        token = self._push_deadline(self._step_deadline(instr))
+        try:
+            return self._dispatch_with_retry(instr)
+        finally:
+            self._pop_deadline(token)
+
+    def _dispatch_with_retry(self, instr: Instruction) -> Optional[str]:
+        policy = instr.retry
+        if policy is None:
+            return self._dispatch_once(instr)
+
+        attempt = 1
+        first_failure = None
+        while True:
+            try:
+                action = self._dispatch_once(instr)
+            except Exception as e:
+                first_failure, delay = self._plan_retry(instr, attempt, e, first_failure)
+                self.control.sleep(delay)
+                if instr.recovery is not None:
+                    self._run_scope(instr.recovery)
+                attempt += 1
+                continue
+            if first_failure is not None:
+                self._record_retries(instr, attempt, first_failure, succeeded=True)
+            return action
+
+    def _plan_retry(self, instr: Instruction, attempt: int, error: Exception,
+                    first_failure: Optional[float]):
+        """
+        Decide what follows a failed attempt; shared by the sync and async engines.
+        Re-raises the error when the step gives up, otherwise records the retry and
+        returns (first_failure, delay) for the caller to sleep on.
+        """
+        policy = instr.retry
+        deadline = self._current_deadline()
+        if (attempt >= policy.attempts or not is_retryable(error, policy) or not self._is_running()
+                or isinstance(error, (DeadlineExceeded, ExecutionCancelled)) or deadline.expired()):
+            if first_failure is not None:
+                self._record_retries(instr, attempt, first_failure, succeeded=False)
+            raise error
+        first_failure = first_failure or time.perf_counter()
+        delay = deadline.clamp(retry_delay(policy, attempt))
+        self.logger.warning(f"Step {instr.step_id} failed (attempt {attempt}/{policy.attempts}), retrying in {delay:.2f}s: {error}")
+        self.tracker.snapshot(instr.step_id, "retrying",
+                              {"attempt": attempt, "error": str(error), "error_type": type(error).__name__, "delay": round(delay, 3)})
+        return first_failure, delay
+
+    def _record_retries(self, instr: Instruction, attempts: int, first_failure: float, succeeded: bool):
+        self.tracker.snapshot(instr.step_id, "retried", {
+            "attempts": attempts,
+            "succeeded": succeeded,
+            # Time from the first failure until the step finally succeeded or gave up
+            "retry_latency": round(time.perf_counter() - first_failure, 3),
+        })
+
+    def _dispatch_once(self, instr: Instruction) -> Optional[str]:
+        """Execute one instruction; returns a flow-control action ("skip"/"stop") if requested"""
+        if instr.kind == KIND_LOOP:
+            self._execute_loop(instr)
+        elif instr.kind == KIND_CONDITION:
+            self._execute_condition(instr)
+        elif instr.kind == KIND_PARALLEL:
+            self._execute_parallel(instr)
+        else:
+            return self._flow_action(self._execute_atomic_step(instr))
+        return None
+
+    def _flow_action(self, result: Any) -> Optional[str]:
+        """Flow control (skip/stop) requested by an atomic step's result"""
+        if isinstance(result, dict) and "action" in result:
+            action = result["action"]
+            if action == "skip":
+                self.logger.info("Flow Control: SKIP requested.")
+                return "skip"
+            elif action == "stop":
+                self.logger.info("Flow Control: STOP requested.")
+                self._status = ExecutionStatus.COMPLETED # Or cancelled?
+                return "stop"
+        return None
+
+    def _release_after(self, instr: Instruction, releases: Optional[Dict[int, Any]]):
+        if releases and instr.index in releases:
+            self._release_outputs(instr, releases[instr.index])
+
+    def _release_outputs(self, instr: Instruction, keys):
+        """
+        Remove outputs no later step reads from the scope they live in (and from
+        the per-item record of an enclosing for_each); "spill" records them once first.
+        """
+        frame = self._writable_frame()
+        released = {}
+        for key in keys:
+            if frame is not None:
+                value = frame.variables.get(key)
+                frame.variables.delete(key)
+                frame.written.pop(key, None)
+            else:
+                value = self.tracker.get_context(key)
+                self.tracker.delete_context(key)
+            if value is not None:
+                released[key] = value
+        if released and self._retention == "spill":
+            self.tracker.snapshot(instr.step_id, "outputs_released", {"outputs": released})
+
+    def _handle_step_error(self, instr: Instruction, e: Exception):
+        """Record a step failure; re-raises unless the step's on_error allows continuing"""
+        if isinstance(e, ExecutionCancelled):
+            raise e
+        step = instr.step
+        self.logger.error(f"Step {step.id} failed: {e}")
+        self.tracker.snapshot(step.id, "failed", {"error": str(e)})
+        if step.on_error == "continue":
+            self.logger.info(f"Continuing after error in step {step.id}")
+        elif step.on_error == "skip":
+            self.logger.info(f"Skipping the rest of the scope after error in step {step.id}")
+        else:
+            raise e
+
+    def _run_dag(self, scope: ExecutionScope, graph: DependencyGraph, max_workers: Optional[int] = None):
+        """
+        Execute a scope as a dependency graph.
+        Independent steps run concurrently on a thread pool; barrier steps (browser,
+        human interaction, explicit jumps) run alone on the calling thread.
+        """
+        instructions = scope.instructions
+        schedule = _DagSchedule(graph, lambda node, e: self._handle_step_error(instructions[node], e))
+
+        with ThreadPoolExecutor(max_workers=max_workers or 4, thread_name_prefix="synthflow-dag") as executor:
+            running: Dict[Future, int] = {}
+            while True:
+                if not schedule.halted and self._is_running():
+                    node = schedule.take(running)
+                    while node is not None:
+                        if graph.effects[node].barrier:
+                            try:
+                                action, error = self._dispatch(instructions[node]), None
+                            except Exception as e:
+                                action, error = None, e
+                            schedule.settle(node, action, error)
+                        else:
+                            running[executor.submit(self._dispatch, instructions[node])] = node
+                        node = schedule.take(running)
                 else:
-                    raise e
+                    schedule.halted = True
+
+                if not running:
+                    if schedule.halted or not schedule.ready:
+                        break
+                    continue
 
-    def _execute_loop(self, step: StepModel):
+                finished, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in finished:
+                    node = running.pop(future)
+                    error = future.exception()
+                    schedule.settle(node, None if error is not None else future.result(), error)
+
+        if schedule.failure is not None:
+            raise schedule.failure
+
+    def _execute_loop(self, instr: Instruction):
         """Execute a loop step"""
+        step = instr.step
         self.tracker.snapshot(step.id, "loop_start", {"type": step.loop.type})
         loop_config = step.loop
         
         if loop_config.type == "count":
-            count = loop_config.count
-            if not count:
-                raise ValueError("Loop count must be specified for 'count' type")
-            
-            for i in range(count):
-                if self._status != ExecutionStatus.RUNNING: break
-                self.tracker.set_context("loop_index", i)
+            count = self._loop_count(loop_config)
+            for i in range(self._resume_iteration(instr.body.name), count):
+                if not self._is_running(): break
+                self._set_context("loop_index", i)
                 self.logger.info(f"Loop {step.id} iteration {i+1}/{count}")
-                self._execute_sequence(loop_config.steps)
+                self._run_iteration(instr, i)
                 
         elif loop_config.type == "while_element":
             selector = loop_config.condition
-            try:
-                # Get OperationExecutor to access browser
-                # Assuming 'operation_executor' is registered
-                op_exec = self.cm.get_component("operation_executor")
-                # We need to access the underlying browser manager or page
-                # Since op_exec has browser_manager as public attribute (based on my previous read)
-                if hasattr(op_exec, 'browser_manager'):
-                    page = op_exec.browser_manager.get_page()
-                    
-                    i = 0
-                    while self._status == ExecutionStatus.RUNNING:
-                        # Check if element is visible
-                        if not page.is_visible(selector):
-                            self.logger.info(f"Loop condition ended: {selector} not visible.")
-                            break
-                            
-                        self.tracker.set_context("loop_index", i)
-                        self.logger.info(f"Loop {step.id} iteration {i+1} (while {selector})")
-                        self._execute_sequence(loop_config.steps)
-                        i += 1
-                else:
-                    self.logger.warning("OperationExecutor does not expose browser_manager. Cannot execute while_element loop.")
-                    
-            except Exception as e:
-                self.logger.error(f"Failed to execute while_element loop: {e}")
-                raise e
+            visible = self._element_probe(selector)
+            if visible is None:
+                self.logger.warning("OperationExecutor does not expose browser_manager. Cannot execute while_element loop.")
+                return
+            i = self._resume_iteration(instr.body.name)
+            while self._is_running():
+                if not visible(i):
+                    self.logger.info(f"Loop condition ended: {selector} not visible.")
+                    break
+                self._set_context("loop_index", i)
+                self.logger.info(f"Loop {step.id} iteration {i+1} (while {selector})")
+                self._run_iteration(instr, i)
+                i += 1
+
+        elif loop_config.type == "for_each":
+            self._execute_for_each(instr)
+
+        else:
+            raise ValueError(f"Unsupported loop type: {loop_config.type}")
+
+    @staticmethod
+    def _loop_count(loop_config) -> int:
+        if not loop_config.count:
+            raise ValueError("Loop count must be specified for 'count' type")
+        return loop_config.count
+
+    def _element_probe(self, selector: str):
+        """
+        Condition of a while_element loop: a callable (iteration) -> whether the element
+        is visible on the active page, or None without a browser manager
+        """
+        op_exec = self.cm.get_component("operation_executor")
+        if not hasattr(op_exec, "browser_manager"):
+            return None
+        browser = self._active_browser()
+        page = browser.get_page() if browser is not None else op_exec.browser_manager.get_page()
+        return lambda i: page.is_visible(selector)
+
+    def _run_iteration(self, instr: Instruction, i: int) -> bool:
+        token = self._enter_frame(self._iteration_frame(instr.step, i))
+        try:
+            return self._run_scope(instr.body, iteration=i)
+        finally:
+            self._exit_frame(token)
+
+    def _execute_for_each(self, instr: Instruction):
+        """
+        Iterate the loop body over a context list.
+        Each item runs in its own frame (scoped loop_index / item variables); with
+        concurrency > 1 items are fanned out over a bounded worker pool, each worker
+        on its own browser session. Frame writes are merged back in item order and
+        the per-item writes are stored as "<loop_id>.output".
+        """
+        step = instr.step
+        loop_config = step.loop
+        items = self._resolve_loop_items(loop_config.items)
+        item_var = loop_config.item_var
+        concurrency = min(loop_config.concurrency, len(items)) if items else 1
+
+        def item_vars(i: int, item: Any) -> Dict[str, Any]:
+            return {"loop_index": i, item_var: item}
+
+        outputs = []
+        if concurrency <= 1:
+            parent = self._current_frame()
+            checkpointing = self._checkpointing()
+            start = 0
+            if checkpointing:
+                resumed = self._take_resume(instr.body.name)
+                if resumed:
+                    start = resumed["iteration"]
+                    outputs = list(self._lookup(f"{step.id}.output") or [])[:start]
+            for i, item in enumerate(items[start:], start=start):
+                if not self._is_running(): break
+                self.logger.info(f"Loop {step.id} item {i+1}/{len(items)}")
+                if checkpointing:
+                    self._cursor.append({"scope": instr.body.name, "ip": 0, "iteration": i})
+                    self._save_checkpoint()
+                try:
+                    frame = _ExecutionFrame(parent, self._loop_vars(step, i, **{item_var: item}),
+                                            deadline=self._current_deadline())
+                    self._run_in_frame(instr.body, frame)
+                finally:
+                    if checkpointing:
+                        self._cursor.pop()
+                self._merge_frame(frame, item_vars(i, item))
+                outputs.append(frame.written)
+                if checkpointing:
+                    # Finished items survive a resume
+                    self._set_context(f"{step.id}.output", outputs)
+        else:
+            self.logger.info(f"Loop {step.id}: {len(items)} items, concurrency={concurrency}")
+            parent = self._current_frame()
+            deadline = self._current_deadline()
+            pool = WorkerPool(concurrency, session_factory=self._browser_session_factory(),
+                              name=f"synthflow-{step.id}")
+
+            def run_item(i: int, item: Any, slot: WorkerSlot) -> _ExecutionFrame:
+                frame = _ExecutionFrame(parent, self._loop_vars(step, i, **{item_var: item}), deadline=deadline,
+                                        browser=slot if slot.has_browser else None,
+                                        cancel_event=pool.stop_event)
+                self._run_in_frame(instr.body, frame)
+                return frame
+
+            results = pool.map(run_item, items)
+            for res in results:
+                if res.error is not None:
+                    raise res.error
+            for i, res in enumerate(results):
+                if not res.executed:
+                    continue
+                self._merge_frame(res.value, item_vars(i, items[i]))
+                outputs.append(res.value.written)
+
+        self._set_context(f"{step.id}.output", outputs)
+
+    def _resolve_loop_items(self, items_ref: Optional[str]) -> List[Any]:
+        if not items_ref:
+            raise ValueError("Loop items must be specified for 'for_each' type")
+        if "${" in items_ref:
+            items = self._resolve_value(items_ref)
+        else:
+            items = self._lookup(items_ref)
+        if items is None:
+            return []
+        if not isinstance(items, (list, tuple)):
+            raise ValueError(f"for_each items '{items_ref}' must resolve to a list, got {type(items).__name__}")
+        return list(items)
+
+    def _run_in_frame(self, scope: ExecutionScope, frame: _ExecutionFrame) -> bool:
+        token = self._enter_frame(frame)
+        try:
+            return self._run_scope(scope)
+        finally:
+            self._exit_frame(token)
+
+    def _merge_frame(self, frame: _ExecutionFrame, loop_vars: Dict[str, Any]):
+        """Publish a finished frame's loop variables and writes to the enclosing scope"""
+        for key, value in loop_vars.items():
+            self._set_context(key, value)
+        for key, value in frame.written.items():
+            self._set_context(key, value)
+
+    def _browser_session_factory(self):
+        """
+        Factory for per-worker browser sessions, if the operation executor exposes a
+        browser manager. Called on the engine thread before the pool starts, so the
+        login state is exported from the thread owning the persistent context.
+        """
+        try:
+            op_exec = self.cm.get_component("operation_executor")
+        except ValueError:
+            return None
+        browser_manager = getattr(op_exec, "browser_manager", None)
+        if browser_manager is None or not hasattr(browser_manager, "isolated_session_factory"):
+            return None
+        return browser_manager.isolated_session_factory()
 
-    def _execute_condition(self, step: StepModel):
+    def _execute_condition(self, instr: Instruction):
         """Execute a condition step"""
+        scope = self._select_branch(instr)
+        if scope is not None:
+            self._run_scope(scope)
+
+    def _select_branch(self, instr: Instruction) -> Optional[ExecutionScope]:
+        """The scope of the first matching branch of a condition step, or None"""
+        step = instr.step
         self.tracker.snapshot(step.id, "condition_check", {"branches": len(step.branches) if step.branches else 0})
         
         if not step.branches:
             self.logger.warning(f"Condition step {step.id} has no branches.")
-            return
+            return None
 
-        matched = False
-        for branch in step.branches:
-            if self._evaluate_condition(branch.condition):
+        # A resumed run re-enters the branch it was in without re-evaluating the conditions
+        resumed = next((scope.name for _, scope in instr.branches if self._peek_resume(scope.name)), None)
+
+        for branch, scope in instr.branches:
+            if resumed:
+                selected = scope.name == resumed
+            else:
+                selected = branch.compiled_condition()(self._lookup)
+            if selected:
                 self.logger.info(f"Condition matched: {branch.condition}")
-                self._execute_sequence(branch.steps)
-                matched = True
-                break # First match wins
+                return scope # First match wins
         
-        if not matched:
-            self.logger.info(f"No branches matched in step {step.id}")
+        self.logger.info(f"No branches matched in step {step.id}")
+        return None
 
-    def _evaluate_condition(self, condition: str) -> bool:
+    def _execute_parallel(self, instr: Instruction):
         """
-        Simple condition evaluator.
-        Supports:
-        - "${var} == 'value'"
-        - "${var} != 'value'"
-        - "${var}" (truthiness)
+        Execute the branches of a parallel step concurrently and join them.
+
+        join: "all" waits for every branch, "any" returns after the first branch
+        finishes, "first_success" after the first branch that succeeds. Unfinished
+        branches are cancelled at their next step boundary. A branch with
+        on_error="continue" records its error instead of failing the step.
+        Each branch's writes are published under "<step_id>.<branch_name>".
+        The first branch runs on the calling thread and keeps the main browser page;
+        the others run on pool workers with their own browser sessions.
         """
-        # Resolve variables in the condition string first? 
-        # No, because string replacement might break quotes.
-        # We should parse the condition logic first.
-        
-        # Simple parsing for ==
-        if "==" in condition:
-            parts = condition.split("==")
-            left = parts[0].strip()
-            right = parts[1].strip().strip("'").strip('"')
-            
-            # Resolve left side if it's a variable
-            val_left = self._resolve_value(left)
-            
-            # Right side is usually a literal string in our simple parser, 
-            # but could be a variable too.
-            val_right = self._resolve_value(right) if "${" in right else right
-            
-            return str(val_left) == str(val_right)
-            
-        elif "!=" in condition:
-            parts = condition.split("!=")
-            left = parts[0].strip()
-            right = parts[1].strip().strip("'").strip('"')
-            
-            val_left = self._resolve_value(left)
-            val_right = self._resolve_value(right) if "${" in right else right
-            
-            return str(val_left) != str(val_right)
-            
-        else:
-            # Truthiness check
-            val = self._resolve_value(condition)
-            return bool(val)
+        join, active, max_workers = self._parallel_branches(instr)
+        if not active:
+            return
+
+        step = instr.step
+        parent = self._current_frame()
+        deadline = self._current_deadline()
+        pool = WorkerPool(max_workers, session_factory=self._browser_session_factory(),
+                          name=f"synthflow-{step.id}")
+
+        def run_branch(i: int, entry, slot: WorkerSlot):
+            branch, scope = entry
+            frame = _ExecutionFrame(parent, {}, deadline=deadline, browser=slot if slot.has_browser else None,
+                                    cancel_event=pool.stop_event)
+            try:
+                finished = self._run_in_frame(scope, frame)
+            except Exception as e:
+                return self._branch_failed(branch, scope, frame, e)
+            return frame, None, finished
+
+        results = pool.map(run_branch, active, fail_fast=(join != "first_success"),
+                           stop_when=self._join_condition(join), inline_first=True)
+        self._join_parallel(instr, join, active, results)
+
+    def _parallel_branches(self, instr: Instruction):
+        """(join, active branches, max_workers) of a parallel step"""
+        step = instr.step
+        join = step.parallel.join if step.parallel else "all"
+        active = [(branch, scope) for branch, scope in instr.branches
+                  if branch.compiled_condition()(self._lookup)]
+        self.tracker.snapshot(step.id, "parallel_start", {"branches": len(active), "join": join})
+        if not active:
+            self.logger.warning(f"Parallel step {step.id} has no active branches.")
+        max_workers = step.parallel.max_workers if step.parallel and step.parallel.max_workers else len(active)
+        return join, active, max_workers
+
+    @staticmethod
+    def _join_condition(join: str):
+        """Predicate on a finished branch's JobResult that satisfies the join early, or None"""
+        if join == "any":
+            return lambda res: res.executed
+        if join == "first_success":
+            return lambda res: res.ok and res.value[1] is None and res.value[2]
+        return None
+
+    def _branch_failed(self, branch, scope: ExecutionScope, frame: _ExecutionFrame, e: Exception):
+        """Outcome of a failed branch with on_error="continue"; re-raises otherwise"""
+        if branch.on_error != "continue" or isinstance(e, ExecutionCancelled):
+            raise e
+        self.logger.warning(f"Branch {scope.name} failed (continuing): {e}")
+        return frame, e, True
+
+    def _join_parallel(self, instr: Instruction, join: str, active, results: List[JobResult]):
+        """
+        Publish the branch outcomes (one JobResult of (frame, error, finished) per
+        active branch) and apply the join policy.
+        """
+        step = instr.step
+        summary = {}
+        first_error = None
+        for (branch, scope), res in zip(active, results):
+            name = scope.name[len(step.id) + 1:]
+            if not res.executed:
+                summary[name] = {"status": "cancelled"}
+            elif res.error is not None:
+                summary[name] = {"status": "failed", "error": str(res.error)}
+                first_error = first_error or res.error
+            else:
+                frame, error, finished = res.value
+                if error is not None:
+                    summary[name] = {"status": "failed", "error": str(error)}
+                elif not finished:
+                    summary[name] = {"status": "cancelled"}
+                else:
+                    summary[name] = {"status": "completed"}
+                self._set_context(scope.name, frame.written)
+
+        succeeded = any(entry["status"] == "completed" for entry in summary.values())
+        if join == "first_success":
+            if not succeeded:
+                raise first_error or RuntimeError(f"No branch of parallel step {step.id} succeeded")
+        elif first_error is not None:
+            raise first_error
+
+        self._set_context(f"{step.id}.output", summary)
+        self.tracker.snapshot(step.id, "completed", {"result": summary})
 
     def _resolve_value(self, value_str: str) -> Any:
         """Helper to resolve a single value string like '${var}'"""
-        if isinstance(value_str, str) and value_str.startswith("${") and value_str.endswith("}"):
-            key_path = value_str[2:-1]
-            val = self.tracker.get_context(key_path)
-            # Fallback for dict access dot notation if get_context doesn't support it natively
-            if val is None and "." in key_path:
-                parts = key_path.split(".", 1)
-                base_obj = self.tracker.get_context(parts[0])
-                if isinstance(base_obj, dict):
-                    val = base_obj.get(parts[1])
-            return val
+        if isinstance(value_str, str) and "${" in value_str:
+            return compile_template(value_str).render(self._lookup, keep_unresolved=False)
         return value_str
 
 
-    def _execute_atomic_step(self, step: StepModel):
+    def _execute_atomic_step(self, instr: Instruction):
         """Execute a single atomic step (L-A-V)"""
+        step = instr.step
         self.tracker.snapshot(step.id, "executing", {"type": step.type})
         
-        # Resolve params with context
-        final_params = self._resolve_params(step.params)
-        
-        # If new L-A-V fields exist, dump them to dict and merge/pass them
-        if step.locator or step.action:
-                lav_params = {}
-                if step.locator: lav_params["locator"] = step.locator.model_dump()
-                if step.action: lav_params["action"] = step.action.model_dump()
-                if step.verification: lav_params["verification"] = step.verification.model_dump()
-                
-                self._recursive_resolve(lav_params)
-                final_params.update(lav_params)
-        
-        # Execute Component
-        component_type = step.type
-        if component_type == "interaction":
-            component_type = "operation_executor"
+        final_params = self._prepare_params(instr)
+        component = self._resolve_component(instr.component_type)
+        key, cached = self._cache_lookup(instr, final_params)
+        if cached is not CACHE_MISS:
+            self._store_result(step, cached)
+            return cached
+
+        ctx = self._component_context(_cache=ComponentCache(self._get_result_cache, instr.component_type))
+        result = component.execute(ctx, final_params)
+        # A sync component cannot be interrupted: it gets the remaining budget (see
+        # _component_context) and a result delivered after the deadline is discarded
+        self._current_deadline().check()
+        self._cache_store(instr, key, result)
+        self._store_result(step, result)
+        return result
+
+    def enable_cache(self, component_type: str, ttl: Optional[float] = None, persist: bool = False):
+        """Memoize every step of a component type (a step's own 'cache' block takes precedence)"""
+        self._cache_policies[component_type] = CacheModel(ttl=ttl, persist=persist)
+
+    def _get_result_cache(self) -> ResultCache:
+        if self.result_cache is None:
+            self.result_cache = ResultCache(db_path=self.tracker.db_path)
+        return self.result_cache
+
+    def _cache_policy(self, instr: Instruction) -> Optional[CacheModel]:
+        policy = instr.step.cache if instr.step.cache is not None else self._cache_policies.get(instr.component_type)
+        return policy if policy is not None and policy.enabled else None
+
+    def _cache_lookup(self, instr: Instruction, params: Dict[str, Any]):
+        """Returns (key, cached result or CACHE_MISS); key is None when the step is not cached"""
+        if self._cache_policy(instr) is None:
+            return None, CACHE_MISS
+        key = cache_key(instr.component_type, params)
+        cached = self._get_result_cache().get(key)
+        if cached is not CACHE_MISS:
+            self.logger.info(f"Step {instr.step_id}: cached result reused")
+            self.tracker.snapshot(instr.step_id, "cache_hit", {"key": key})
+        return key, cached
+
+    def _cache_store(self, instr: Instruction, key: Optional[str], result: Any):
+        if key is None or result is None:
+            return
+        policy = self._cache_policy(instr)
+        self._get_result_cache().set(key, result, ttl=policy.ttl, persist=policy.persist,
+                                     namespace=instr.component_type)
+
+    def _prepare_params(self, instr: Instruction) -> Dict[str, Any]:
+        # Resolve params with context (templates were compiled with the plan)
+        final_params = instr.params_renderer.render(self._lookup)
         
+        # L-A-V sections were dumped at compile time
+        if instr.lav_renderer:
+            final_params.update(instr.lav_renderer.render(self._lookup))
+        return final_params
+
+    def _resolve_component(self, component_type: str):
+        # Get component (with fallbacks)
         try:
-            # Get component (with fallbacks)
-            try:
-                component = self.cm.get_component(component_type)
-            except ValueError:
-                component = self.cm.get_component("OperationExecutor")
-
-            # Execute
-            # INJECT TRACKER into context for HumanInteraction
-            ctx = self.tracker.get_all_context().copy()
-            ctx["_tracker"] = self.tracker
-            
-            result = component.execute(ctx, final_params)
-            
-            # Store result
-            if result is not None:
-                self.tracker.set_context(f"{step.id}.output", result)
-                
-                # Handle Data Binding
-                if step.data and step.data.outputs:
-                    for context_key, source_path in step.data.outputs.items():
-                        val = self._get_value_by_path(result, source_path)
-                        self.tracker.set_context(context_key, val)
-                        self.logger.info(f"Data Bound: {context_key} = {val}")
-
-            self.tracker.snapshot(step.id, "completed", {"result": result})
-            return result
-            
-        except Exception as e:
-            # Re-raise to be handled by _execute_sequence
-            raise e
+            return self.cm.get_component(component_type)
+        except ValueError:
+            return self.cm.get_component("OperationExecutor")
+
+    def _component_context(self, **handles) -> ContextView:
+        """
+        What a component sees: a read-only view over the frame scopes and the
+        context (nothing is copied), with the engine handles on top. Writes go
+        through its set(), into the scope the step runs in.
+        """
+        # INJECT TRACKER into context for HumanInteraction
+        browser = self._active_browser()
+        if browser is not None:
+            handles["_browser"] = browser
+        # Timeouts are cooperative: every component gets its remaining budget, as a
+        # Deadline and as plain seconds ("_timeout", None when unbounded), to bound its waits by
+        deadline = self._current_deadline()
+        handles["_deadline"] = deadline
+        handles["_timeout"] = deadline.remaining()
+        handles["_control"] = self.control
+        handles["_tracker"] = self.tracker
+        layers = [handles]
+        frame = self._current_frame()
+        while frame is not None:
+            layers.append(frame.scope)
+            layers.append(frame.variables)
+            frame = frame.parent
+        layers.append(self.tracker.context)
+        writable = self._writable_frame()
+        return ContextView(layers, writable.set if writable is not None else self.tracker.set_context)
 
+    def _store_result(self, step, result: Any):
+        if result is not None:
+            self._set_context(f"{step.id}.output", result)
+            
+            # Handle Data Binding
+            if step.data and step.data.outputs:
+                for context_key, source_path in step.data.outputs.items():
+                    val = self._get_value_by_path(result, source_path)
+                    self._set_context(context_key, val)
+                    self.logger.info(f"Data Bound: {context_key} = {val}")
 
-    def _recursive_resolve(self, obj: Any):
-        """Helper to resolve ${var} in nested dicts/lists in-place"""
-        if isinstance(obj, dict):
-            for k, v in obj.items():
-                if isinstance(v, (dict, list)):
-                    self._recursive_resolve(v)
-                elif isinstance(v, str) and v.startswith("${") and v.endswith("}"):
-                    key_path = v[2:-1]
-                    val = self.tracker.get_context(key_path)
-                    obj[k] = val if val is not None else v
-        elif isinstance(obj, list):
-            for i, v in enumerate(obj):
-                if isinstance(v, (dict, list)):
-                    self._recursive_resolve(v)
-                elif isinstance(v, str) and v.startswith("${") and v.endswith("}"):
-                    key_path = v[2:-1]
-                    val = self.tracker.get_context(key_path)
-                    obj[i] = val if val is not None else v
+        self.tracker.snapshot(step.id, "completed", {"result": result})
 
     def _get_value_by_path(self, data: Any, path: str) -> Any:
-        """Extract value from nested dict using dot notation (e.g. 'user.name')"""
+        """Extract value from nested dict using dot/index notation (e.g. 'user.name', 'items[0]')"""
         if not path: return data
         
         # Special case: "return_value" might be the root of 'data' or a key inside it.
@@ -347,28 +1007,35 @@ class ExecutionEngine:
         # path "text" -> "abc"
         # path "return_value.text" -> "abc" (allow optional root prefix)
         
-        keys = path.split(".")
-        curr = data
-        
-        if keys[0] == "return_value":
-            keys.pop(0)
-            
-        for k in keys:
-            if isinstance(curr, dict):
-                curr = curr.get(k)
-            else:
-                return None
-        return curr
+        if path == "return_value":
+            return data
+        if path.startswith("return_value."):
+            path = path[len("return_value."):]
+        if not isinstance(data, dict):
+            return None
+        val = compile_path(path).resolve(data.get)
+        return None if val is MISSING else val
 
     def pause(self):
+        """Park the run at its next checkpoint (step boundary, simulator sleep, wait)"""
         self._status = ExecutionStatus.PAUSED
+        self.control.pause()
         self.tracker.snapshot(None, "paused")
 
-    def resume(self):
+    def resume(self, trace_id: Optional[str] = None, process_model: Optional[ProcessModel] = None):
+        """
+        Without arguments, continue a paused run. With a trace_id, continue a
+        checkpointed (crashed, failed or cancelled) run; see resume_from_checkpoint.
+        """
+        if trace_id is not None:
+            return self.resume_from_checkpoint(trace_id, process_model)
         if self._status == ExecutionStatus.PAUSED:
             self._status = ExecutionStatus.RUNNING
+            self.control.resume()
             self.tracker.snapshot(None, "resumed")
 
     def cancel(self):
+        """Cancel the run; blocking waits that watch the control are interrupted at once"""
         self._status = ExecutionStatus.CANCELLED
+        self.control.cancel()
         self.tracker.snapshot(None, "cancelled")
@@ -0,0 +1,159 @@
+from dataclasses import dataclass, field, replace
+from typing import Dict, Any, Optional, List, Tuple
+
+from .config_parser import ProcessModel, StepModel, BranchModel, RetryModel
+from .template import ValueTemplate, compile_value
+
+# Instruction kinds
+KIND_ATOMIC = "atomic"
+KIND_LOOP = "loop"
+KIND_CONDITION = "condition"
+KIND_PARALLEL = "parallel"
+
+PARALLEL_JOINS = ("all", "any", "first_success")
+ERROR_POLICIES = (None, "fail", "continue", "skip", "retry")
+
+# Step types that are dispatched to a differently named component
+COMPONENT_ALIASES = {
+    "interaction": "operation_executor",
+}
+
+
+@dataclass(frozen=True)
+class Instruction:
+    """A single compiled step inside an ExecutionScope"""
+    step: StepModel
+    index: int
+    kind: str
+    component_type: str
+    # Index to jump to after the step succeeds (None = end of scope)
+    next_index: Optional[int]
+    # Index of the next step in list order, used by on_error="continue"
+    fallthrough_index: Optional[int]
+    params_template: Dict[str, Any] = field(default_factory=dict)
+    params_renderer: Optional[ValueTemplate] = None
+    # Pre-dumped L-A-V sections ("locator", "action", "verification")
+    lav_template: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    lav_renderer: Optional[ValueTemplate] = None
+    body: Optional["ExecutionScope"] = None
+    branches: Tuple[Tuple[BranchModel, "ExecutionScope"], ...] = ()
+    # Retry policy (step.retry, or the defaults for on_error="retry") and its recovery steps
+    retry: Optional[RetryModel] = None
+    recovery: Optional["ExecutionScope"] = None
+
+    @property
+    def step_id(self) -> str:
+        return self.step.id
+
+
+@dataclass(frozen=True)
+class ExecutionScope:
+    """Flat instruction array for one sequence of steps (process body, loop body or branch)"""
+    name: str
+    instructions: Tuple[Instruction, ...]
+
+
+@dataclass(frozen=True)
+class ExecutionPlan:
+    process: ProcessModel
+    root: ExecutionScope
+    # Set for execution_mode "dag": dependencies between the root instructions
+    graph: Optional[Any] = None
+    # Output keys to remove from the context after an instruction (see liveness.analyze_liveness)
+    releases: Dict[str, Dict[int, Tuple[str, ...]]] = field(default_factory=dict)
+
+
+class PlanCompiler:
+    """
+    负责将 ProcessModel 编译为不可变的执行计划，避免每次迭代重复解释模型
+    """
+
+    def compile(self, process_model: ProcessModel) -> ExecutionPlan:
+        root = self.compile_scope(process_model.steps, "root")
+        graph = None
+        if process_model.execution_mode == "dag":
+            from .dependency_graph import build_dependency_graph
+            graph = build_dependency_graph(root)
+        elif process_model.execution_mode != "sequential":
+            raise ValueError(f"Unsupported execution mode: {process_model.execution_mode}")
+        from .liveness import RETENTION_POLICIES, analyze_liveness
+        if process_model.output_retention not in RETENTION_POLICIES:
+            raise ValueError(f"Unsupported output_retention: {process_model.output_retention}")
+        releases = {}
+        if process_model.output_retention != "keep":
+            releases = analyze_liveness(root, ordered_root=graph is None)
+        return ExecutionPlan(process=process_model, root=root, graph=graph, releases=releases)
+
+    def compile_scope(self, steps: List[StepModel], name: str) -> ExecutionScope:
+        step_map = {step.id: i for i, step in enumerate(steps)}
+        instructions = []
+        for i, step in enumerate(steps):
+            fallthrough = i + 1 if i + 1 < len(steps) else None
+            if step.next_step:
+                if step.next_step not in step_map:
+                    raise ValueError(f"Step ID {step.next_step} not found in current scope")
+                next_index = step_map[step.next_step]
+            else:
+                next_index = fallthrough
+            if step.on_error not in ERROR_POLICIES:
+                raise ValueError(f"Unsupported on_error '{step.on_error}' in step {step.id}")
+            instr = self._compile_step(step, i, next_index, fallthrough)
+            if step.retry or step.on_error == "retry":
+                policy = step.retry or RetryModel()
+                recovery = self.compile_scope(policy.recovery, f"{step.id}.recovery") if policy.recovery else None
+                instr = replace(instr, retry=policy, recovery=recovery)
+            instructions.append(instr)
+        return ExecutionScope(name=name, instructions=tuple(instructions))
+
+    def _compile_step(self, step: StepModel, index: int,
+                      next_index: Optional[int], fallthrough: Optional[int]) -> Instruction:
+        if step.type == "loop":
+            body = self.compile_scope(step.loop.steps if step.loop else [], f"{step.id}.loop")
+            return Instruction(step=step, index=index, kind=KIND_LOOP, component_type=step.type,
+                               next_index=next_index, fallthrough_index=fallthrough, body=body)
+
+        if step.type == "condition":
+            # Compile conditions up front so syntax errors surface before the run starts
+            for branch in step.branches or []:
+                branch.compiled_condition()
+            branches = tuple(
+                (branch, self.compile_scope(branch.steps, f"{step.id}.branch[{i}]"))
+                for i, branch in enumerate(step.branches or [])
+            )
+            return Instruction(step=step, index=index, kind=KIND_CONDITION, component_type=step.type,
+                               next_index=next_index, fallthrough_index=fallthrough, branches=branches)
+
+        if step.type == "parallel":
+            join = step.parallel.join if step.parallel else "all"
+            if join not in PARALLEL_JOINS:
+                raise ValueError(f"Unsupported join '{join}' in parallel step {step.id}")
+            branches = []
+            for i, branch in enumerate(step.branches or []):
+                branch.compiled_condition()
+                name = branch.name or f"branch_{i}"
+                branches.append((branch, self.compile_scope(branch.steps, f"{step.id}.{name}")))
+            names = [scope.name for _, scope in branches]
+            if len(set(names)) != len(names):
+                raise ValueError(f"Duplicate branch names in parallel step {step.id}")
+            return Instruction(step=step, index=index, kind=KIND_PARALLEL, component_type=step.type,
+                               next_index=next_index, fallthrough_index=fallthrough, branches=tuple(branches))
+
+        lav_template = {}
+        if step.locator or step.action:
+            if step.locator: lav_template["locator"] = step.locator.model_dump()
+            if step.action: lav_template["action"] = step.action.model_dump()
+            if step.verification: lav_template["verification"] = step.verification.model_dump()
+
+        params_template = dict(step.params or {})
+        return Instruction(
+            step=step,
+            index=index,
+            kind=KIND_ATOMIC,
+            component_type=COMPONENT_ALIASES.get(step.type, step.type),
+            next_index=next_index,
+            fallthrough_index=fallthrough,
+            params_template=params_template,
+            params_renderer=compile_value(params_template),
+            lav_template=lav_template,
+            lav_renderer=compile_value(lav_template) if lav_template else None,
+        )
@@ -0,0 +1,233 @@
+import re
+from functools import lru_cache
+from typing import Any, Callable, List, Tuple
+
+from .template import compile_template, Lookup
+
+Evaluator = Callable[[Lookup], Any]
+
+_TOKEN_RE = re.compile(r"""
+    (?P<ws>\s+)
+  | (?P<ref>\$\{[^}]*\})
+  | (?P<str>'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*")
+  | (?P<op>==|!=|<=|>=|&&|\|\||[<>!()\[\],])
+  | (?P<word>[^\s()\[\],'"=!<>&|]+)
+""", re.VERBOSE)
+
+_NUMBER_RE = re.compile(r"-?\d+(\.\d+)?$")
+_KEYWORDS = {"and", "or", "not", "in", "true", "false", "null", "none"}
+_COMPARISONS = ("==", "!=", "<", "<=", ">", ">=", "in", "not in")
+
+
+class ConditionSyntaxError(ValueError):
+    pass
+
+
+def _tokenize(text: str) -> List[Tuple[str, str]]:
+    tokens = []
+    pos = 0
+    while pos < len(text):
+        match = _TOKEN_RE.match(text, pos)
+        if not match:
+            raise ConditionSyntaxError(f"Invalid condition '{text}': unexpected character at {pos}")
+        kind = match.lastgroup
+        value = match.group(kind)
+        pos = match.end()
+        if kind == "ws":
+            continue
+        if kind == "word" and value.lower() in _KEYWORDS:
+            kind, value = "kw", value.lower()
+        elif kind == "op" and value in ("&&", "||", "!"):
+            kind, value = "kw", {"&&": "and", "||": "or", "!": "not"}[value]
+        tokens.append((kind, value))
+    return tokens
+
+
+def _to_number(value: Any):
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str) and _NUMBER_RE.match(value.strip()):
+        return float(value)
+    return None
+
+
+def _equals(left: Any, right: Any) -> bool:
+    if left == right:
+        return True
+    if left is None or right is None:
+        return False
+    l_num, r_num = _to_number(left), _to_number(right)
+    if l_num is not None and r_num is not None:
+        return l_num == r_num
+    # Values coming from the context are frequently strings; compare textual forms
+    return str(left) == str(right)
+
+
+def _order(op: str, left: Any, right: Any) -> bool:
+    l_num, r_num = _to_number(left), _to_number(right)
+    if l_num is not None and r_num is not None:
+        left, right = l_num, r_num
+    elif left is None or right is None:
+        return False
+    else:
+        left, right = str(left), str(right)
+    if op == "<":
+        return left < right
+    if op == "<=":
+        return left <= right
+    if op == ">":
+        return left > right
+    return left >= right
+
+
+def _contains(item: Any, container: Any) -> bool:
+    if container is None:
+        return False
+    if isinstance(container, str):
+        return str(item) in container
+    if isinstance(container, dict):
+        return item in container
+    try:
+        return any(_equals(item, candidate) for candidate in container)
+    except TypeError:
+        return False
+
+
+class _Parser:
+    """Recursive-descent parser producing evaluator closures"""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.tokens = _tokenize(text)
+        self.pos = 0
+
+    def parse(self) -> Evaluator:
+        if not self.tokens:
+            raise ConditionSyntaxError("Empty condition")
+        node = self._or()
+        if self.pos != len(self.tokens):
+            raise self._error(f"unexpected token '{self.tokens[self.pos][1]}'")
+        return node
+
+    def _error(self, message: str) -> ConditionSyntaxError:
+        return ConditionSyntaxError(f"Invalid condition '{self.text}': {message}")
+
+    def _peek(self) -> Tuple[str, str]:
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else ("eof", "")
+
+    def _accept(self, kind: str, value: str = None) -> bool:
+        tok_kind, tok_value = self._peek()
+        if tok_kind == kind and (value is None or tok_value == value):
+            self.pos += 1
+            return True
+        return False
+
+    def _expect(self, kind: str, value: str):
+        if not self._accept(kind, value):
+            raise self._error(f"expected '{value}'")
+
+    def _or(self) -> Evaluator:
+        operands = [self._and()]
+        while self._accept("kw", "or"):
+            operands.append(self._and())
+        if len(operands) == 1:
+            return operands[0]
+        return lambda lookup: any(operand(lookup) for operand in operands)
+
+    def _and(self) -> Evaluator:
+        operands = [self._not()]
+        while self._accept("kw", "and"):
+            operands.append(self._not())
+        if len(operands) == 1:
+            return operands[0]
+        return lambda lookup: all(operand(lookup) for operand in operands)
+
+    def _not(self) -> Evaluator:
+        if self._accept("kw", "not"):
+            operand = self._not()
+            return lambda lookup: not operand(lookup)
+        return self._comparison()
+
+    def _comparison(self) -> Evaluator:
+        left = self._operand()
+        kind, value = self._peek()
+        op = None
+        if kind == "op" and value in _COMPARISONS:
+            op = value
+            self.pos += 1
+        elif kind == "kw" and value == "in":
+            op = "in"
+            self.pos += 1
+        elif kind == "kw" and value == "not" and self.tokens[self.pos + 1:self.pos + 2] == [("kw", "in")]:
+            op = "not in"
+            self.pos += 2
+        if op is None:
+            return left
+
+        right = self._operand()
+        if op == "==":
+            return lambda lookup: _equals(left(lookup), right(lookup))
+        if op == "!=":
+            return lambda lookup: not _equals(left(lookup), right(lookup))
+        if op == "in":
+            return lambda lookup: _contains(left(lookup), right(lookup))
+        if op == "not in":
+            return lambda lookup: not _contains(left(lookup), right(lookup))
+        return lambda lookup: _order(op, left(lookup), right(lookup))
+
+    def _operand(self) -> Evaluator:
+        kind, value = self._peek()
+        self.pos += 1
+        if kind == "op" and value == "(":
+            node = self._or()
+            self._expect("op", ")")
+            return node
+        if kind == "op" and value == "[":
+            items = []
+            if not self._accept("op", "]"):
+                items.append(self._operand())
+                while self._accept("op", ","):
+                    items.append(self._operand())
+                self._expect("op", "]")
+            return lambda lookup: [item(lookup) for item in items]
+        if kind == "ref":
+            template = compile_template(value)
+            return lambda lookup: template.render(lookup, keep_unresolved=False)
+        if kind == "str":
+            literal = re.sub(r"\\(.)", r"\1", value[1:-1])
+            return lambda lookup: literal
+        if kind == "kw" and value in ("true", "false", "null", "none"):
+            literal = {"true": True, "false": False}.get(value)
+            return lambda lookup: literal
+        if kind == "word":
+            # Numbers are typed; other bare words are string literals (e.g. == Type1)
+            literal = value
+            if _NUMBER_RE.match(value):
+                literal = float(value) if "." in value else int(value)
+            return lambda lookup: literal
+        self.pos -= 1
+        raise self._error(f"unexpected token '{value}'" if kind != "eof" else "unexpected end of expression")
+
+
+@lru_cache(maxsize=1024)
+def compile_condition(text: str) -> Callable[[Lookup], bool]:
+    """
+    Compile a condition expression into a closure evaluated against a context lookup.
+
+    Supports ``${var}`` references, quoted/numeric/boolean literals, lists,
+    ``== != < <= > >= in / not in``, ``and / or / not`` (short-circuiting) and parentheses.
+    """
+    node = _Parser(text).parse()
+    return lambda lookup: bool(node(lookup))
+
+
+@lru_cache(maxsize=1024)
+def condition_refs(text: str) -> Tuple[str, ...]:
+    """Context paths referenced by a condition expression"""
+    refs: List[str] = []
+    for kind, value in _tokenize(text):
+        if kind == "ref":
+            refs.extend(compile_template(value).refs)
+    return tuple(refs)
@@ -8,11 +8,19 @@ class HumanSimulator:
     Simulates human-like interactions to avoid bot detection.
     Provides methods for natural mouse movement, clicking, and typing.
     """
-    def __init__(self, page: Page):
+    def __init__(self, page: Page, control=None):
         self.page = page
+        # Optional ExecutionControl: pauses park and cancels interrupt between keystrokes
+        self.control = control
+
+    def _sleep(self, seconds: float):
+        if self.control is not None:
+            self.control.sleep(seconds)
+        else:
+            time.sleep(seconds)
 
     def _random_sleep(self, min_s: float = 0.1, max_s: float = 0.5):
-        time.sleep(random.uniform(min_s, max_s))
+        self._sleep(random.uniform(min_s, max_s))
 
     def move_mouse_to(self, selector: str) -> bool:
         """
@@ -73,7 +81,7 @@ class HumanSimulator:
         for char in text:
             self.page.keyboard.type(char)
             # Random delay between keystrokes
-            time.sleep(random.uniform(*delay_range))
+            self._sleep(random.uniform(*delay_range))
             
             # Occasionally pause longer (simulating thinking or checking source)
             if random.random() < 0.05:
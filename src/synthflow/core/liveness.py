@@ -0,0 +1,115 @@
+from typing import Dict, List, Tuple
+
+from .dependency_graph import overlaps, step_reads
+from .execution_plan import ExecutionScope, Instruction, KIND_LOOP, KIND_PARALLEL
+
+# "keep": outputs stay in the context for the whole run
+# "drop": an output is removed from the context once no later step can read it
+# "spill": like drop, but the value is first recorded once in the audit log
+RETENTION_POLICIES = ("keep", "drop", "spill")
+
+# scope name -> instruction index -> output keys to release once that instruction has finished
+Releases = Dict[str, Dict[int, Tuple[str, ...]]]
+
+# Position of an instruction: (scope name, index) for each scope from the root down
+Position = Tuple[Tuple[str, int], ...]
+
+
+def analyze_liveness(root: ExecutionScope, ordered_root: bool = True) -> Releases:
+    """
+    Find, for every step output ("<id>.output"), the instruction after which no
+    step can read it any more, from the ${...} references of the whole flow.
+
+    The release point is in the innermost scope containing the step and all of
+    its readers, after the last of them. Outputs stay alive (are never released)
+    when liveness cannot be decided statically:
+      - a reader comes before the step in a scope that runs repeatedly (loop
+        bodies, retried steps, recovery): it reads the previous pass's value;
+      - the common scope contains next_step jumps;
+      - a reader reads an aggregate holding the output (the enclosing for_each
+        "<loop>.output" or a parallel branch namespace);
+      - the step sets keep_output.
+    With ordered_root=False (dag mode) nothing is released in the root scope,
+    whose instructions do not run in list order.
+    """
+    sites: List[Tuple[Instruction, Position, Tuple[str, ...]]] = []
+    scopes: Dict[str, Tuple[bool, bool]] = {}  # name -> (repeats, linear)
+
+    def walk(scope: ExecutionScope, path: Position, repeats: bool, containers: Tuple[str, ...]):
+        linear = not any(instr.step.next_step for instr in scope.instructions)
+        if scope is root and not ordered_root:
+            linear = False
+        repeats = repeats or not linear
+        scopes[scope.name] = (repeats, linear)
+        for instr in scope.instructions:
+            here = path + ((scope.name, instr.index),)
+            sites.append((instr, here, containers))
+            # A retried step runs its nested scopes again
+            nested_repeats = repeats or instr.retry is not None
+            aggregates = containers
+            loop = instr.step.loop
+            if instr.kind == KIND_PARALLEL or (instr.kind == KIND_LOOP and loop is not None and loop.type == "for_each"):
+                # Nested writes are also recorded in this step's output / branch namespaces
+                aggregates = containers + (instr.step_id,)
+            if instr.body is not None:
+                walk(instr.body, here, True, aggregates)
+            for _, branch_scope in instr.branches:
+                walk(branch_scope, here, nested_repeats, aggregates)
+            if instr.recovery is not None:
+                walk(instr.recovery, here, True, containers)
+
+    walk(root, (), False, ())
+    reads = {id(instr): step_reads(instr.step) for instr, _, _ in sites}
+
+    releases: Dict[str, Dict[int, List[str]]] = {}
+    for instr, position, containers in sites:
+        if instr.step.keep_output:
+            continue
+        key = f"{instr.step_id}.output"
+        readers = []
+        escaped = False
+        for reader, reader_position, _ in sites:
+            paths = reads[id(reader)]
+            if any(overlaps(p, c) for p in paths for c in containers):
+                escaped = True
+                break
+            if any(overlaps(p, key) for p in paths):
+                readers.append(reader_position)
+        if escaped:
+            continue
+        release = _release_point(position, readers, scopes)
+        if release is not None:
+            scope_name, index = release
+            releases.setdefault(scope_name, {}).setdefault(index, []).append(key)
+
+    return {name: {index: tuple(keys) for index, keys in points.items()} for name, points in releases.items()}
+
+
+def _release_point(writer: Position, readers: List[Position],
+                   scopes: Dict[str, Tuple[bool, bool]]):
+    """(scope name, index) after which the writer's output is dead, or None if it must be kept"""
+    # Innermost scope shared by the writer and every reader
+    level = len(writer) - 1
+    for reader in readers:
+        common = 0
+        while (common + 1 < min(len(writer), len(reader))
+               and writer[common + 1][0] == reader[common + 1][0]):
+            common += 1
+        level = min(level, common)
+
+    scope_name, written_at = writer[level]
+    repeats, linear = scopes[scope_name]
+    if not linear:
+        return None
+    last = written_at
+    for reader in readers:
+        read_at = reader[level][1]
+        inside_writer = len(reader) > len(writer) and reader[:len(writer)] == writer
+        if read_at < written_at or (read_at == written_at and not inside_writer and reader != writer):
+            if repeats:
+                return None  # Reads the value of a previous pass
+            continue  # Runs before the output exists
+        if reader == writer and repeats:
+            return None  # The step reads its own previous output
+        last = max(last, read_at)
+    return scope_name, last
@@ -0,0 +1,178 @@
+import copy
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+from ..utils.logger import get_logger
+
+# Returned by lookups that found nothing (None is a valid cached value)
+MISS = object()
+
+
+def cache_key(namespace: str, params: Any) -> str:
+    """Canonical key: namespace plus a hash of the params serialized with sorted keys"""
+    canonical = json.dumps(params, sort_keys=True, separators=(",", ":"), default=str)
+    digest = hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+    return f"{namespace}:{digest}"
+
+
+class ResultCache:
+    """
+    负责缓存步骤结果：内存 LRU（支持 TTL），可选 SQLite 持久层（重启后仍可命中）
+    """
+
+    def __init__(self, max_entries: int = 1024, db_path: Optional[str] = None):
+        self.max_entries = max(1, int(max_entries))
+        self.db_path = db_path
+        # key -> (namespace, value, expires_at or None)
+        self._entries: "OrderedDict[str, Tuple[str, Any, Optional[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.logger = get_logger("ResultCache")
+        if db_path:
+            self._init_db()
+
+    def _init_db(self):
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS result_cache (
+                    key TEXT PRIMARY KEY,
+                    namespace TEXT,
+                    value TEXT,
+                    expires_at REAL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_result_cache_namespace ON result_cache(namespace)")
+
+    def get(self, key: str) -> Any:
+        """Cached value for key, or MISS"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                namespace, value, expires_at = entry
+                if expires_at is None or expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return copy.deepcopy(value)
+                del self._entries[key]
+
+        value = self._load(key, now)
+        with self._lock:
+            if value is MISS:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None, persist: bool = False, namespace: str = ""):
+        """Store a value; with persist (and a db_path) it is also written to the SQLite tier"""
+        expires_at = time.time() + ttl if ttl is not None else None
+        self._remember(key, namespace, value, expires_at)
+        if persist and self.db_path:
+            try:
+                with sqlite3.connect(self.db_path) as conn:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO result_cache (key, namespace, value, expires_at) VALUES (?, ?, ?, ?)",
+                        (key, namespace, json.dumps(value), expires_at)
+                    )
+            except (TypeError, ValueError) as e:
+                self.logger.warning(f"Result for {key} is not JSON serializable, kept in memory only: {e}")
+
+    def invalidate(self, key: Optional[str] = None, namespace: Optional[str] = None):
+        """Drop one key, every key of a namespace, or everything when called without arguments"""
+        with self._lock:
+            if key is not None:
+                self._entries.pop(key, None)
+            elif namespace is not None:
+                for k in [k for k, entry in self._entries.items() if entry[0] == namespace]:
+                    del self._entries[k]
+            else:
+                self._entries.clear()
+        if self.db_path:
+            with sqlite3.connect(self.db_path) as conn:
+                if key is not None:
+                    conn.execute("DELETE FROM result_cache WHERE key = ?", (key,))
+                elif namespace is not None:
+                    conn.execute("DELETE FROM result_cache WHERE namespace = ?", (namespace,))
+                else:
+                    conn.execute("DELETE FROM result_cache")
+
+    def get_or_compute(self, namespace: str, params: Any, compute: Callable[[], Any],
+                       ttl: Optional[float] = None, persist: bool = False) -> Any:
+        key = cache_key(namespace, params)
+        value = self.get(key)
+        if value is MISS:
+            value = compute()
+            self.set(key, value, ttl=ttl, persist=persist, namespace=namespace)
+        return value
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+    def _remember(self, key: str, namespace: str, value: Any, expires_at: Optional[float]):
+        with self._lock:
+            self._entries[key] = (namespace, copy.deepcopy(value), expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _load(self, key: str, now: float) -> Any:
+        if not self.db_path:
+            return MISS
+        with sqlite3.connect(self.db_path) as conn:
+            row = conn.execute("SELECT namespace, value, expires_at FROM result_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return MISS
+            namespace, raw, expires_at = row
+            if expires_at is not None and expires_at <= now:
+                conn.execute("DELETE FROM result_cache WHERE key = ?", (key,))
+                return MISS
+        value = json.loads(raw)
+        self._remember(key, namespace, value, expires_at)
+        return copy.deepcopy(value)
+
+
+class ComponentCache:
+    """
+    Cache API handed to components as context["_cache"], scoped to the component type:
+
+        hit = ctx["_cache"].get({"source": source})
+        if hit is MISS: ...
+
+    cache may be a function returning the ResultCache, called on first use: every
+    step gets a ComponentCache, and most never touch it.
+    """
+
+    def __init__(self, cache: Union[ResultCache, Callable[[], ResultCache]], namespace: str):
+        self._source = cache
+        self._resolved: Optional[ResultCache] = cache if isinstance(cache, ResultCache) else None
+        self.namespace = namespace
+
+    @property
+    def _cache(self) -> ResultCache:
+        if self._resolved is None:
+            self._resolved = self._source()
+        return self._resolved
+
+    def get(self, params: Any) -> Any:
+        return self._cache.get(cache_key(self.namespace, params))
+
+    def set(self, params: Any, value: Any, ttl: Optional[float] = None, persist: bool = False):
+        self._cache.set(cache_key(self.namespace, params), value, ttl=ttl, persist=persist, namespace=self.namespace)
+
+    def get_or_compute(self, params: Any, compute: Callable[[], Any], ttl: Optional[float] = None, persist: bool = False) -> Any:
+        return self._cache.get_or_compute(self.namespace, params, compute, ttl=ttl, persist=persist)
+
+    def invalidate(self, params: Any = None):
+        """Drop one entry, or every entry of this component when params is None"""
+        if params is None:
+            self._cache.invalidate(namespace=self.namespace)
+        else:
+            self._cache.invalidate(key=cache_key(self.namespace, params))
@@ -0,0 +1,21 @@
+import random
+
+from .config_parser import RetryModel
+
+
+def is_retryable(error: BaseException, policy: RetryModel) -> bool:
+    """Match the error (or one of its base classes) against the policy's retry_on names"""
+    if not policy.retry_on:
+        return isinstance(error, Exception)
+    names = {cls.__name__ for cls in type(error).__mro__} | {
+        f"{cls.__module__}.{cls.__name__}" for cls in type(error).__mro__
+    }
+    return any(name in names for name in policy.retry_on)
+
+
+def retry_delay(policy: RetryModel, attempt: int) -> float:
+    """Exponential backoff with jitter before retry number `attempt` (1-based)"""
+    delay = min(policy.max_delay, policy.backoff * policy.multiplier ** (attempt - 1))
+    if policy.jitter:
+        delay *= 1 + random.uniform(-policy.jitter, policy.jitter)
+    return max(0.0, delay)
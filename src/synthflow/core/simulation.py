@@ -0,0 +1,425 @@
+import copy
+import heapq
+import itertools
+import random
+import sqlite3
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from .config_parser import ProcessModel
+from .component_manager import ComponentManager
+from .strategy_manager import StrategyManager
+from .state_tracker import StateTracker
+from .execution_engine import ExecutionEngine, ExecutionStatus
+from .execution_plan import Instruction
+from .batch_runner import percentile
+from ..utils.logger import get_logger
+
+# Resource held by an instance from start to finish (a BatchRunner worker and its browser)
+WORKER = "worker"
+# Component types whose steps queue for a resource besides the worker
+DEFAULT_RESOURCES = {"human_interaction": "reviewer"}
+# Component types answered by the human policy instead of a stub result
+HUMAN_COMPONENTS = ("human_interaction",)
+# Answer given to human steps without a policy (same as HumanInteraction without a tracker)
+DEFAULT_ANSWER = {"status": "completed", "action": "execute"}
+
+
+class Latency:
+    """Service-time distribution of a step, in (virtual) seconds"""
+
+    def __init__(self, kind: str, *args: float, samples: Optional[List[float]] = None):
+        self.kind = kind
+        self.args = args
+        self.samples = list(samples or [])
+
+    @classmethod
+    def fixed(cls, seconds: float) -> "Latency":
+        return cls("fixed", seconds)
+
+    @classmethod
+    def uniform(cls, low: float, high: float) -> "Latency":
+        return cls("uniform", low, high)
+
+    @classmethod
+    def exponential(cls, mean: float) -> "Latency":
+        return cls("exponential", mean)
+
+    @classmethod
+    def normal(cls, mean: float, stddev: float) -> "Latency":
+        return cls("normal", mean, stddev)
+
+    @classmethod
+    def empirical(cls, samples: List[float]) -> "Latency":
+        """Resample observed durations (e.g. from the audit log)"""
+        if not samples:
+            raise ValueError("Empirical latency needs at least one sample")
+        return cls("empirical", samples=samples)
+
+    @classmethod
+    def parse(cls, spec: Union["Latency", float, Dict[str, Any]]) -> "Latency":
+        """Accepts a Latency, a number (fixed) or {"exponential": 2.0} / {"uniform": [1, 3]}"""
+        if isinstance(spec, Latency):
+            return spec
+        if isinstance(spec, (int, float)):
+            return cls.fixed(float(spec))
+        if isinstance(spec, dict) and len(spec) == 1:
+            kind, value = next(iter(spec.items()))
+            args = value if isinstance(value, (list, tuple)) else [value]
+            if kind == "empirical":
+                return cls.empirical(list(args))
+            if kind in ("fixed", "uniform", "exponential", "normal"):
+                return getattr(cls, kind)(*args)
+        raise ValueError(f"Invalid latency spec: {spec!r}")
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "fixed":
+            value = self.args[0]
+        elif self.kind == "uniform":
+            value = rng.uniform(*self.args)
+        elif self.kind == "exponential":
+            value = rng.expovariate(1.0 / self.args[0]) if self.args[0] > 0 else 0.0
+        elif self.kind == "normal":
+            value = rng.gauss(*self.args)
+        elif self.kind == "empirical":
+            value = rng.choice(self.samples)
+        else:
+            raise ValueError(f"Unknown latency kind: {self.kind}")
+        return max(0.0, value)
+
+    def __repr__(self):
+        if self.kind == "empirical":
+            return f"Latency.empirical(<{len(self.samples)} samples>)"
+        return f"Latency.{self.kind}({', '.join(str(a) for a in self.args)})"
+
+
+def latencies_from_audit(db_path: str) -> Dict[str, Latency]:
+    """
+    Empirical latency per step id from the durations of completed steps in audit_log.
+    Rows are not tagged with the process, so filter the result when several
+    processes with overlapping step ids share the database.
+    """
+    durations: Dict[str, List[float]] = {}
+    with sqlite3.connect(db_path) as conn:
+        rows = conn.execute(
+            "SELECT step_id, duration FROM audit_log WHERE status = 'completed' AND step_id IS NOT NULL AND duration > 0"
+        ).fetchall()
+    for step_id, duration in rows:
+        durations.setdefault(step_id, []).append(duration)
+    return {step_id: Latency.empirical(values) for step_id, values in durations.items()}
+
+
+@dataclass
+class Demand:
+    """One atomic step of a simulated instance: its service time and the resource it needs"""
+    step_id: str
+    component_type: str
+    resource: Optional[str]
+    service: float
+
+
+@dataclass
+class ResourceStats:
+    name: str
+    capacity: Optional[int]
+    requests: int = 0
+    busy_time: float = 0.0
+    waits: List[float] = field(default_factory=list)
+    max_queue: int = 0
+    horizon: float = 0.0
+
+    @property
+    def utilisation(self) -> Optional[float]:
+        if not self.capacity or self.horizon <= 0:
+            return None
+        return self.busy_time / (self.capacity * self.horizon)
+
+    def summary(self) -> Dict[str, Any]:
+        utilisation = self.utilisation
+        return {
+            "capacity": self.capacity if self.capacity else "unbounded",
+            "requests": self.requests,
+            "utilisation": round(utilisation, 3) if utilisation is not None else None,
+            "mean_busy": round(self.busy_time / self.horizon, 3) if self.horizon > 0 else 0.0,
+            "wait_mean": round(sum(self.waits) / len(self.waits), 3) if self.waits else 0.0,
+            "wait_p90": round(percentile(self.waits, 90), 3),
+            "max_queue": self.max_queue,
+        }
+
+
+@dataclass
+class SimulationReport:
+    traces: List[List[Demand]] = field(default_factory=list)
+    arrivals: List[float] = field(default_factory=list)
+    finishes: List[float] = field(default_factory=list)
+    queue_delays: List[float] = field(default_factory=list)
+    failed: int = 0
+    resources: Dict[str, ResourceStats] = field(default_factory=dict)
+
+    @property
+    def makespan(self) -> float:
+        return max(self.finishes) if self.finishes else 0.0
+
+    @property
+    def throughput(self) -> float:
+        """Predicted finished instances per (virtual) second"""
+        return len(self.finishes) / self.makespan if self.makespan > 0 else 0.0
+
+    def latency(self, p: float) -> float:
+        return percentile([f - a for a, f in zip(self.arrivals, self.finishes)], p)
+
+    def queue_delay(self, p: float) -> float:
+        return percentile(self.queue_delays, p)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "instances": len(self.finishes),
+            "failed": self.failed,
+            "makespan": round(self.makespan, 3),
+            "throughput_per_s": round(self.throughput, 4),
+            "throughput_per_h": round(self.throughput * 3600, 1),
+            "latency_p50": round(self.latency(50), 3),
+            "latency_p90": round(self.latency(90), 3),
+            "queue_delay_p50": round(self.queue_delay(50), 3),
+            "queue_delay_p90": round(self.queue_delay(90), 3),
+            "resources": {name: stats.summary() for name, stats in self.resources.items()},
+        }
+
+
+class _Resource:
+    """FIFO pool of identical servers; capacity None is unbounded"""
+
+    def __init__(self, name: str, capacity: Optional[int]):
+        self.stats = ResourceStats(name, capacity)
+        self.capacity = capacity
+        self.busy = 0
+        self.queue = deque()
+        self._last = 0.0
+
+    def _advance(self, now: float):
+        self.stats.busy_time += self.busy * (now - self._last)
+        self._last = now
+
+    def request(self, now: float, granted: Callable[[float, float], None]):
+        """granted(now, wait) runs as soon as a server is free"""
+        self._advance(now)
+        self.stats.requests += 1
+        if self.capacity is None or self.busy < self.capacity:
+            self.busy += 1
+            self.stats.waits.append(0.0)
+            granted(now, 0.0)
+        else:
+            self.queue.append((now, granted))
+            self.stats.max_queue = max(self.stats.max_queue, len(self.queue))
+
+    def release(self, now: float):
+        self._advance(now)
+        if self.queue:
+            # The server passes straight to the next waiter
+            requested, granted = self.queue.popleft()
+            self.stats.waits.append(now - requested)
+            granted(now, now - requested)
+        else:
+            self.busy -= 1
+
+
+class _SimulatedEngine(ExecutionEngine):
+    """Runs the real control flow but answers every atomic step with a stub"""
+
+    def __init__(self, simulator: "Simulator"):
+        super().__init__(ComponentManager(), StrategyManager(), StateTracker(db_path=None))
+        self.simulator = simulator
+        self.trace: List[Demand] = []
+        self._trace_lock = threading.Lock()
+
+    def _element_probe(self, selector: str):
+        # No page: a while_element loop runs the number of iterations the simulator samples
+        iterations = self.simulator._iterations(selector)
+        return lambda i: i < iterations
+
+    def _execute_atomic_step(self, instr: Instruction):
+        step = instr.step
+        self.tracker.snapshot(step.id, "executing", {"type": step.type})
+        params = self._prepare_params(instr)
+        demand, result = self.simulator._stub(instr, params)
+        with self._trace_lock:
+            self.trace.append(demand)
+        self._store_result(step, result)
+        return result
+
+
+class Simulator:
+    """
+    负责以虚拟时间模拟流程的批量执行，预测吞吐量、排队延迟和各资源利用率（用于容量规划）
+    """
+
+    def __init__(self,
+                 process_model: ProcessModel,
+                 latency: Optional[Dict[str, Any]] = None,
+                 default_latency: Any = 1.0,
+                 human_policy: Optional[Union[Dict[str, Any], Callable[[str, Dict[str, Any], random.Random], Any]]] = None,
+                 outputs: Optional[Dict[str, Any]] = None,
+                 resources: Optional[Dict[str, str]] = None,
+                 iterations: Optional[Dict[str, Any]] = None,
+                 default_iterations: int = 1,
+                 seed: Optional[int] = None):
+        """
+        Args:
+            process_model: The process to simulate.
+            latency: Service time per step id or component type (step id wins); values
+                are Latency objects or specs accepted by Latency.parse. Use
+                latencies_from_audit() to replay historical durations.
+            default_latency: Service time of steps without an entry.
+            human_policy: Answers for human steps: {step_id: answer or [answers to pick from]},
+                or a callable (step_id, params, rng) -> answer. Defaults to DEFAULT_ANSWER.
+            outputs: Stub results of other steps by step id (default {"status": "success"}),
+                so data bindings and conditions can follow realistic paths.
+            resources: Component type -> resource it queues for (default DEFAULT_RESOURCES).
+            iterations: Iterations of while_element loops (there is no page to check), by
+                loop selector: a count, or a list of counts to pick from per instance.
+            default_iterations: Iterations of while_element loops without an entry.
+            seed: Makes the run reproducible.
+        """
+        self.process_model = process_model
+        self.latency = {key: Latency.parse(spec) for key, spec in (latency or {}).items()}
+        self.default_latency = Latency.parse(default_latency)
+        self.human_policy = human_policy or {}
+        self.outputs = dict(outputs or {})
+        self.resources = dict(DEFAULT_RESOURCES if resources is None else resources)
+        self.iterations = dict(iterations or {})
+        self.default_iterations = max(0, int(default_iterations))
+        self.rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self.logger = get_logger("Simulator")
+
+    def trace(self, row: Optional[Dict[str, Any]] = None, index: int = 0) -> Tuple[List[Demand], bool]:
+        """Run one instance through the real engine with stubs; returns (demands, succeeded)"""
+        engine = _SimulatedEngine(self)
+        for key, value in (row or {}).items():
+            engine.tracker.set_context(key, value)
+        engine.tracker.set_context("batch_index", index)
+        result = engine.execute(self.process_model)
+        if result.status != ExecutionStatus.COMPLETED:
+            self.logger.warning(f"Simulated instance {index} ended {result.status.value}: {result.error}")
+        return engine.trace, result.status == ExecutionStatus.COMPLETED
+
+    def run(self,
+            dataset: Optional[List[Dict[str, Any]]] = None,
+            count: Optional[int] = None,
+            workers: int = 4,
+            capacities: Optional[Dict[str, int]] = None,
+            arrival_rate: Optional[float] = None) -> SimulationReport:
+        """
+        Simulate one instance per dataset row (or `count` instances) on `workers`
+        concurrent instance slots and the given resource capacities (e.g.
+        {"reviewer": 2}; resources without a capacity are unbounded).
+        Instances arrive as a Poisson stream of `arrival_rate` per second, or
+        all at time 0 (a backlog) when it is None.
+
+        Parallel branches are replayed one after another, so predictions for
+        processes with parallel steps are pessimistic.
+        """
+        if dataset is None:
+            dataset = [{} for _ in range(count or 0)]
+        report = SimulationReport()
+        for i, row in enumerate(dataset):
+            demands, ok = self.trace(row, i)
+            report.traces.append(demands)
+            report.failed += 0 if ok else 1
+
+        t = 0.0
+        for _ in dataset:
+            report.arrivals.append(t)
+            if arrival_rate:
+                t += self.rng.expovariate(arrival_rate)
+        self._replay(report, max(1, int(workers)), dict(capacities or {}))
+        self.logger.info(f"Simulation of '{self.process_model.name}' finished: {report.summary()}")
+        return report
+
+    def _replay(self, report: SimulationReport, workers: int, capacities: Dict[str, int]):
+        """Discrete-event replay of the recorded traces in virtual time"""
+        pools = {WORKER: _Resource(WORKER, workers)}
+        for trace in report.traces:
+            for demand in trace:
+                if demand.resource and demand.resource not in pools:
+                    pools[demand.resource] = _Resource(demand.resource, capacities.get(demand.resource))
+        events = []
+        seq = itertools.count()
+        finishes = [0.0] * len(report.traces)
+        delays = [0.0] * len(report.traces)
+
+        def schedule(at: float, action: Callable[[float], None]):
+            heapq.heappush(events, (at, next(seq), action))
+
+        def step(index: int, k: int, now: float):
+            trace = report.traces[index]
+            if k == len(trace):
+                pools[WORKER].release(now)
+                finishes[index] = now
+                return
+            demand = trace[k]
+            pool = pools.get(demand.resource) if demand.resource else None
+            if pool is None:
+                schedule(now + demand.service, lambda t: step(index, k + 1, t))
+                return
+
+            def granted(at: float, wait: float):
+                delays[index] += wait
+
+                def done(t: float):
+                    pool.release(t)
+                    step(index, k + 1, t)
+                schedule(at + demand.service, done)
+            pool.request(now, granted)
+
+        def arrive(index: int, now: float):
+            def granted(at: float, wait: float):
+                delays[index] += wait
+                schedule(at, lambda t: step(index, 0, t))
+            pools[WORKER].request(now, granted)
+
+        for index, arrival in enumerate(report.arrivals):
+            schedule(arrival, lambda t, index=index: arrive(index, t))
+        now = 0.0
+        while events:
+            now, _, action = heapq.heappop(events)
+            action(now)
+
+        report.finishes = finishes
+        report.queue_delays = delays
+        for name, pool in pools.items():
+            pool._advance(now)
+            pool.stats.horizon = now
+            report.resources[name] = pool.stats
+
+    def _latency(self, instr: Instruction) -> Latency:
+        return self.latency.get(instr.step_id) or self.latency.get(instr.component_type) or self.default_latency
+
+    def _stub(self, instr: Instruction, params: Dict[str, Any]):
+        """Sample the step's service time and produce its stub result"""
+        with self._rng_lock:
+            service = self._latency(instr).sample(self.rng)
+            if instr.component_type in HUMAN_COMPONENTS:
+                result = self._answer(instr.step_id, params)
+            else:
+                result = self.outputs.get(instr.step_id, {"status": "success"})
+        result = copy.deepcopy(result)
+        demand = Demand(instr.step_id, instr.component_type, self.resources.get(instr.component_type), service)
+        return demand, result
+
+    def _iterations(self, selector: str) -> int:
+        count = self.iterations.get(selector, self.default_iterations)
+        if isinstance(count, list):
+            with self._rng_lock:
+                count = self.rng.choice(count)
+        return int(count)
+
+    def _answer(self, step_id: str, params: Dict[str, Any]) -> Any:
+        if callable(self.human_policy):
+            return self.human_policy(step_id, params, self.rng)
+        answer = self.human_policy.get(step_id, DEFAULT_ANSWER)
+        if isinstance(answer, list):
+            return self.rng.choice(answer)
+        return answer
@@ -1,11 +1,27 @@
-import sqlite3
+import asyncio
 import json
 import uuid
 import time
-from typing import List, Dict, Any, Optional
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Union
 from datetime import datetime
 from pydantic import BaseModel, Field
 from ..utils.logger import get_logger
+from .audit_writer import AuditWriter
+from .audit_query import AuditRecord
+from .audit_storage import AuditStorage, NullStorage, SQLiteStorage, open_storage
+from .blob_store import BlobStore
+from .context_store import ContextStore
+
+# Rows an event-loop run may have queued for its background persister before a
+# step boundary waits for them (see drain_async)
+MAX_AUDIT_BACKLOG = 1000
+
+
+def _noop():
+    pass
 
 class ExecutionState(BaseModel):
     timestamp: datetime = Field(default_factory=datetime.now)
@@ -18,136 +34,388 @@ class ExecutionState(BaseModel):
 class ExecutionTimeline(BaseModel):
     events: List[ExecutionState] = Field(default_factory=list)
 
+class TimelineEvent:
+    """Compact in-memory event; turned into an ExecutionState only when serialized"""
+    __slots__ = ("timestamp", "trace_id", "step_id", "status", "details", "duration")
+
+    def __init__(self, timestamp: float, trace_id: str, step_id: Optional[str], status: str,
+                 details: Dict[str, Any], duration: float):
+        self.timestamp = timestamp # Epoch seconds
+        self.trace_id = trace_id
+        self.step_id = step_id
+        self.status = status
+        self.details = details
+        self.duration = duration
+
+    def to_state(self) -> ExecutionState:
+        return ExecutionState(
+            timestamp=datetime.fromtimestamp(self.timestamp),
+            trace_id=self.trace_id,
+            step_id=self.step_id,
+            status=self.status,
+            details=self.details,
+            duration=self.duration
+        )
+
+class EventRing:
+    """Fixed-capacity buffer of the most recent events; older ones live only in the audit storage"""
+
+    def __init__(self, capacity: int):
+        self._events = deque(maxlen=max(1, int(capacity)))
+        self.dropped = 0
+
+    def append(self, event: TimelineEvent):
+        if len(self._events) == self._events.maxlen:
+            self.dropped += 1
+        self._events.append(event)
+
+    def last(self, n: int) -> List[TimelineEvent]:
+        events = list(self._events)
+        return events[-n:] if n > 0 else []
+
+    def __len__(self):
+        return len(self._events)
+
+    def __iter__(self):
+        return iter(list(self._events))
+
 class StateTracker:
     """
-    负责维护流程执行状态和历史，支持 SQLite 持久化
+    负责维护流程执行状态和历史，支持可插拔的审计存储（SQLite、JSONL、内存或不持久化）
     """
     
-    def __init__(self, db_path="synthflow.db", trace_id: str = None):
-        self._timeline = ExecutionTimeline()
-        self._current_state: Optional[ExecutionState] = None
-        self._context: Dict[str, Any] = {}
+    def __init__(self, db_path="synthflow.db", trace_id: str = None, audit_writer: Optional[AuditWriter] = None,
+                 keyframe_interval: int = 100, timeline_size: int = 2000,
+                 storage: Union[str, AuditStorage, None] = None,
+                 blob_store: Union[str, BlobStore, None] = None):
+        # Memory stays flat however long the run: only the latest events are kept here
+        self._timeline = EventRing(timeline_size)
+        # Large context values and event details (page text, screenshots) live in the
+        # blob store (a BlobStore or its directory); the context and audit rows keep references
+        self.blobs = BlobStore(blob_store) if isinstance(blob_store, str) else blob_store
+        # Nested, lock-free for readers; writers (parallel/dag steps) serialize inside the store
+        self._context = ContextStore(blobs=self.blobs)
+        # Orders audit rows among concurrent snapshots; context writers never wait on it
+        self._audit_lock = threading.Lock()
+        # Set by persist_in_background(): one worker thread appends the rows (and runs
+        # step-durability flushes) in order, so callers on an event loop never block
+        self._persister: Optional[ThreadPoolExecutor] = None
+        self._backlog = 0
+        self._backlog_lock = threading.Lock()
+        # Audit rows store only the top-level keys changed since the previous row,
+        # with a full keyframe every keyframe_interval rows (and on the first row)
+        self.keyframe_interval = max(1, int(keyframe_interval))
+        self._since_keyframe: Optional[int] = None
         self.logger = get_logger("StateTracker")
         self.db_path = db_path
         self.trace_id = trace_id or str(uuid.uuid4())
-        self._step_start_times: Dict[str, float] = {}
-        self._pending_interaction: Optional[Dict[str, Any]] = None
-        self._interaction_result: Optional[Dict[str, Any]] = None
-        self._init_db()
+        # Keyed by (thread, step_id) so concurrent workers running the same step don't collide
+        self._step_start_times: Dict[tuple, float] = {}
+        # Human interactions by id: open requests, delivered results and async waiters
+        self._pending_interactions: Dict[Optional[str], Dict[str, Any]] = {}
+        self._interaction_results: Dict[Optional[str], Dict[str, Any]] = {}
+        self._interaction_wakers: Dict[Optional[str], List[Any]] = {}
+        # Signalled when a result arrives (or a control state changes) so waiters wake at once
+        self._interaction_cond = threading.Condition()
+        # Where audit rows go: an AuditStorage or a spec ("sqlite:<path>", "jsonl:<dir>",
+        # "memory", "null"); by default the audit_log table of db_path (db_path=None keeps
+        # the timeline in memory only)
+        if storage is not None:
+            self.storage = open_storage(storage)
+        elif self.db_path:
+            self.storage = SQLiteStorage(self.db_path, audit_writer)
+        else:
+            self.storage = NullStorage()
 
     def set_pending_interaction(self, interaction_data: Dict[str, Any]):
-        self._pending_interaction = interaction_data
+        """Register an interaction awaiting a decision; its "id" keys the result handoff"""
+        with self._interaction_cond:
+            self._pending_interactions[interaction_data.get("id")] = interaction_data
         self.logger.info(f"Pending interaction set: {interaction_data}")
 
     def get_pending_interaction(self) -> Optional[Dict[str, Any]]:
-        return self._pending_interaction
+        """The oldest interaction still waiting for a decision"""
+        with self._interaction_cond:
+            return next(iter(self._pending_interactions.values()), None)
 
-    def resolve_interaction(self, result: Dict[str, Any]):
-        self._interaction_result = result
-        self._pending_interaction = None
+    def get_pending_interactions(self) -> List[Dict[str, Any]]:
+        with self._interaction_cond:
+            return list(self._pending_interactions.values())
+
+    def resolve_interaction(self, result: Dict[str, Any], interaction_id: Optional[str] = None) -> bool:
+        """
+        Hand a decision to the interaction waiting under interaction_id (the
+        oldest pending one when omitted). The waiter wakes immediately, and a
+        result that arrives before the wait starts is kept for it. Returns False,
+        keeping nothing, when no pending interaction matches.
+        """
+        with self._interaction_cond:
+            if interaction_id is None and self._pending_interactions:
+                interaction_id = next(iter(self._pending_interactions))
+            elif interaction_id not in self._pending_interactions:
+                # Timed out, never asked, or nothing pending: nobody would collect it
+                self.logger.warning(f"Ignoring result for unknown or expired interaction {interaction_id}")
+                return False
+            self._pending_interactions.pop(interaction_id, None)
+            self._interaction_results[interaction_id] = result
+            wakers = list(self._interaction_wakers.get(interaction_id, ()))
+            self._interaction_cond.notify_all()
+        for waker in wakers:
+            waker()
         self.logger.info(f"Interaction resolved: {result}")
-        
-    def wait_for_interaction_result(self, timeout: int = 300) -> Optional[Dict[str, Any]]:
-        start = time.time()
-        self._interaction_result = None
-        while time.time() - start < timeout:
-            if self._interaction_result:
-                res = self._interaction_result
-                self._interaction_result = None
-                return res
-            time.sleep(0.5)
-        return None
-
-    def _init_db(self):
-        """Initialize SQLite database for audit logs"""
+        return True
+
+    def take_interaction_result(self, interaction_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Non-blocking: return and clear the result for interaction_id, if any"""
+        with self._interaction_cond:
+            return self._interaction_results.pop(interaction_id, None)
+
+    def wait_for_interaction_result(self, timeout: float = 300, control=None,
+                                    interaction_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Block until the result for interaction_id arrives or the timeout passes.
+        With an ExecutionControl, a cancel interrupts the wait (ExecutionCancelled).
+        """
+        end = time.monotonic() + timeout
+
+        def wake():
+            with self._interaction_cond:
+                self._interaction_cond.notify_all()
+
+        if control is not None:
+            control.add_waker(wake)
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                # Basic table creation
-                conn.execute("""
-                    CREATE TABLE IF NOT EXISTS audit_log (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        trace_id TEXT,
-                        timestamp TEXT,
-                        step_id TEXT,
-                        status TEXT,
-                        details TEXT,
-                        context_snapshot TEXT,
-                        duration REAL
-                    )
-                """)
-                
-                # Migration: Check if new columns exist, if not add them (Simulated migration)
-                # For simplicity in this dev environment, we assume table might need recreation 
-                # or we just try to add columns and ignore errors if they exist.
-                cursor = conn.cursor()
-                cursor.execute("PRAGMA table_info(audit_log)")
-                columns = [info[1] for info in cursor.fetchall()]
-                
-                if "trace_id" not in columns:
-                    conn.execute("ALTER TABLE audit_log ADD COLUMN trace_id TEXT")
-                if "duration" not in columns:
-                    conn.execute("ALTER TABLE audit_log ADD COLUMN duration REAL")
-                    
-        except Exception as e:
-            self.logger.error(f"Failed to initialize audit DB: {e}")
+            with self._interaction_cond:
+                while True:
+                    if control is not None:
+                        control.raise_if_cancelled()
+                    if interaction_id in self._interaction_results:
+                        return self._interaction_results.pop(interaction_id)
+                    remaining = end - time.monotonic()
+                    if remaining <= 0:
+                        self._pending_interactions.pop(interaction_id, None)
+                        return None
+                    self._interaction_cond.wait(remaining)
+        finally:
+            if control is not None:
+                control.remove_waker(wake)
+
+    async def wait_for_interaction_result_async(self, timeout: float = 300, control=None,
+                                                interaction_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Awaitable wait_for_interaction_result: parks the task, not a thread"""
+        loop = asyncio.get_running_loop()
+        changed = asyncio.Event()
+        waker = lambda: loop.call_soon_threadsafe(changed.set)
+        with self._interaction_cond:
+            self._interaction_wakers.setdefault(interaction_id, []).append(waker)
+        if control is not None:
+            control.add_waker(waker)
+        try:
+            end = loop.time() + timeout
+            while True:
+                if control is not None:
+                    control.raise_if_cancelled()
+                changed.clear()
+                result = self.take_interaction_result(interaction_id)
+                if result is not None:
+                    return result
+                remaining = end - loop.time()
+                if remaining <= 0:
+                    with self._interaction_cond:
+                        self._pending_interactions.pop(interaction_id, None)
+                    return None
+                try:
+                    await asyncio.wait_for(changed.wait(), remaining)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            with self._interaction_cond:
+                wakers = self._interaction_wakers.get(interaction_id, [])
+                if waker in wakers:
+                    wakers.remove(waker)
+                if not wakers:
+                    self._interaction_wakers.pop(interaction_id, None)
+            if control is not None:
+                control.remove_waker(waker)
 
     def set_context(self, key: str, value: Any):
-        self._context[key] = value
+        """Set a value; a dotted key ("step_x.output") is stored nested"""
+        self._context.set(key, value)
         self.logger.debug(f"Context updated: {key} = {str(value)[:50]}...")
 
+    def delete_context(self, key: str):
+        """Remove a value (a dotted key removes just that leaf)"""
+        self._context.delete(key)
+
     def get_context(self, key: str) -> Any:
+        """Value at a top-level key or dotted path; None when missing"""
         return self._context.get(key)
-        
+
     def get_all_context(self) -> Dict[str, Any]:
+        """A consistent shallow copy of the (nested) context"""
+        return self._context.snapshot()
+
+    @property
+    def context(self) -> ContextStore:
         return self._context
 
+    def context_json(self) -> str:
+        """Serialize the context (consistent with concurrent writers, without blocking them)"""
+        return json.dumps(self._context.snapshot(), default=str)
+
+    def restore_context(self, context: Dict[str, Any]):
+        """Replace the context, e.g. with the one stored in a checkpoint"""
+        with self._audit_lock:
+            self._context.replace(context)
+            self._since_keyframe = None
+
     def snapshot(self, step_id: Optional[str], status: str, details: Dict[str, Any] = None):
         """
         Record a snapshot of the current state to memory and DB
         """
         if details is None:
             details = {}
+        elif self.blobs is not None:
+            details = self.blobs.spill(details)[0]
             
         # Calculate duration
+        now = time.time()
         duration = 0.0
+        timer_key = (threading.get_ident(), step_id)
         if status in ["running", "executing", "started"]:
-            self._step_start_times[step_id] = time.time()
-        elif status in ["completed", "failed"] and step_id in self._step_start_times:
-            start_time = self._step_start_times.pop(step_id)
-            duration = time.time() - start_time
-            
-        state = ExecutionState(
-            trace_id=self.trace_id,
-            step_id=step_id,
-            status=status,
-            details=details,
-            duration=duration
-        )
-        # Memory storage
-        self._timeline.events.append(state)
-        self._current_state = state
-        self.logger.info(f"[{self.trace_id}] {state.timestamp} | Step: {step_id} | Status: {status} | Duration: {duration:.3f}s")
+            self._step_start_times[timer_key] = now
+        elif status in ["completed", "failed"] and timer_key in self._step_start_times:
+            start_time = self._step_start_times.pop(timer_key)
+            duration = now - start_time
+
+        # Memory storage (no validation on the hot path)
+        event = TimelineEvent(now, self.trace_id, step_id, status, details, duration)
+        self._timeline.append(event)
+        timestamp = datetime.fromtimestamp(now).isoformat()
+        self.logger.info(f"[{self.trace_id}] {timestamp} | Step: {step_id} | Status: {status} | Duration: {duration:.3f}s")
 
         # Persistent storage (Audit Log)
+        if not self.storage.enabled:
+            return
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.execute(
-                    "INSERT INTO audit_log (trace_id, timestamp, step_id, status, details, context_snapshot, duration) VALUES (?, ?, ?, ?, ?, ?, ?)",
-                    (
-                        state.trace_id,
-                        state.timestamp.isoformat(), 
-                        step_id, 
-                        status, 
-                        json.dumps(details, default=str),
-                        json.dumps(self._context, default=str),
-                        duration
-                    )
+            # Rows reach the storage in the order their deltas were taken
+            with self._audit_lock:
+                kind, context_json = self._context_record()
+                row = (
+                    event.trace_id,
+                    timestamp,
+                    step_id,
+                    status,
+                    json.dumps(details, default=str),
+                    context_json,
+                    duration,
+                    kind
                 )
+                if self._persister is not None:
+                    with self._backlog_lock:
+                        self._backlog += 1
+                    self._persister.submit(self._persist_row, row, status)
+                    return
+                self.storage.append(row)
         except Exception as e:
             self.logger.error(f"Failed to persist snapshot: {e}")
+            return
+        if self.storage.durability == "step" and status in ("completed", "failed"):
+            self.storage.flush()
+
+    def _persist_row(self, row, status: str):
+        """Runs on the background persister"""
+        try:
+            self.storage.append(row)
+            if self.storage.durability == "step" and status in ("completed", "failed"):
+                self.storage.flush()
+        except Exception as e:
+            self.logger.error(f"Failed to persist snapshot: {e}")
+        finally:
+            with self._backlog_lock:
+                self._backlog -= 1
+
+    def persist_in_background(self, enabled: bool = True):
+        """
+        Hand storage appends and durability flushes to a worker thread (for runs on
+        an event loop, where snapshot() must not block). Disabling waits for the
+        queued rows first.
+        """
+        with self._audit_lock:
+            if enabled and self._persister is None:
+                self._persister = ThreadPoolExecutor(max_workers=1, thread_name_prefix="synthflow-audit")
+            elif not enabled and self._persister is not None:
+                self._persister.shutdown(wait=True)
+                self._persister = None
+
+    async def drain_async(self, max_backlog: Optional[int] = None):
+        """
+        Wait, without blocking the event loop, until the background persister is
+        down to max_backlog rows: by default none under "step" durability (a finished
+        step is durable before the next one starts), else MAX_AUDIT_BACKLOG.
+        """
+        if max_backlog is None:
+            max_backlog = 0 if self.storage.durability == "step" else MAX_AUDIT_BACKLOG
+        persister = self._persister
+        if persister is not None and self._backlog > max_backlog:
+            try:
+                await asyncio.wrap_future(persister.submit(_noop))
+            except RuntimeError:
+                pass  # Shut down meanwhile, after persisting everything queued
+
+    def _context_record(self):
+        """('full', whole context) for keyframes, else ('delta', keys set since the previous row)"""
+        if self._since_keyframe is None or self._since_keyframe >= self.keyframe_interval:
+            self._since_keyframe = 1
+            return "full", json.dumps(self._context.snapshot(clear_changes=True), default=str)
+        self._since_keyframe += 1
+        return "delta", json.dumps(self._context.take_changes(), default=str)
+
+    def reconstruct_context(self, event_id: Optional[int] = None, trace_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Full context as of an audit row (its id) of a trace; the latest row when
+        event_id is None. Replays the deltas from the closest keyframe before it.
+        """
+        self.flush()
+        return self.storage.reconstruct_context(trace_id or self.trace_id, event_id)
+
+    def read_timeline(self, trace_id: Optional[str] = None) -> List[AuditRecord]:
+        """The persisted timeline of a run (this tracker's by default), read back from the audit storage"""
+        self.flush()
+        return self.storage.read_trace(trace_id or self.trace_id)
+
+    def flush(self):
+        """Wait until every snapshot recorded so far is persisted"""
+        persister = self._persister
+        if persister is not None:
+            try:
+                persister.submit(_noop).result()
+            except RuntimeError:
+                pass  # Shut down meanwhile, after persisting everything queued
+        self.storage.flush()
+
+    def get_timeline(self, full: bool = False) -> ExecutionTimeline:
+        """
+        Events kept in memory (the latest timeline_size). With full=True, a run that
+        outgrew the buffer is read back from the audit storage instead.
+        """
+        if full and self._timeline.dropped and self.storage.enabled:
+            return ExecutionTimeline(events=[
+                ExecutionState(
+                    timestamp=datetime.fromisoformat(r.timestamp),
+                    trace_id=r.trace_id,
+                    step_id=r.step_id,
+                    status=r.status,
+                    details=r.details,
+                    duration=r.duration
+                ) for r in self.read_timeline()
+            ])
+        return ExecutionTimeline(events=[e.to_state() for e in self._timeline])
 
-    def get_timeline(self) -> ExecutionTimeline:
-        return self._timeline
+    def recent_events(self, n: int = 10) -> List[TimelineEvent]:
+        """The latest n compact events, without building models"""
+        return self._timeline.last(n)
 
     def get_current_state(self) -> Optional[ExecutionState]:
-        return self._current_state
+        last = self._timeline.last(1)
+        return last[0].to_state() if last else None
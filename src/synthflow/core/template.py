@@ -0,0 +1,249 @@
+import re
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Sentinel for "path could not be resolved" (None values are treated as missing too,
+# matching StateTracker.get_context which returns None for unknown keys)
+MISSING = object()
+
+Lookup = Callable[[str], Any]
+
+_EXPR_RE = re.compile(r"\$\{([^}]*)\}")
+_SEGMENT_RE = re.compile(r"([^.\[\]]+)|\[(\-?\d+)\]|\[['\"]([^'\"]*)['\"]\]")
+
+
+def _parse_literal(text: str) -> Any:
+    """Parse a default value: quoted string, number, true/false/null or bare string"""
+    text = text.strip()
+    if len(text) >= 2 and text[0] == text[-1] and text[0] in ("'", '"'):
+        return text[1:-1]
+    lowered = text.lower()
+    if lowered == "true":
+        return True
+    if lowered == "false":
+        return False
+    if lowered in ("null", "none"):
+        return None
+    try:
+        return int(text)
+    except ValueError:
+        pass
+    try:
+        return float(text)
+    except ValueError:
+        return text
+
+
+class PathAccessor:
+    """
+    Precompiled accessor for a dotted/indexed path such as ``step_x.output.items[0].name``.
+
+    Context keys may themselves contain dots (e.g. ``"step_x.output"``), so the accessor
+    tries the longest matching root key first and walks the remaining segments.
+    """
+
+    __slots__ = ("path", "_candidates")
+
+    def __init__(self, path: str):
+        self.path = path
+        segments: List[Tuple[str, Any]] = []  # (raw text up to and including segment, key)
+        for match in _SEGMENT_RE.finditer(path):
+            name, index, quoted = match.groups()
+            if name is not None:
+                key: Any = name
+            elif index is not None:
+                key = int(index)
+            else:
+                key = quoted
+            segments.append((path[:match.end()], key))
+        if not segments:
+            raise ValueError(f"Invalid template path: '{path}'")
+
+        # Candidate (root key, remaining keys) pairs, longest root first
+        self._candidates = tuple(
+            (segments[i][0], tuple(key for _, key in segments[i + 1:]))
+            for i in range(len(segments) - 1, -1, -1)
+        )
+
+    @property
+    def root(self) -> str:
+        return self._candidates[-1][0]
+
+    def resolve(self, lookup: Lookup) -> Any:
+        for root_key, rest in self._candidates:
+            value = lookup(root_key)
+            if value is None:
+                continue
+            value = self._walk(value, rest)
+            if value is not MISSING:
+                return value
+        return MISSING
+
+    @classmethod
+    def _walk(cls, value: Any, keys: Tuple[Any, ...], start: int = 0) -> Any:
+        if start == len(keys):
+            return value
+        if isinstance(value, dict):
+            # Nested dicts may hold flat dotted keys too (e.g. {"read_a.output": ...});
+            # try the longest dotted key first
+            for end in range(len(keys), start, -1):
+                parts = keys[start:end]
+                if len(parts) > 1 and not all(isinstance(k, str) for k in parts):
+                    continue
+                key = parts[0] if len(parts) == 1 else ".".join(parts)
+                child = value.get(key)
+                if child is not None:
+                    found = cls._walk(child, keys, end)
+                    if found is not MISSING:
+                        return found
+            return MISSING
+        if isinstance(value, (list, tuple)):
+            try:
+                child = value[int(keys[start])]
+            except (ValueError, IndexError, TypeError):
+                return MISSING
+            if child is None:
+                return MISSING
+            return cls._walk(child, keys, start + 1)
+        return MISSING
+
+
+class Expression:
+    """A single ``${path|default}`` placeholder"""
+
+    __slots__ = ("source", "accessor", "has_default", "default")
+
+    def __init__(self, source: str, body: str):
+        self.source = source
+        path, sep, default = body.partition("|")
+        self.accessor = compile_path(path.strip())
+        self.has_default = bool(sep)
+        self.default = _parse_literal(default) if sep else None
+
+    def evaluate(self, lookup: Lookup) -> Any:
+        value = self.accessor.resolve(lookup)
+        if value is MISSING and self.has_default:
+            return self.default
+        return value
+
+
+class CompiledTemplate:
+    """
+    A string parsed once into literal text and ``${...}`` expressions.
+
+    A template consisting of exactly one expression renders to the raw value
+    (dicts, numbers, ...); anything else is rendered by string interpolation.
+    """
+
+    __slots__ = ("source", "parts", "expressions", "single")
+
+    def __init__(self, source: str):
+        self.source = source
+        parts: List[Any] = []
+        pos = 0
+        for match in _EXPR_RE.finditer(source):
+            if match.start() > pos:
+                parts.append(source[pos:match.start()])
+            parts.append(Expression(match.group(0), match.group(1)))
+            pos = match.end()
+        if pos < len(source):
+            parts.append(source[pos:])
+        self.parts = tuple(parts)
+        self.expressions = tuple(p for p in parts if isinstance(p, Expression))
+        self.single = len(self.parts) == 1 and len(self.expressions) == 1
+
+    @property
+    def is_static(self) -> bool:
+        return not self.expressions
+
+    @property
+    def refs(self) -> Tuple[str, ...]:
+        """Paths referenced by this template"""
+        return tuple(e.accessor.path for e in self.expressions)
+
+    def render(self, lookup: Lookup, keep_unresolved: bool = True) -> Any:
+        """
+        Render the template against a context lookup.
+
+        Unresolved placeholders are kept verbatim when keep_unresolved is set,
+        otherwise a single-expression template yields None and interpolated
+        text drops the placeholder.
+        """
+        if not self.expressions:
+            return self.source
+        if self.single:
+            value = self.expressions[0].evaluate(lookup)
+            if value is MISSING:
+                return self.source if keep_unresolved else None
+            return value
+
+        chunks = []
+        for part in self.parts:
+            if isinstance(part, str):
+                chunks.append(part)
+                continue
+            value = part.evaluate(lookup)
+            if value is MISSING:
+                if keep_unresolved:
+                    chunks.append(part.source)
+            else:
+                chunks.append(str(value))
+        return "".join(chunks)
+
+
+@lru_cache(maxsize=4096)
+def compile_template(source: str) -> CompiledTemplate:
+    """Parse a template string once; results are shared through an LRU cache"""
+    return CompiledTemplate(source)
+
+
+@lru_cache(maxsize=4096)
+def compile_path(path: str) -> PathAccessor:
+    return PathAccessor(path)
+
+
+class ValueTemplate:
+    """
+    Precompiled renderer for a nested dict/list structure containing template strings.
+    Rendering always builds fresh containers, so the template itself is never mutated.
+    """
+
+    __slots__ = ("_render", "refs", "is_static")
+
+    def __init__(self, obj: Any):
+        refs: List[str] = []
+        self._render = self._build(obj, refs)
+        self.refs = tuple(refs)
+        self.is_static = not refs
+
+    def render(self, lookup: Lookup, keep_unresolved: bool = True) -> Any:
+        return self._render(lookup, keep_unresolved)
+
+    @classmethod
+    def _build(cls, obj: Any, refs: List[str]) -> Callable[[Lookup, bool], Any]:
+        if isinstance(obj, dict):
+            items = [(k, cls._build(v, refs)) for k, v in obj.items()]
+            return lambda lookup, keep: {k: render(lookup, keep) for k, render in items}
+        if isinstance(obj, (list, tuple)):
+            renders = [cls._build(v, refs) for v in obj]
+            return lambda lookup, keep: [render(lookup, keep) for render in renders]
+        if isinstance(obj, str) and "${" in obj:
+            template = compile_template(obj)
+            refs.extend(template.refs)
+            return template.render
+        return lambda lookup, keep: obj
+
+
+def compile_value(obj: Any) -> ValueTemplate:
+    return ValueTemplate(obj)
+
+
+def render_value(obj: Any, lookup: Lookup, keep_unresolved: bool = True) -> Any:
+    """Render a one-off structure (string templates are still served from the shared cache)"""
+    if isinstance(obj, str):
+        return compile_template(obj).render(lookup, keep_unresolved) if "${" in obj else obj
+    if isinstance(obj, dict):
+        return {k: render_value(v, lookup, keep_unresolved) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [render_value(v, lookup, keep_unresolved) for v in obj]
+    return obj
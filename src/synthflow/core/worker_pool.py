@@ -0,0 +1,132 @@
+import queue
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, List, Optional
+
+from ..utils.logger import get_logger
+
+
+@dataclass
+class JobResult:
+    index: int
+    value: Any = None
+    error: Optional[BaseException] = None
+    executed: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.executed and self.error is None
+
+
+class WorkerSlot:
+    """
+    Per-worker resources. The browser session is created lazily on first use and
+    closed by the same worker thread that created it (sync Playwright objects are
+    bound to their creating thread).
+    """
+
+    def __init__(self, session_factory: Optional[Callable[[], Any]] = None):
+        self._session_factory = session_factory
+        self._session = None
+
+    @property
+    def has_browser(self) -> bool:
+        return self._session_factory is not None
+
+    def get_page(self):
+        if self._session is None:
+            if not self._session_factory:
+                raise RuntimeError("No browser session available for this worker")
+            self._session = self._session_factory()
+        return self._session.get_page()
+
+    def close(self):
+        if self._session is not None:
+            try:
+                self._session.close()
+            finally:
+                self._session = None
+
+
+class WorkerPool:
+    """
+    负责在有界的专用工作线程上并发执行任务（每个工作线程拥有独立的浏览器会话）
+    """
+
+    def __init__(self, size: int, session_factory: Optional[Callable[[], Any]] = None, name: str = "synthflow-worker"):
+        self.size = max(1, int(size))
+        self.session_factory = session_factory
+        self.name = name
+        self.stop_event = threading.Event()
+        self.logger = get_logger("WorkerPool")
+
+    def map(self,
+            fn: Callable[[int, Any, WorkerSlot], Any],
+            items: List[Any],
+            fail_fast: bool = True,
+            stop_when: Optional[Callable[[JobResult], bool]] = None,
+            inline_first: bool = False) -> List[JobResult]:
+        """
+        Run fn(index, item, slot) for every item and return results in item order.
+
+        fail_fast stops handing out new items after the first error; stop_when can
+        end the run early (e.g. first successful result). Items never started are
+        returned with executed=False. In-flight jobs can watch `stop_event`.
+        With inline_first the first item runs on the calling thread (with a slot
+        that has no browser session, so it keeps using the caller's page).
+        """
+        results = [JobResult(index=i) for i in range(len(items))]
+        pending: "queue.Queue" = queue.Queue()
+        first = 1 if inline_first and items else 0
+        for i, item in enumerate(items[first:], start=first):
+            pending.put((i, item))
+
+        lock = threading.Lock()
+
+        def run_job(index: int, item: Any, slot: WorkerSlot):
+            result = results[index]
+            try:
+                result.value = fn(index, item, slot)
+            except BaseException as e:
+                result.error = e
+            result.executed = True
+            with lock:
+                if result.error is not None and fail_fast:
+                    self.stop_event.set()
+                elif stop_when and stop_when(result):
+                    self.stop_event.set()
+
+        def worker():
+            slot = WorkerSlot(self.session_factory)
+            try:
+                while not self.stop_event.is_set():
+                    try:
+                        index, item = pending.get_nowait()
+                    except queue.Empty:
+                        break
+                    run_job(index, item, slot)
+            finally:
+                try:
+                    slot.close()
+                except Exception as e:
+                    self.logger.warning(f"Failed to close worker browser session: {e}")
+
+        workers = min(self.size, len(items))
+        threads = [
+            threading.Thread(target=worker, name=f"{self.name}-{i}", daemon=True)
+            for i in range(workers - first)
+        ]
+        for t in threads:
+            t.start()
+        if first:
+            run_job(0, items[0], WorkerSlot())
+            # With a pool size of one there are no worker threads; serve the rest here
+            while not self.stop_event.is_set() and not threads:
+                try:
+                    index, item = pending.get_nowait()
+                except queue.Empty:
+                    break
+                run_job(index, item, WorkerSlot())
+        for t in threads:
+            t.join()
+        return results
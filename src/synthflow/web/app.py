@@ -1,14 +1,17 @@
 import glob
 import os
 import json
+import re
+import sqlite3
 
 import yaml
-from flask import Flask, redirect, render_template_string, request, url_for, jsonify
+from flask import Flask, Response, redirect, render_template_string, request, send_file, stream_with_context, url_for, jsonify
 
 from synthflow.core.component_manager import ComponentManager
 from synthflow.core.config_parser import ConfigParser
 from synthflow.core.execution_engine import ExecutionEngine
 from synthflow.core.state_tracker import StateTracker
+from synthflow.core.audit_query import AuditQuery
 from synthflow.core.strategy_manager import StrategyManager
 from synthflow.components.element_locator import ElementLocator
 from synthflow.components.operation_executor import OperationExecutor
@@ -23,6 +26,9 @@ app = Flask(__name__)
 
 ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
 CONFIG_DIR = os.path.join(ROOT_DIR, "config")
+AUDIT_DB_PATH = "synthflow.db"
+# Large context values are kept here by content hash when set (see BlobStore)
+BLOB_DIR = os.environ.get("SYNTHFLOW_BLOB_DIR")
 
 
 STEP_DEFINITIONS = {
@@ -338,7 +344,7 @@ function row(data) {
     var inpError = document.createElement('input');
     inpError.name = 'on_error';
     inpError.value = (data && data.on_error) || '';
-    inpError.placeholder = '可选: retry/skip';
+    inpError.placeholder = '可选: continue/skip/retry';
     inpError.title = '当前仅作为标记，需配合策略实现';
     tdError.appendChild(inpError);
     tr.appendChild(tdError);
@@ -608,7 +614,7 @@ def run_process_thread(config_name):
     try:
         component_manager = ComponentManager()
         strategy_manager = StrategyManager()
-        state_tracker = StateTracker()
+        state_tracker = StateTracker(db_path=AUDIT_DB_PATH, blob_store=BLOB_DIR)
         
         # Set global tracker immediately
         ACTIVE_TRACKER = state_tracker
@@ -667,8 +673,7 @@ def api_status():
     pending = ACTIVE_TRACKER.get_pending_interaction()
     
     # Get recent logs/events
-    timeline = ACTIVE_TRACKER.get_timeline().events
-    events = [{"step": e.step_id, "status": e.status, "details": str(e.details)} for e in timeline[-10:]]
+    events = [{"step": e.step_id, "status": e.status, "details": str(e.details)} for e in ACTIVE_TRACKER.recent_events(10)]
     
     return jsonify({
         "status": "running" if EXECUTION_THREAD and EXECUTION_THREAD.is_alive() else "stopped",
@@ -688,9 +693,60 @@ def api_interact():
     if not action:
          return jsonify({"error": "Missing action"}), 400
          
-    ACTIVE_TRACKER.resolve_interaction({"status": "completed", "action": action})
+    # "id" targets a specific pending interaction; without it the oldest one is answered
+    if not ACTIVE_TRACKER.resolve_interaction({"status": "completed", "action": action}, interaction_id=data.get("id")):
+        return jsonify({"error": "No pending interaction to resolve"}), 409
     return jsonify({"success": True})
 
+@app.route("/api/audit/events")
+def api_audit_events():
+    """Audit events filtered by trace_id/step_id/status/since/until, paged with ?after=<next>"""
+    args = request.args
+    try:
+        page = AuditQuery(AUDIT_DB_PATH).page(
+            trace_id=args.get("trace_id"),
+            step_id=args.get("step_id"),
+            status=args.get("status"),
+            since=args.get("since"),
+            until=args.get("until"),
+            after=args.get("after", type=int),
+            limit=args.get("limit", 100, type=int),
+            descending=args.get("order") == "desc",
+        )
+    except sqlite3.Error as e:
+        return jsonify({"error": str(e)}), 500
+    return jsonify(page.to_dict())
+
+@app.route("/api/audit/traces")
+def api_audit_traces():
+    """Recent runs, newest first; ?before=<first_id of the last run> for the next page"""
+    query = AuditQuery(AUDIT_DB_PATH)
+    return jsonify({"traces": query.traces(limit=request.args.get("limit", 50, type=int),
+                                           before=request.args.get("before", type=int))})
+
+@app.route("/api/audit/traces/<trace_id>")
+def api_audit_trace(trace_id):
+    """Full timeline of one run (live or archived), streamed as a JSON array"""
+    query = AuditQuery(AUDIT_DB_PATH)
+
+    def generate():
+        yield "["
+        for i, record in enumerate(query.iter_trace(trace_id)):
+            yield ("," if i else "") + json.dumps(record.to_dict(), default=str)
+        yield "]"
+
+    return Response(stream_with_context(generate()), mimetype="application/json")
+
+@app.route("/api/blobs/<digest>")
+def api_blob(digest):
+    """Content of a value referenced as {"$blob": <digest>, ...} in the context or audit details"""
+    if not BLOB_DIR or not re.fullmatch(r"[0-9a-f]{64}", digest):
+        return jsonify({"error": "Blob not found"}), 404
+    path = os.path.join(BLOB_DIR, digest[:2], digest)
+    if not os.path.exists(path):
+        return jsonify({"error": "Blob not found"}), 404
+    return send_file(os.path.abspath(path), mimetype="application/octet-stream")
+
 @app.route("/api/shutdown", methods=["POST"])
 def api_shutdown():
     """Gracefully shutdown the server and cleanup browser"""
@@ -775,7 +831,7 @@ MONITOR_TEMPLATE = """
                             if (opt === 'skip') btn.className = 'btn btn-warning';
                             if (opt === 'stop') btn.className = 'btn btn-danger';
                             
-                            btn.onclick = () => submitInteraction(opt);
+                            btn.onclick = () => submitInteraction(opt, data.pending_interaction.id);
                             optsDiv.appendChild(btn);
                         });
                     } else {
@@ -788,11 +844,11 @@ MONITOR_TEMPLATE = """
                 });
         }
         
-        function submitInteraction(action) {
+        function submitInteraction(action, id) {
             fetch('/api/interact', {
                 method: 'POST',
                 headers: {'Content-Type': 'application/json'},
-                body: JSON.stringify({action: action})
+                body: JSON.stringify({action: action, id: id})
             }).then(() => {
                 // Hide immediately to prevent double click
                 document.getElementById('interaction-area').style.display = 'none';
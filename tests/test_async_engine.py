@@ -0,0 +1,204 @@
+import asyncio
+import os
+import sys
+import time
+import unittest
+
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from synthflow.components.async_base import AsyncComponent
+from synthflow.core.async_execution_engine import AsyncExecutionEngine
+from synthflow.core.audit_storage import MemoryStorage
+from synthflow.core.component_manager import ComponentManager
+from synthflow.core.config_parser import ProcessModel, StepModel, BranchModel, LoopModel, ParallelModel, RetryModel
+from synthflow.core.execution_engine import ExecutionStatus
+from synthflow.core.state_tracker import StateTracker
+from synthflow.core.strategy_manager import StrategyManager
+
+
+class AsyncSleeper(AsyncComponent):
+    @property
+    def name(self):
+        return "async_sleeper"
+
+    @property
+    def version(self):
+        return "1.0.0"
+
+    def initialize(self, config):
+        pass
+
+    async def execute(self, ctx, params):
+        await asyncio.sleep(params.get("seconds", 0))
+        if params.get("fail"):
+            raise RuntimeError(f"{params.get('label')} failed")
+        return {"label": params.get("label")}
+
+
+class AsyncFlaky(AsyncComponent):
+    """Fails the first `failures` calls"""
+    calls = 0
+
+    @property
+    def name(self):
+        return "async_flaky"
+
+    @property
+    def version(self):
+        return "1.0.0"
+
+    def initialize(self, config):
+        pass
+
+    async def execute(self, ctx, params):
+        AsyncFlaky.calls += 1
+        if AsyncFlaky.calls <= params.get("failures", 0):
+            raise TimeoutError("not yet")
+        return {"calls": AsyncFlaky.calls}
+
+
+class SyncEcho:
+    def initialize(self, config):
+        pass
+
+    def execute(self, ctx, params):
+        return {"label": params.get("label")}
+
+
+class SlowStepStorage(MemoryStorage):
+    """Flushes after every finished step, and every flush takes a while"""
+    durability = "step"
+
+    def flush(self):
+        time.sleep(0.1)
+
+
+def work(step_id, label, seconds=0.0, fail=False):
+    return StepModel(id=step_id, type="async_sleeper", params={"label": label, "seconds": seconds, "fail": fail})
+
+
+class AsyncExecutionEngineTests(unittest.TestCase):
+    def setUp(self):
+        self.cm = ComponentManager()
+        self.cm.register_component("async_sleeper", AsyncSleeper)
+        self.cm.register_component("async_flaky", AsyncFlaky)
+        self.cm.register_component("echo", SyncEcho)
+        AsyncFlaky.calls = 0
+
+    def new_engine(self):
+        return AsyncExecutionEngine(self.cm, StrategyManager(), StateTracker())
+
+    def test_runs_async_and_sync_components(self):
+        engine = self.new_engine()
+        model = ProcessModel(name="mixed", steps=[
+            work("first", "A"),
+            StepModel(id="second", type="echo", params={"label": "${first.output.label}-B"}),
+        ])
+        result = asyncio.run(engine.execute_async(model))
+        self.assertEqual(result.status, ExecutionStatus.COMPLETED)
+        self.assertEqual(engine.tracker.get_context("second.output"), {"label": "A-B"})
+
+    def test_concurrent_runs_share_one_event_loop(self):
+        model = ProcessModel(name="wait", steps=[work("wait", "A", 0.2)])
+        engines = [self.new_engine() for _ in range(10)]
+
+        async def run_all():
+            return await asyncio.gather(*(engine.execute_async(model) for engine in engines))
+
+        start = time.time()
+        results = asyncio.run(run_all())
+        self.assertLess(time.time() - start, 0.6)
+        self.assertTrue(all(r.status == ExecutionStatus.COMPLETED for r in results))
+
+    def test_for_each_concurrency_merges_in_order(self):
+        engine = self.new_engine()
+        engine.tracker.set_context("items", [0.2, 0.1, 0.0])
+        model = ProcessModel(name="fan_out", steps=[
+            StepModel(id="each", type="loop",
+                      loop=LoopModel(type="for_each", items="${items}", item_var="delay", concurrency=3,
+                                     steps=[work("item", "${delay}", "${delay}")])),
+        ])
+        result = asyncio.run(engine.execute_async(model))
+        self.assertEqual(result.status, ExecutionStatus.COMPLETED)
+        outputs = engine.tracker.get_context("each.output")
+        self.assertEqual([o["item.output"]["label"] for o in outputs], [0.2, 0.1, 0.0])
+
+    def test_first_success_cancels_slow_branch(self):
+        engine = self.new_engine()
+        model = ProcessModel(name="race", steps=[
+            StepModel(id="par", type="parallel", parallel=ParallelModel(join="first_success"), branches=[
+                BranchModel(name="slow", steps=[work("slow", "S", 5)]),
+                BranchModel(name="fast", steps=[work("fast", "F", 0.05)]),
+            ]),
+        ])
+        start = time.time()
+        result = asyncio.run(engine.execute_async(model))
+        self.assertEqual(result.status, ExecutionStatus.COMPLETED)
+        self.assertLess(time.time() - start, 1)
+        summary = engine.tracker.get_context("par.output")
+        self.assertEqual(summary["fast"]["status"], "completed")
+        self.assertEqual(summary["slow"]["status"], "cancelled")
+
+    def test_audit_flushes_do_not_block_the_loop(self):
+        engine = AsyncExecutionEngine(self.cm, StrategyManager(), StateTracker(storage=SlowStepStorage()))
+        model = ProcessModel(name="durable", steps=[work(f"s{i}", str(i)) for i in range(3)])
+        gaps = []
+
+        async def ticker(done):
+            last = time.perf_counter()
+            while not done.is_set():
+                await asyncio.sleep(0.01)
+                now = time.perf_counter()
+                gaps.append(now - last)
+                last = now
+
+        async def main():
+            done = asyncio.Event()
+            tick = asyncio.ensure_future(ticker(done))
+            result = await engine.execute_async(model)
+            done.set()
+            await tick
+            return result
+
+        result = asyncio.run(main())
+        self.assertEqual(result.status, ExecutionStatus.COMPLETED)
+        self.assertLess(max(gaps), 0.08)
+        steps = [r.step_id for r in engine.tracker.read_timeline() if r.status == "completed"]
+        self.assertEqual(steps, ["s0", "s1", "s2", None])
+
+    def test_retries_follow_the_shared_policy(self):
+        engine = self.new_engine()
+        model = ProcessModel(name="retry", steps=[
+            StepModel(id="flaky", type="async_flaky", params={"failures": 2},
+                      retry=RetryModel(attempts=3, backoff=0, retry_on=["TimeoutError"])),
+        ])
+        result = asyncio.run(engine.execute_async(model))
+        self.assertEqual(result.status, ExecutionStatus.COMPLETED)
+        self.assertEqual(engine.tracker.get_context("flaky.output"), {"calls": 3})
+        retried = [r for r in engine.tracker.read_timeline() if r.status == "retried"]
+        self.assertEqual(retried[0].details["attempts"], 3)
+
+    def test_dag_mode_runs_dependents_after_their_inputs(self):
+        engine = self.new_engine()
+        model = ProcessModel(name="dag", execution_mode="dag", steps=[
+            work("a", "A", 0.05),
+            work("b", "B"),
+            StepModel(id="c", type="echo", params={"label": "${a.output.label}${b.output.label}"}),
+        ])
+        result = asyncio.run(engine.execute_async(model))
+        self.assertEqual(result.status, ExecutionStatus.COMPLETED)
+        self.assertEqual(engine.tracker.get_context("c.output"), {"label": "AB"})
+
+    def test_checkpoint_resume_is_rejected(self):
+        engine = self.new_engine()
+        with self.assertRaises(NotImplementedError):
+            engine.resume(trace_id="crashed-run")
+        # A plain resume still continues a paused run
+        engine.pause()
+        engine.resume()
+        self.assertEqual(engine.tracker.read_timeline()[-1].status, "resumed")
+
+
+if __name__ == "__main__":
+    unittest.main()
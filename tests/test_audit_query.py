@@ -0,0 +1,103 @@
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from synthflow.core.audit_query import AuditQuery
+from synthflow.core.audit_writer import AuditWriter
+from synthflow.core.state_tracker import StateTracker
+
+
+class AuditQueryTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp.name, "audit.db")
+        self.writer = AuditWriter(self.db_path, durability="batch")
+        self.trackers = []
+        for trace in ("t1", "t2"):
+            tracker = StateTracker(db_path=self.db_path, trace_id=trace, audit_writer=self.writer)
+            tracker.snapshot(None, "started", {"process_name": f"p-{trace}"})
+            for i in range(5):
+                tracker.snapshot(f"s{i}", "executing")
+                tracker.snapshot(f"s{i}", "failed" if i == 3 else "completed")
+            self.trackers.append(tracker)
+        self.writer.flush()
+        self.query = AuditQuery(self.db_path)
+
+    def tearDown(self):
+        self.writer.close()
+        self.tmp.cleanup()
+
+    def test_indexes_exist(self):
+        with sqlite3.connect(self.db_path) as conn:
+            names = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        self.assertTrue({"idx_audit_trace_id", "idx_audit_step_status", "idx_audit_timestamp"} <= names)
+
+    def test_keyset_pages_cover_the_trace_once(self):
+        seen, after = [], None
+        while True:
+            page = self.query.page(trace_id="t2", limit=4, after=after)
+            seen.extend(page.records)
+            if page.next_cursor is None:
+                break
+            after = page.next_cursor
+        self.assertEqual(len(seen), 11)
+        self.assertEqual({r.trace_id for r in seen}, {"t2"})
+        self.assertEqual([r.id for r in seen], sorted(r.id for r in seen))
+        self.assertEqual([r.id for r in self.query.iter(trace_id="t2", batch_size=3)], [r.id for r in seen])
+
+    def test_filters(self):
+        failed = self.query.page(status="failed").records
+        self.assertEqual([(r.trace_id, r.step_id) for r in failed], [("t1", "s3"), ("t2", "s3")])
+
+        newest = self.query.page(step_id="s0", descending=True, limit=1)
+        self.assertEqual((newest.records[0].trace_id, newest.records[0].status), ("t2", "completed"))
+        self.assertIsNotNone(newest.next_cursor)
+
+        first = self.query.page(limit=1).records[0]
+        self.assertEqual(len(self.query.page(since=first.timestamp, limit=1000).records), 22)
+        self.assertEqual(self.query.page(until=first.timestamp).records, [])
+
+    def test_traces_and_tracker_read_back(self):
+        runs = self.query.traces()
+        self.assertEqual([r["trace_id"] for r in runs], ["t2", "t1"])
+        self.assertEqual(runs[0]["events"], 11)
+        self.assertEqual([r["trace_id"] for r in self.query.traces(before=runs[0]["first_id"])], ["t1"])
+
+        self.assertEqual((runs[1]["process_name"], runs[1]["last_status"], runs[1]["events"]), ("p-t1", "completed", 11))
+        self.assertLess(runs[1]["started"], runs[0]["started"])
+
+        timeline = self.trackers[0].read_timeline()
+        self.assertEqual(len(timeline), 11)
+        self.assertEqual(timeline[-1].status, "completed")
+
+    def test_trace_pages_do_not_scan_the_log(self):
+        with sqlite3.connect(self.db_path) as conn:
+            plan = " ".join(row[-1] for row in conn.execute(
+                "EXPLAIN QUERY PLAN SELECT s.trace_id, f.timestamp, l.status FROM audit_traces s "
+                "JOIN audit_log f ON f.id = s.first_id JOIN audit_log l ON l.id = s.last_id "
+                "WHERE s.first_id < 100 ORDER BY s.first_id DESC LIMIT 10"))
+        self.assertNotIn("SCAN f", plan)
+        self.assertNotIn("SCAN l", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+
+    def test_summary_is_rebuilt_for_older_databases(self):
+        expected = self.query.traces()
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("DROP TABLE audit_traces")
+        self.assertEqual(AuditQuery(self.db_path).traces(), expected)
+
+        # New events keep extending it
+        self.trackers[0].snapshot(None, "resumed")
+        self.writer.flush()
+        run = {r["trace_id"]: r for r in self.query.traces()}["t1"]
+        self.assertEqual((run["events"], run["last_status"]), (12, "resumed"))
+
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,165 @@
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from synthflow.core.audit_query import AuditQuery
+from synthflow.core.audit_retention import AuditArchiver, RetentionPolicy, archive_parts, read_archived_rows
+from synthflow.core.audit_writer import AuditWriter
+from synthflow.core.blob_store import BlobStore
+from synthflow.core.checkpoint import CheckpointStore
+from synthflow.core.state_tracker import StateTracker
+
+
+class RetentionTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp.name, "audit.db")
+        self.writer = AuditWriter(self.db_path, durability="batch")
+        self.trackers = {}
+        for trace in ("old", "mid", "new"):
+            tracker = StateTracker(db_path=self.db_path, trace_id=trace, audit_writer=self.writer)
+            for i in range(3):
+                tracker.set_context("n", i)
+                tracker.snapshot(f"s{i}", "completed", {"payload": "x" * 500})
+            tracker.snapshot(None, "completed")
+            self.trackers[trace] = tracker
+        self.writer.flush()
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("UPDATE audit_log SET timestamp = '2020-01-02T10:00:00' WHERE trace_id = 'old'")
+        self.archiver = AuditArchiver(self.db_path)
+
+    def tearDown(self):
+        self.writer.close()
+        self.tmp.cleanup()
+
+    def live_traces(self):
+        with sqlite3.connect(self.db_path) as conn:
+            return {row[0] for row in conn.execute("SELECT DISTINCT trace_id FROM audit_log")}
+
+    def test_policies_select_expired_traces(self):
+        self.assertEqual(self.archiver.expired_traces(RetentionPolicy(max_age_days=30)), ["old"])
+        self.assertEqual(self.archiver.expired_traces(RetentionPolicy(max_traces=1)), ["old", "mid"])
+        self.assertEqual(self.archiver.expired_traces(RetentionPolicy(max_bytes=2000)), ["old", "mid"])
+        self.assertEqual(self.archiver.expired_traces(RetentionPolicy()), [])
+
+    def test_archived_traces_stay_readable(self):
+        result = self.archiver.run(RetentionPolicy(max_age_days=30))
+        self.assertEqual(result, {"traces": 1, "events": 4, "blobs": 0})
+        self.assertEqual(self.live_traces(), {"mid", "new"})
+        self.assertEqual(len(archive_parts(os.path.join(self.tmp.name, "audit_archive"), "2020-01-02")), 1)
+
+        timeline = AuditQuery(self.db_path).trace("old")
+        self.assertEqual([r.step_id for r in timeline], ["s0", "s1", "s2", None])
+        self.assertEqual(timeline[0].details, {"payload": "x" * 500})
+        self.assertEqual(len(self.trackers["old"].read_timeline()), 4)
+        self.assertEqual(self.trackers["old"].reconstruct_context(), {"n": 2})
+
+    def test_summary_tracks_sizes_and_run_status(self):
+        self.trackers["new"].snapshot(None, "resumed")
+        self.writer.flush()
+        with sqlite3.connect(self.db_path) as conn:
+            summary = dict((row[0], row[1:]) for row in conn.execute("SELECT trace_id, bytes, run_status FROM audit_traces"))
+            sizes = dict(conn.execute(
+                "SELECT trace_id, SUM(LENGTH(details) + COALESCE(LENGTH(context_snapshot), 0)) FROM audit_log GROUP BY trace_id"
+            ).fetchall())
+        self.assertEqual({t: size for t, (size, _) in summary.items()}, sizes)
+        self.assertEqual({t: status for t, (_, status) in summary.items()},
+                         {"old": "completed", "mid": "completed", "new": "resumed"})
+        self.assertEqual(self.archiver.expired_traces(RetentionPolicy(max_traces=0)), ["old", "mid"])
+
+    def test_running_traces_are_kept(self):
+        running = StateTracker(db_path=self.db_path, trace_id="running", audit_writer=self.writer)
+        running.snapshot(None, "started")
+        running.snapshot("s0", "completed", {"payload": "x" * 5000})
+        self.writer.flush()
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("UPDATE audit_log SET timestamp = '2020-01-01T10:00:00' WHERE trace_id = 'running'")
+
+        self.assertEqual(self.archiver.expired_traces(RetentionPolicy(max_traces=0)), ["old", "mid", "new"])
+        self.assertEqual(self.archiver.expired_traces(RetentionPolicy(max_age_days=30)), ["old"])
+        # Unless it has been idle long enough to be considered dead
+        self.assertEqual(self.archiver.expired_traces(RetentionPolicy(max_age_days=30, abandoned_after_days=60)),
+                         ["old", "running"])
+
+    def test_interrupted_archive_is_not_duplicated(self):
+        # A crash after the archive was renamed into place, before the rows were deleted
+        with mock.patch.object(self.archiver, "_delete_archived", side_effect=KeyboardInterrupt):
+            with self.assertRaises(KeyboardInterrupt):
+                self.archiver.archive(["old"])
+        self.assertIn("old", self.live_traces())
+
+        self.assertEqual(self.archiver.archive(["old"]), 4)
+        self.assertEqual(self.live_traces(), {"mid", "new"})
+        self.assertEqual([r.step_id for r in AuditQuery(self.db_path).trace("old")], ["s0", "s1", "s2", None])
+        self.assertEqual(len(list(read_archived_rows(self.archiver.archive_dir, "old", self.db_path))), 4)
+        # Each run adds a part of the day's archive; none is left half written
+        self.assertEqual(len(archive_parts(self.archiver.archive_dir, "2020-01-02")), 2)
+        self.assertFalse([name for name in os.listdir(self.archiver.archive_dir) if name.endswith(".tmp")])
+
+    def test_resumed_trace_reads_back_whole(self):
+        self.archiver.archive(["old"])
+        # Resumed after it was archived: part of its timeline is live again
+        self.trackers["old"].set_context("n", 3)
+        self.trackers["old"].snapshot(None, "resumed")
+        self.trackers["old"].snapshot("s3", "completed")
+        self.writer.flush()
+
+        query = AuditQuery(self.db_path)
+        self.assertEqual([r.step_id for r in query.trace("old")], ["s0", "s1", "s2", None, None, "s3"])
+        self.assertEqual(self.trackers["old"].reconstruct_context(), {"n": 3})
+
+        self.archiver.archive(["old"])
+        self.assertEqual([r.step_id for r in query.trace("old")], ["s0", "s1", "s2", None, None, "s3"])
+        with sqlite3.connect(self.db_path) as conn:
+            self.assertEqual(conn.execute("SELECT events FROM audit_archive WHERE trace_id = 'old'").fetchone()[0], 6)
+
+    def test_prune_keeps_blobs_of_archived_traces_and_checkpoints(self):
+        blobs = BlobStore(os.path.join(self.tmp.name, "blobs"), threshold=100)
+        pages = {}
+        for trace in ("done", "live"):
+            tracker = StateTracker(db_path=self.db_path, trace_id=trace, audit_writer=self.writer, blob_store=blobs)
+            tracker.set_context("page", f"{trace} " * 100)
+            pages[trace] = tracker.get_all_context()["page"]["$blob"]
+            tracker.snapshot("s0", "completed")
+            if trace == "done":
+                tracker.snapshot(None, "completed")
+        self.writer.flush()
+        orphan = blobs.put_value("never recorded " * 20).digest
+        checkpoints = CheckpointStore(self.db_path)
+        checkpoints.start("paused", "p", "{}")
+        kept = blobs.put_value("checkpointed " * 20)
+        checkpoints.save("paused", [], {"page": kept})
+        archiver = AuditArchiver(self.db_path, blob_store=blobs, blob_grace=0)
+
+        self.assertEqual(archiver.run(RetentionPolicy(max_traces=0))["blobs"], 1)
+        self.assertNotIn(orphan, blobs)
+        self.assertIn(pages["live"], blobs)
+        self.assertIn(kept.digest, blobs)
+        # The archived trace still reads back whole
+        self.assertIn(pages["done"], blobs)
+        self.assertEqual(AuditQuery(self.db_path).trace("done")[-1].status, "completed")
+        self.assertEqual(blobs.load(self.trackers["old"].storage.reconstruct_context("done")["page"]), "done " * 100)
+
+        checkpoints.delete("paused")
+        checkpoints.close()
+        self.assertEqual(archiver.prune_blobs(), 1)
+        self.assertNotIn(kept.digest, blobs)
+
+    def test_vacuum_switches_to_incremental_and_reclaims(self):
+        self.archiver.vacuum()
+        with sqlite3.connect(self.db_path) as conn:
+            self.assertEqual(conn.execute("PRAGMA auto_vacuum").fetchone()[0], 2)
+        self.archiver.run(RetentionPolicy(max_traces=0))
+        self.assertEqual(self.live_traces(), set())
+        with sqlite3.connect(self.db_path) as conn:
+            self.assertEqual(conn.execute("PRAGMA freelist_count").fetchone()[0], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
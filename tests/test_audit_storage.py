@@ -0,0 +1,120 @@
+import os
+import sys
+import tempfile
+import unittest
+
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from synthflow.core.audit_storage import (JsonlStorage, MemoryStorage, NullStorage, SQLiteStorage,
+                                          open_storage)
+from synthflow.core.audit_writer import AuditWriter
+from synthflow.core.state_tracker import StateTracker
+
+
+def record_run(tracker, steps=5):
+    for i in range(steps):
+        tracker.set_context("i", i)
+        tracker.snapshot(f"s{i}", "completed", {"i": i})
+
+
+class StorageBackendTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def assert_readable(self, storage):
+        tracker = StateTracker(db_path=None, storage=storage, keyframe_interval=2)
+        record_run(tracker)
+        timeline = tracker.read_timeline()
+        self.assertEqual([r.step_id for r in timeline], [f"s{i}" for i in range(5)])
+        self.assertEqual(timeline[3].details, {"i": 3})
+        self.assertEqual(tracker.reconstruct_context(timeline[3].id), {"i": 3})
+        self.assertEqual(tracker.reconstruct_context(), {"i": 4})
+        return tracker
+
+    def test_sqlite(self):
+        writer = AuditWriter(os.path.join(self.tmp.name, "audit.db"), durability="batch")
+        try:
+            self.assert_readable(SQLiteStorage(writer.db_path, writer))
+        finally:
+            writer.close()
+
+    def test_memory(self):
+        self.assert_readable(MemoryStorage())
+
+    def test_replay_applies_deletes(self):
+        tracker = StateTracker(db_path=None, storage=MemoryStorage(), keyframe_interval=10)
+        tracker.set_context("a", 1)
+        tracker.set_context("b", 2)
+        tracker.snapshot("s0", "completed")
+        tracker.delete_context("a")
+        tracker.snapshot("s1", "completed")
+        self.assertEqual(tracker.reconstruct_context(), {"b": 2})
+
+    def test_jsonl_rotates_segments_and_resumes_ids(self):
+        directory = os.path.join(self.tmp.name, "log")
+        storage = JsonlStorage(directory, segment_bytes=400, fsync="never")
+        tracker = self.assert_readable(storage)
+        storage.close()
+        self.assertGreater(len(storage.segments()), 1)
+
+        # A new process appends after the existing rows without reusing ids
+        reopened = JsonlStorage(directory, segment_bytes=400)
+        other = StateTracker(db_path=None, storage=reopened)
+        other.snapshot("next", "completed")
+        reopened.flush()
+        ids = [row["id"] for row in reopened.iter_rows()]
+        self.assertEqual(ids, list(range(1, 7)))
+        self.assertEqual(len(reopened.read_trace(tracker.trace_id)), 5)
+        reopened.close()
+
+    def test_jsonl_skips_torn_last_line(self):
+        directory = os.path.join(self.tmp.name, "log")
+        storage = JsonlStorage(directory, fsync="always")
+        record_run(StateTracker(db_path=None, storage=storage), steps=2)
+        storage.close()
+        with open(storage.segments()[-1], "a") as f:
+            f.write('{"id": 3, "trace')
+        reopened = JsonlStorage(directory)
+        self.assertEqual(len(list(reopened.iter_rows())), 2)
+        reopened.close()
+
+    def test_jsonl_appends_after_a_torn_line_are_kept(self):
+        directory = os.path.join(self.tmp.name, "log")
+        storage = JsonlStorage(directory, fsync="always")
+        tracker = StateTracker(db_path=None, storage=storage)
+        tracker.snapshot("s1", "completed")
+        tracker.snapshot("s2", "completed")
+        storage.close()
+        # A crash in the middle of writing s2
+        path = storage.segments()[-1]
+        with open(path, "rb+") as f:
+            f.truncate(os.path.getsize(path) - 20)
+
+        reopened = JsonlStorage(directory, fsync="always")
+        tracker = StateTracker(db_path=None, storage=reopened, trace_id=tracker.trace_id)
+        tracker.snapshot("s3", "completed")
+        tracker.snapshot("s4", "completed")
+        self.assertEqual([r.step_id for r in reopened.read_trace(tracker.trace_id)], ["s1", "s3", "s4"])
+        reopened.close()
+
+    def test_null_keeps_only_the_in_memory_timeline(self):
+        tracker = StateTracker(storage="null", timeline_size=2)
+        record_run(tracker)
+        self.assertEqual(tracker.read_timeline(), [])
+        self.assertEqual([e.step_id for e in tracker.get_timeline(full=True).events], ["s3", "s4"])
+
+    def test_specs(self):
+        self.assertIsInstance(open_storage("null"), NullStorage)
+        self.assertIsInstance(open_storage("memory"), MemoryStorage)
+        storage = open_storage(f"jsonl:{self.tmp.name}", fsync="never")
+        self.assertEqual((storage.directory, storage.fsync), (self.tmp.name, "never"))
+        with self.assertRaises(ValueError):
+            open_storage("postgres:db")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+import unittest
+
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from synthflow.core.audit_writer import AuditWriter
+from synthflow.core.state_tracker import StateTracker
+
+
+class AuditWriterTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp.name, "audit.db")
+        # Creates the audit_log table
+        StateTracker(db_path=self.db_path, audit_writer=AuditWriter(self.db_path))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def rows(self):
+        with sqlite3.connect(self.db_path) as conn:
+            return conn.execute("SELECT step_id, status FROM audit_log ORDER BY id").fetchall()
+
+    def test_batches_are_committed_together(self):
+        writer = AuditWriter(self.db_path, durability="batch", batch_size=3)
+        tracker = StateTracker(db_path=self.db_path, audit_writer=writer)
+        for i in range(7):
+            tracker.snapshot(f"s{i}", "executing")
+        time.sleep(0.1)
+        self.assertEqual(len(self.rows()), 6)
+
+        tracker.flush()
+        self.assertEqual([r[0] for r in self.rows()], [f"s{i}" for i in range(7)])
+        self.assertEqual(writer.batches, 3)
+        with sqlite3.connect(self.db_path) as conn:
+            self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+        writer.close()
+
+    def test_interval_commits_without_explicit_flush(self):
+        writer = AuditWriter(self.db_path, durability="interval", flush_interval=0.05)
+        StateTracker(db_path=self.db_path, audit_writer=writer).snapshot("a", "executing")
+        deadline = time.monotonic() + 2
+        while not self.rows() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(self.rows(), [("a", "executing")])
+        writer.close()
+
+    def test_step_durability_and_close(self):
+        writer = AuditWriter(self.db_path, durability="step", batch_size=100)
+        tracker = StateTracker(db_path=self.db_path, audit_writer=writer)
+        tracker.snapshot("a", "executing")
+        tracker.snapshot("a", "completed")
+        self.assertEqual(len(self.rows()), 2)
+
+        tracker.snapshot("b", "executing")
+        writer.close()
+        self.assertEqual(len(self.rows()), 3)
+        # A submit after close restarts the writer
+        tracker.snapshot("b", "completed")
+        self.assertEqual(len(self.rows()), 4)
+        writer.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from synthflow.core.batch_runner import BatchRunner, percentile
+from synthflow.core.config_parser import ProcessModel, StepModel
+from synthflow.core.execution_engine import ExecutionStatus
+
+
+class Greeter:
+    instances = []
+    lock = threading.Lock()
+
+    def __init__(self):
+        with Greeter.lock:
+            Greeter.instances.append(self)
+
+    def initialize(self, config):
+        pass
+
+    def execute(self, ctx, params):
+        time.sleep(0.1)
+        if params.get("name") == "bad":
+            raise RuntimeError("bad row")
+        return {"greeting": f"hello {params.get('name')}", "trace_id": ctx["_tracker"].trace_id}
+
+
+class BatchRunnerTests(unittest.TestCase):
+    def setUp(self):
+        Greeter.instances = []
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp.name, "batch.db")
+        self.model = ProcessModel(name="greet", steps=[
+            StepModel(id="greet", type="greeter", params={"name": "${name|anonymous}"}),
+        ])
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_dataset_rows_run_concurrently_in_isolation(self):
+        runner = BatchRunner(self.model, {"greeter": Greeter}, workers=4, db_path=self.db_path)
+        rows = [{"name": f"user{i}"} for i in range(8)] + [{"name": "bad"}]
+        report = runner.run(dataset=rows)
+
+        self.assertEqual(len(report.results), 9)
+        self.assertEqual(report.succeeded, 8)
+        self.assertEqual(report.failed, 1)
+        self.assertEqual(report.results[8].status, ExecutionStatus.FAILED)
+        self.assertEqual(len({r.trace_id for r in report.results}), 9)
+        # One component instance per process instance
+        self.assertEqual(len(Greeter.instances), 9)
+        # 9 instances of 0.1s on 4 workers
+        self.assertLess(report.wall_time, 0.6)
+        self.assertGreater(report.throughput, 0)
+        self.assertGreaterEqual(report.latency(99), report.latency(50))
+
+    def test_count_runs_without_input(self):
+        runner = BatchRunner(self.model, {"greeter": Greeter}, workers=2, db_path=self.db_path)
+        report = runner.run(count=3)
+        self.assertEqual(report.summary()["succeeded"], 3)
+
+    def test_percentile(self):
+        self.assertEqual(percentile([3, 1, 2], 50), 2)
+        self.assertAlmostEqual(percentile([1, 2, 3, 4], 90), 3.7)
+        self.assertEqual(percentile([], 99), 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from synthflow.core.blob_store import BlobRef, BlobStore
+from synthflow.core.context_store import ContextStore
+from synthflow.core.state_tracker import StateTracker
+
+
+def blob_files(directory):
+    return [name for _, _, files in os.walk(directory) for name in files]
+
+
+class BlobStoreTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.blobs = BlobStore(self.tmp.name, threshold=300)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_large_leaves_spill_and_dedupe(self):
+        page = "text " * 100
+        value, spilled = self.blobs.spill({"text": page, "url": "http://a", "shot": b"\x89PNG" * 100})
+        self.assertTrue(spilled)
+        self.assertIsInstance(value["text"], BlobRef)
+        self.assertEqual(value["url"], "http://a")
+        self.assertEqual(self.blobs.resolve(value["shot"]), b"\x89PNG" * 100)
+
+        self.blobs.spill({"again": page})
+        self.assertEqual(len(blob_files(self.tmp.name)), 2)
+
+    def test_small_values_are_untouched(self):
+        value = {"a": [1, 2], "b": "short"}
+        self.assertEqual(self.blobs.spill(value), (value, False))
+        self.assertIs(self.blobs.spill(value)[0], value)
+
+    def test_large_containers_spill_whole(self):
+        rows = [{"id": i, "name": f"row {i}"} for i in range(20)]
+        ref, spilled = self.blobs.spill(rows)
+        self.assertTrue(spilled)
+        self.assertEqual(ref["kind"], "json")
+        self.assertEqual(self.blobs.resolve(ref), rows)
+
+    def test_prune_keeps_referenced_and_recent_blobs(self):
+        rows = [{"id": i, "text": "t" * 400} for i in range(3)]
+        kept = self.blobs.spill(rows)[0]
+        dropped = self.blobs.put_value("d" * 500)
+        self.assertEqual(len(blob_files(self.tmp.name)), 3)
+
+        # Recent: inside the grace period
+        self.assertEqual(self.blobs.prune([kept.digest]), 0)
+        # The texts are kept through the json blob that refers to them
+        self.assertEqual(self.blobs.prune([kept.digest], grace=0), 1)
+        self.assertNotIn(dropped.digest, self.blobs)
+        self.assertEqual(self.blobs.resolve(kept), rows)
+
+
+class BlobContextTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.blobs = BlobStore(self.tmp.name, threshold=300)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_reads_dereference_lazily(self):
+        store = ContextStore(blobs=self.blobs)
+        rows = [{"id": i, "name": f"row {i}"} for i in range(20)]
+        store.set("extract.output", {"rows": rows, "page": "x" * 500})
+        self.assertIsInstance(store.snapshot()["extract"]["output"], BlobRef)
+        self.assertEqual(store.get("extract.output.rows"), rows)
+        self.assertEqual(store.get("extract.output.page"), "x" * 500)
+        self.assertEqual(store.get("extract")["output"]["rows"][3], {"id": 3, "name": "row 3"})
+
+        store.set("extract.output.count", 20)
+        self.assertEqual(store.get("extract.output.count"), 20)
+        self.assertEqual(store.get("extract.output.rows"), rows)
+
+    def test_audit_rows_hold_references(self):
+        tracker = StateTracker(storage="memory", blob_store=self.blobs)
+        tracker.set_context("page.output", {"text": "y" * 1000})
+        tracker.snapshot("page", "completed", {"html": "<p>" * 500})
+        row = tracker.read_timeline()[0]
+        self.assertEqual(set(row.details["html"]), {"$blob", "kind", "size"})
+        self.assertLess(len(tracker.context_json()), 200)
+
+        # Context rebuilt from the audit log (or a checkpoint) reads through the references
+        restored = StateTracker(db_path=None, blob_store=self.blobs)
+        restored.restore_context(json.loads(json.dumps(tracker.reconstruct_context())))
+        self.assertEqual(restored.get_context("page.output.text"), "y" * 1000)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,152 @@
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from synthflow.core.checkpoint import CheckpointStore
+from synthflow.core.component_manager import ComponentManager
+from synthflow.core.config_parser import ProcessModel, StepModel, LoopModel, BranchModel
+from synthflow.core.execution_engine import ExecutionEngine, ExecutionStatus
+from synthflow.core.state_tracker import StateTracker
+from synthflow.core.strategy_manager import StrategyManager
+
+
+class Crash(BaseException):
+    """Simulates the process dying (not handled by the engine)"""
+
+
+class Recorder:
+    calls = []
+    crash_at = None
+
+    def initialize(self, config):
+        pass
+
+    def execute(self, ctx, params):
+        call = (params.get("label"), params.get("index"))
+        if call == Recorder.crash_at:
+            Recorder.crash_at = None
+            raise Crash()
+        Recorder.calls.append(call)
+        return {"label": params.get("label")}
+
+
+def record(step_id, label):
+    return StepModel(id=step_id, type="recorder", params={"label": label, "index": "${loop_index|-1}"})
+
+
+class CheckpointResumeTests(unittest.TestCase):
+    def setUp(self):
+        Recorder.calls = []
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp.name, "checkpoint.db")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def new_engine(self):
+        cm = ComponentManager()
+        cm.register_component("recorder", Recorder)
+        return ExecutionEngine(cm, StrategyManager(), StateTracker(db_path=self.db_path))
+
+    def crash_then_resume(self, model, crash_at):
+        Recorder.crash_at = crash_at
+        engine = self.new_engine()
+        with self.assertRaises(Crash):
+            engine.execute(model)
+        trace_id = engine.tracker.trace_id
+        before = list(Recorder.calls)
+        Recorder.calls = []
+
+        resumed = self.new_engine()
+        result = resumed.resume(trace_id)
+        self.assertEqual(result.status, ExecutionStatus.COMPLETED)
+        return before, Recorder.calls, resumed
+
+    def test_resume_inside_count_loop(self):
+        model = ProcessModel(name="loop", checkpoint=True, steps=[
+            record("setup", "setup"),
+            StepModel(id="loop", type="loop", loop=LoopModel(type="count", count=5, steps=[
+                record("a", "a"),
+                StepModel(id="check", type="condition", branches=[
+                    BranchModel(condition="${loop_index} >= 0", steps=[record("b", "b")]),
+                ]),
+            ])),
+            record("done", "done"),
+        ])
+        before, after, _ = self.crash_then_resume(model, ("b", 3))
+        self.assertEqual(before[-1], ("a", 3))
+        # Resumes at the crashed step of iteration 3, nothing before it is repeated
+        self.assertEqual(after, [("b", 3), ("a", 4), ("b", 4), ("done", 4)])
+
+    def test_resume_for_each_keeps_finished_items(self):
+        model = ProcessModel(name="items", checkpoint=True, steps=[
+            StepModel(id="each", type="loop",
+                      loop=LoopModel(type="for_each", items="${rows|[]}", steps=[record("row", "row")])),
+        ])
+        engine_rows = [1, 2, 3]
+        Recorder.crash_at = ("row", 2)
+        engine = self.new_engine()
+        engine.tracker.set_context("rows", engine_rows)
+        with self.assertRaises(Crash):
+            engine.execute(model)
+        Recorder.calls = []
+
+        resumed = self.new_engine()
+        resumed.resume(engine.tracker.trace_id)
+        self.assertEqual(Recorder.calls, [("row", 2)])
+        self.assertEqual(len(resumed.tracker.get_context("each.output")), 3)
+
+    def test_completed_run_cannot_be_resumed(self):
+        model = ProcessModel(name="once", checkpoint=True, steps=[record("only", "only")])
+        engine = self.new_engine()
+        engine.execute(model)
+        with self.assertRaises(ValueError):
+            self.new_engine().resume(engine.tracker.trace_id)
+
+
+class CheckpointStoreTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp.name, "checkpoint.db")
+        self.store = CheckpointStore(self.db_path, full_every=3)
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp.cleanup()
+
+    def delta_sizes(self):
+        with sqlite3.connect(self.db_path) as conn:
+            return [len(d) for (d,) in conn.execute("SELECT context_delta FROM checkpoint_deltas ORDER BY seq")]
+
+    def test_saves_only_changed_keys(self):
+        self.store.start("t", "p", "{}")
+        big = {"page": "x" * 10000}
+        context = {"big": big, "i": 0}
+        for i in range(3):
+            context = dict(context, i=i)
+            self.store.save("t", [{"scope": "root", "ip": i}], context)
+        # The first save is a full snapshot; later ones carry only "i"
+        self.assertTrue(all(size < 100 for size in self.delta_sizes()))
+        context = {"i": 3}  # "big" removed
+        self.store.save("t", [{"scope": "root", "ip": 3}], context)
+
+        checkpoint = self.store.load("t")
+        self.assertEqual(checkpoint.context, {"i": 3})
+        self.assertEqual(checkpoint.cursor, [{"scope": "root", "ip": 3}])
+
+    def test_full_snapshot_every_n_saves(self):
+        self.store.start("t", "p", "{}")
+        for i in range(6):
+            self.store.save("t", [], {"i": i})
+        # Full at saves 0 and 4, then one delta
+        self.assertEqual(len(self.delta_sizes()), 1)
+        self.assertEqual(self.store.load("t").context, {"i": 5})
+
+
+if __name__ == "__main__":
+    unittest.main()
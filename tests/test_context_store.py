@@ -0,0 +1,130 @@
+import os
+import sys
+import threading
+import unittest
+
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from synthflow.core.component_manager import ComponentManager
+from synthflow.core.config_parser import ProcessModel, StepModel, LoopModel
+from synthflow.core.context_store import ContextStore, ContextView
+from synthflow.core.execution_engine import ExecutionEngine, ExecutionStatus
+from synthflow.core.state_tracker import StateTracker
+from synthflow.core.strategy_manager import StrategyManager
+
+
+class Recorder:
+    calls = []
+
+    def initialize(self, config):
+        pass
+
+    def execute(self, ctx, params):
+        Recorder.calls.append((params["outer"], params["inner"]))
+        return {"ok": True}
+
+
+class ContextStoreTests(unittest.TestCase):
+    def test_dotted_keys_are_nested(self):
+        store = ContextStore()
+        store.set("step_x.output", {"text": "hi"})
+        store.set("step_x.meta", 1)
+        self.assertEqual(store.get("step_x"), {"output": {"text": "hi"}, "meta": 1})
+        self.assertEqual(store.get("step_x.output.text"), "hi")
+        self.assertIsNone(store.get("step_x.missing"))
+
+    def test_writes_never_touch_dicts_handed_out(self):
+        store = ContextStore({"a.b": 1})
+        before = store.snapshot()
+        nested = store.get("a")
+        store.set("a.c", 2)
+        self.assertEqual(before, {"a": {"b": 1}})
+        self.assertEqual(nested, {"b": 1})
+        self.assertEqual(store.get("a.c"), 2)
+
+    def test_index_follows_writes(self):
+        store = ContextStore()
+        store.set("s.output", "first")
+        self.assertEqual(store.get("s.output"), "first")
+        store.set("s", {"output": "second"})
+        self.assertEqual(store.get("s.output"), "second")
+        store.delete("s.output")
+        self.assertIsNone(store.get("s.output"))
+
+    def test_changes_are_top_level_keys(self):
+        store = ContextStore()
+        store.set("a.b", 1)
+        store.set("c", 2)
+        self.assertEqual(store.take_changes(), {"a": {"b": 1}, "c": 2})
+        self.assertEqual(store.take_changes(), {})
+
+    def test_concurrent_readers_and_writers(self):
+        store = ContextStore()
+        errors = []
+
+        def write(n):
+            for i in range(2000):
+                store.set(f"w{n}.value", i)
+
+        def read():
+            for _ in range(2000):
+                for value in store.snapshot().values():
+                    if not isinstance(value, dict):
+                        errors.append(value)
+
+        threads = [threading.Thread(target=write, args=(n,)) for n in range(4)] + [threading.Thread(target=read)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(errors, [])
+        self.assertEqual([store.get(f"w{n}.value") for n in range(4)], [1999] * 4)
+
+
+class ContextViewTests(unittest.TestCase):
+    def test_layers_shadow_without_copying(self):
+        context = ContextStore({"row": {"name": "global"}, "step_x.output": {"text": "hi"}})
+        scope = ContextStore({"row": {"name": "item"}})
+        view = ContextView([{"_tracker": "handle"}, scope, context])
+        self.assertEqual(view["row.name"], "item")
+        self.assertEqual(view.get("step_x.output.text"), "hi")
+        self.assertEqual(view["_tracker"], "handle")
+        self.assertEqual(sorted(view), ["_tracker", "row", "step_x"])
+
+        context.set("late", 1)
+        self.assertEqual(view["late"], 1)  # a view, not a copy
+
+    def test_writes_need_the_explicit_api(self):
+        context = ContextStore()
+        view = ContextView([context], writer=context.set)
+        with self.assertRaises(TypeError):
+            view["key"] = "value"
+        view.set("key", "value")
+        self.assertEqual(context.get("key"), "value")
+        with self.assertRaises(TypeError):
+            ContextView([context]).set("key", "other")
+
+
+class ScopedLoopTests(unittest.TestCase):
+    def test_nested_loops_keep_their_own_index(self):
+        Recorder.calls = []
+        cm = ComponentManager()
+        cm.register_component("recorder", Recorder)
+        tracker = StateTracker(db_path=None)
+        model = ProcessModel(name="nested", steps=[
+            StepModel(id="outer", type="loop", loop=LoopModel(type="count", count=2, steps=[
+                StepModel(id="inner", type="loop", loop=LoopModel(type="count", count=2, steps=[
+                    StepModel(id="rec", type="recorder", params={"outer": "${outer.index}", "inner": "${loop_index}"}),
+                ])),
+                StepModel(id="after", type="recorder", params={"outer": "${loop_index}", "inner": "${inner.index|-1}"}),
+            ])),
+        ])
+        result = ExecutionEngine(cm, StrategyManager(), tracker).execute(model)
+        self.assertEqual(result.status, ExecutionStatus.COMPLETED)
+        self.assertEqual(Recorder.calls, [(0, 0), (0, 1), (0, -1), (1, 0), (1, 1), (1, -1)])
+        self.assertEqual(tracker.get_context("rec.output"), {"ok": True})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+import unittest
+
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from synthflow.components.async_human_interaction import AsyncHumanInteraction
+from synthflow.components.human_interaction import HumanInteraction
+from synthflow.core.async_execution_engine import AsyncExecutionEngine
+from synthflow.core.component_manager import ComponentManager
+from synthflow.core.config_parser import ProcessModel, StepModel, LoopModel
+from synthflow.core.control import ExecutionControl, ExecutionCancelled
+from synthflow.core.execution_engine import ExecutionEngine, ExecutionStatus
+from synthflow.core.state_tracker import StateTracker
+from synthflow.core.strategy_manager import StrategyManager
+
+
+class Ticker:
+    ticks = []
+
+    def initialize(self, config):
+        pass
+
+    def execute(self, ctx, params):
+        Ticker.ticks.append(time.time())
+        ctx["_control"].sleep(0.02)
+        return {"tick": len(Ticker.ticks)}
+
+
+def human_step():
+    return StepModel(id="ask", type="human_interaction", params={"instruction": "approve", "timeout": 300})
+
+
+class ControlPlaneTests(unittest.TestCase):
+    def setUp(self):
+        Ticker.ticks = []
+        self.cm = ComponentManager()
+        self.cm.register_component("human_interaction", HumanInteraction)
+        self.cm.register_component("ticker", Ticker)
+
+    def test_cancel_interrupts_human_wait(self):
+        engine = ExecutionEngine(self.cm, StrategyManager(), StateTracker())
+        threading.Timer(0.2, engine.cancel).start()
+        start = time.time()
+        result = engine.execute(ProcessModel(name="ask", steps=[human_step()]))
+        self.assertEqual(result.status, ExecutionStatus.CANCELLED)
+        self.assertLess(time.time() - start, 0.5)
+
+    def test_pause_parks_and_resume_continues(self):
+        engine = ExecutionEngine(self.cm, StrategyManager(), StateTracker())
+        model = ProcessModel(name="ticks", steps=[
+            StepModel(id="loop", type="loop", loop=LoopModel(type="count", count=20, steps=[
+                StepModel(id="tick", type="ticker"),
+            ])),
+        ])
+        runner = threading.Thread(target=lambda: setattr(self, "result", engine.execute(model)))
+        runner.start()
+        time.sleep(0.1)
+        engine.pause()
+        time.sleep(0.05)
+        paused_at = len(Ticker.ticks)
+        time.sleep(0.3)
+        self.assertEqual(len(Ticker.ticks), paused_at)
+        engine.resume()
+        runner.join(5)
+        self.assertEqual(self.result.status, ExecutionStatus.COMPLETED)
+        self.assertEqual(len(Ticker.ticks), 20)
+
+    def test_async_cancel_interrupts_human_wait(self):
+        cm = ComponentManager()
+        cm.register_component("human_interaction", AsyncHumanInteraction)
+        engine = AsyncExecutionEngine(cm, StrategyManager(), StateTracker())
+
+        async def run():
+            asyncio.get_running_loop().call_later(0.2, engine.cancel)
+            return await engine.execute_async(ProcessModel(name="ask", steps=[human_step()]))
+
+        start = time.time()
+        result = asyncio.run(run())
+        self.assertEqual(result.status, ExecutionStatus.CANCELLED)
+        self.assertLess(time.time() - start, 0.5)
+
+    def test_control_sleep_is_interruptible(self):
+        control = ExecutionControl()
+        threading.Timer(0.05, control.cancel).start()
+        start = time.time()
+        with self.assertRaises(ExecutionCancelled):
+            control.sleep(5)
+        self.assertLess(time.time() - start, 0.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
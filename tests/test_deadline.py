@@ -0,0 +1,115 @@
+import asyncio
+import os
+import sys
+import time
+import unittest
+
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from synthflow.core.async_execution_engine import AsyncExecutionEngine
+from synthflow.core.component_manager import ComponentManager
+from synthflow.core.config_parser import ProcessModel, StepModel, LoopModel, RetryModel
+from synthflow.core.deadline import Deadline, DeadlineExceeded
+from synthflow.core.execution_engine import ExecutionEngine, ExecutionStatus
+from synthflow.core.state_tracker import StateTracker
+from synthflow.core.strategy_manager import StrategyManager
+
+
+class Waiter:
+    budgets = []
+    timeouts = []
+
+    def initialize(self, config):
+        pass
+
+    def execute(self, ctx, params):
+        deadline = ctx["_deadline"]
+        Waiter.budgets.append(deadline.remaining())
+        Waiter.timeouts.append(ctx["_timeout"])
+        # Cooperative component: waits at most the remaining budget
+        time.sleep(deadline.clamp(params.get("seconds", 0)))
+        return {"slept": params.get("seconds", 0)}
+
+
+def wait(step_id, seconds, **kwargs):
+    return StepModel(id=step_id, type="waiter", params={"seconds": seconds}, **kwargs)
+
+
+class DeadlineTests(unittest.TestCase):
+    def setUp(self):
+        Waiter.budgets = []
+        Waiter.timeouts = []
+        self.cm = ComponentManager()
+        self.cm.register_component("waiter", Waiter)
+        self.tracker = StateTracker()
+        self.engine = ExecutionEngine(self.cm, StrategyManager(), self.tracker)
+
+    def test_step_timeout_fails_fast(self):
+        start = time.time()
+        result = self.engine.execute(ProcessModel(name="slow", steps=[wait("slow", 5, timeout=0.2)]))
+        self.assertEqual(result.status, ExecutionStatus.FAILED)
+        self.assertIn("step slow", result.error)
+        self.assertLess(time.time() - start, 1)
+        self.assertLessEqual(Waiter.budgets[0], 0.2)
+
+    def test_step_timeout_follows_on_error(self):
+        result = self.engine.execute(ProcessModel(name="slow", steps=[
+            wait("slow", 5, timeout=0.1, on_error="continue"),
+            wait("next", 0),
+        ]))
+        self.assertEqual(result.status, ExecutionStatus.COMPLETED)
+        self.assertIsNone(self.tracker.get_context("slow.output"))
+        self.assertEqual(self.tracker.get_context("next.output"), {"slept": 0})
+
+    def test_process_timeout_stops_loop_despite_on_error(self):
+        model = ProcessModel(name="loop", timeout=0.3, steps=[
+            StepModel(id="loop", type="loop", loop=LoopModel(type="count", count=100, steps=[
+                wait("tick", 0.05, on_error="continue"),
+            ])),
+        ])
+        start = time.time()
+        result = self.engine.execute(model)
+        self.assertEqual(result.status, ExecutionStatus.FAILED)
+        self.assertLess(time.time() - start, 1)
+        self.assertLess(len(Waiter.budgets), 10)
+
+    def test_retries_stop_at_deadline(self):
+        policy = RetryModel(attempts=10, backoff=0.5, jitter=0)
+        result = self.engine.execute(ProcessModel(name="retry", steps=[wait("slow", 5, timeout=0.2, retry=policy)]))
+        self.assertEqual(result.status, ExecutionStatus.FAILED)
+        self.assertEqual(len(Waiter.budgets), 1)
+
+    def test_async_engine_abandons_hung_component(self):
+        engine = AsyncExecutionEngine(self.cm, StrategyManager(), StateTracker())
+
+        class Hung:
+            def initialize(self, config):
+                pass
+
+            async def execute(self, ctx, params):
+                await asyncio.sleep(10)
+
+        self.cm.register_component("hung", Hung)
+        start = time.time()
+        result = engine.execute(ProcessModel(name="hung", steps=[StepModel(id="h", type="hung", timeout=0.2)]))
+        self.assertEqual(result.status, ExecutionStatus.FAILED)
+        self.assertLess(time.time() - start, 1)
+
+    def test_every_component_gets_its_remaining_seconds(self):
+        result = self.engine.execute(ProcessModel(name="budget", steps=[wait("bounded", 0, timeout=2), wait("free", 0)]))
+        self.assertEqual(result.status, ExecutionStatus.COMPLETED)
+        self.assertTrue(0 < Waiter.timeouts[0] <= 2)
+        self.assertIsNone(Waiter.timeouts[1])
+
+    def test_nested_deadline_never_extends_parent(self):
+        parent = Deadline.after(1, "process")
+        self.assertIs(parent.child(5, "step"), parent)
+        self.assertLessEqual(parent.child(0.5, "step").remaining(), 0.5)
+        self.assertEqual(Deadline().clamp_ms(30000), 30000)
+        with self.assertRaises(DeadlineExceeded):
+            Deadline.after(0, "step x").check()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+import os
+import sys
+import unittest
+
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from synthflow.core.component_manager import ComponentManager
+from synthflow.core.config_parser import ProcessModel, StepModel, LoopModel, ActionModel, LocatorModel
+from synthflow.core.execution_engine import ExecutionEngine, ExecutionStatus
+from synthflow.core.execution_plan import PlanCompiler, KIND_LOOP
+from synthflow.core.state_tracker import StateTracker
+from synthflow.core.strategy_manager import StrategyManager
+
+
+class RecordingExecutor:
+    calls = []
+
+    def initialize(self, config):
+        pass
+
+    def execute(self, ctx, params):
+        RecordingExecutor.calls.append(params)
+        return {"status": "success"}
+
+
+class PlanCompilerTests(unittest.TestCase):
+    def test_jump_targets_are_precomputed(self):
+        model = ProcessModel(name="jumps", steps=[
+            StepModel(id="a", type="interaction", next_step="c"),
+            StepModel(id="b", type="interaction"),
+            StepModel(id="c", type="interaction"),
+        ])
+        scope = PlanCompiler().compile(model).root
+        self.assertEqual([i.next_index for i in scope.instructions], [2, 2, None])
+        self.assertEqual(scope.instructions[0].fallthrough_index, 1)
+        self.assertEqual(scope.instructions[0].component_type, "operation_executor")
+
+    def test_unknown_jump_target_fails_compilation(self):
+        model = ProcessModel(name="bad", steps=[StepModel(id="a", type="interaction", next_step="missing")])
+        with self.assertRaises(ValueError):
+            PlanCompiler().compile(model)
+
+    def test_lav_template_is_dumped_once(self):
+        model = ProcessModel(name="lav", steps=[
+            StepModel(id="loop", type="loop", loop=LoopModel(type="count", count=1, steps=[
+                StepModel(id="type_it", type="interaction",
+                          locator=LocatorModel(type="css", value="#q"),
+                          action=ActionModel(type="input", value="${loop_index}")),
+            ])),
+        ])
+        loop_instr = PlanCompiler().compile(model).root.instructions[0]
+        self.assertEqual(loop_instr.kind, KIND_LOOP)
+        body_instr = loop_instr.body.instructions[0]
+        self.assertFalse(body_instr.lav_renderer.is_static)
+        self.assertEqual(body_instr.lav_template["locator"]["value"], "#q")
+
+
+class PlanExecutionTests(unittest.TestCase):
+    def setUp(self):
+        RecordingExecutor.calls = []
+        self.cm = ComponentManager()
+        self.cm.register_component("operation_executor", RecordingExecutor)
+        self.tracker = StateTracker()
+        self.engine = ExecutionEngine(self.cm, StrategyManager(), self.tracker)
+
+    def test_count_loop_resolves_fresh_params_each_iteration(self):
+        model = ProcessModel(name="loop", steps=[
+            StepModel(id="loop", type="loop", loop=LoopModel(type="count", count=3, steps=[
+                StepModel(id="type_it", type="interaction",
+                          locator=LocatorModel(type="css", value="#q"),
+                          action=ActionModel(type="input", value="${loop_index}")),
+            ])),
+        ])
+        result = self.engine.execute(model)
+        self.assertEqual(result.status, ExecutionStatus.COMPLETED)
+        self.assertEqual([c["action"]["value"] for c in RecordingExecutor.calls], [0, 1, 2])
+        self.assertIs(self.engine.compile(model), self.engine.compile(model))
+        # Cached on the model itself: a copy gets its own plan, other engines reuse it
+        self.assertIs(model._plan, self.engine.compile(model))
+        self.assertIsNot(self.engine.compile(model.model_copy()), model._plan)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import os
+import sys
+import unittest
+
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from synthflow.core.config_parser import BranchModel
+from synthflow.core.expression import compile_condition, ConditionSyntaxError
+
+
+class ConditionExpressionTests(unittest.TestCase):
+    def setUp(self):
+        self.context = {
+            "decision_type": "Type1",
+            "score": "75",
+            "status": "open",
+            "tags": ["a", "b"],
+            "note": "x == y",
+            "flag": False,
+        }
+
+    def check(self, text):
+        return compile_condition(text)(self.context.get)
+
+    def test_legacy_forms(self):
+        self.assertTrue(self.check("${decision_type} == 'Type1'"))
+        self.assertTrue(self.check("${decision_type} == Type1"))
+        self.assertTrue(self.check("${decision_type} != 'Type2'"))
+        self.assertTrue(self.check("${status}"))
+        self.assertFalse(self.check("${missing}"))
+
+    def test_quoted_values_containing_operators(self):
+        self.assertTrue(self.check("${note} == 'x == y'"))
+        self.assertFalse(self.check("${note} != \"x == y\""))
+
+    def test_numeric_comparisons(self):
+        self.assertTrue(self.check("${score} >= 60"))
+        self.assertFalse(self.check("${score} < 60"))
+        self.assertTrue(self.check("${score} == 75"))
+
+    def test_boolean_logic_and_membership(self):
+        self.assertTrue(self.check("${score} > 50 and ${status} in ['new', 'open']"))
+        self.assertTrue(self.check("not ${flag} and (${decision_type} == 'X' or 'a' in ${tags})"))
+        self.assertTrue(self.check("'c' not in ${tags}"))
+        self.assertFalse(self.check("${flag} or ${missing}"))
+
+    def test_short_circuit(self):
+        calls = []
+
+        def lookup(key):
+            calls.append(key)
+            return self.context.get(key)
+
+        compile_condition("${flag} and ${status}")(lookup)
+        self.assertEqual(calls, ["flag"])
+
+    def test_syntax_errors(self):
+        with self.assertRaises(ConditionSyntaxError):
+            compile_condition("${a} == (1")
+        with self.assertRaises(ConditionSyntaxError):
+            compile_condition("")
+
+    def test_compiled_condition_is_cached_on_branch(self):
+        branch = BranchModel(condition="${status} == 'open'")
+        self.assertIs(branch.compiled_condition(), branch.compiled_condition())
+        self.assertTrue(branch.compiled_condition()(self.context.get))
+
+
+if __name__ == "__main__":
+    unittest.main()
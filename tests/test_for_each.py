@@ -0,0 +1,156 @@
+import os
+import sys
+import threading
+import time
+import unittest
+from unittest import mock
+
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from synthflow.core import browser_manager as browser_module
+from synthflow.core.browser_manager import BrowserContextManager
+from synthflow.core.component_manager import ComponentManager
+from synthflow.core.config_parser import ProcessModel, StepModel, LoopModel, DataBindingModel
+from synthflow.core.execution_engine import ExecutionEngine, ExecutionStatus
+from synthflow.core.state_tracker import StateTracker
+from synthflow.core.strategy_manager import StrategyManager
+
+
+class SlowEcho:
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def initialize(self, config):
+        pass
+
+    def execute(self, ctx, params):
+        with SlowEcho.lock:
+            SlowEcho.active += 1
+            SlowEcho.peak = max(SlowEcho.peak, SlowEcho.active)
+        time.sleep(0.05)
+        with SlowEcho.lock:
+            SlowEcho.active -= 1
+        if params.get("value") == "boom":
+            raise RuntimeError("boom")
+        return {"echo": params.get("value"), "index": ctx.get("loop_index")}
+
+
+class OwnedContext:
+    """Stands in for the persistent sync-Playwright context, usable only from its own thread"""
+
+    def __init__(self):
+        self.owner = threading.current_thread()
+
+    def storage_state(self):
+        if threading.current_thread() is not self.owner:
+            raise RuntimeError("cannot switch to a different thread")
+        return {"cookies": [{"name": "session", "value": "logged-in"}], "origins": []}
+
+    def close(self):
+        pass
+
+
+class FakeSession:
+    def __init__(self, headless=False, args=None, storage_state=None):
+        self.storage_state = storage_state
+
+    def get_page(self):
+        return self
+
+    def close(self):
+        pass
+
+
+class BrowserHolder:
+    def initialize(self, config):
+        pass
+
+    def __init__(self):
+        self.browser_manager = BrowserContextManager()
+
+
+class SessionProbe:
+    seen = []
+
+    def initialize(self, config):
+        pass
+
+    def execute(self, ctx, params):
+        SessionProbe.seen.append(ctx.get("_browser").get_page().storage_state)
+        return {}
+
+
+class ForEachLoopTests(unittest.TestCase):
+    def setUp(self):
+        SlowEcho.active = SlowEcho.peak = 0
+        self.cm = ComponentManager()
+        self.cm.register_component("echo", SlowEcho)
+        self.tracker = StateTracker()
+        self.engine = ExecutionEngine(self.cm, StrategyManager(), self.tracker)
+
+    def build(self, concurrency):
+        return ProcessModel(name="fan_out", steps=[
+            StepModel(id="rows", type="loop", loop=LoopModel(
+                type="for_each", items="${records}", item_var="row", concurrency=concurrency,
+                steps=[
+                    StepModel(id="echo_row", type="echo", params={"value": "${row.name}"},
+                              data=DataBindingModel(outputs={"last_echo": "echo"})),
+                ])),
+        ])
+
+    def test_sequential_for_each(self):
+        self.tracker.set_context("records", [{"name": "a"}, {"name": "b"}])
+        result = self.engine.execute(self.build(1))
+        self.assertEqual(result.status, ExecutionStatus.COMPLETED)
+        self.assertEqual(self.tracker.get_context("last_echo"), "b")
+        self.assertEqual(self.tracker.get_context("loop_index"), 1)
+
+    def test_concurrent_for_each_merges_in_item_order(self):
+        names = [f"n{i}" for i in range(8)]
+        self.tracker.set_context("records", [{"name": n} for n in names])
+        result = self.engine.execute(self.build(4))
+        self.assertEqual(result.status, ExecutionStatus.COMPLETED)
+        self.assertGreater(SlowEcho.peak, 1)
+        self.assertLessEqual(SlowEcho.peak, 4)
+        outputs = self.tracker.get_context("rows.output")
+        self.assertEqual([o["last_echo"] for o in outputs], names)
+        self.assertEqual([o["echo_row.output"]["index"] for o in outputs], list(range(8)))
+        self.assertEqual(self.tracker.get_context("last_echo"), "n7")
+
+    def test_concurrent_item_failure_fails_the_loop(self):
+        self.tracker.set_context("records", [{"name": "ok"}, {"name": "boom"}, {"name": "ok"}])
+        result = self.engine.execute(self.build(2))
+        self.assertEqual(result.status, ExecutionStatus.FAILED)
+        self.assertIn("boom", result.error)
+
+
+class WorkerSessionTests(unittest.TestCase):
+    def test_workers_inherit_the_login_state(self):
+        SessionProbe.seen = []
+        manager = BrowserContextManager()
+        previous, manager.context = manager.context, OwnedContext()
+        try:
+            cm = ComponentManager()
+            cm.register_component("operation_executor", BrowserHolder)
+            cm.register_component("probe", SessionProbe)
+            tracker = StateTracker(db_path=None)
+            tracker.set_context("records", [1, 2, 3])
+            model = ProcessModel(name="sessions", steps=[
+                StepModel(id="rows", type="loop", loop=LoopModel(
+                    type="for_each", items="${records}", concurrency=3,
+                    steps=[StepModel(id="probe_row", type="probe")])),
+            ])
+            with mock.patch.object(browser_module, "IsolatedBrowserSession", FakeSession):
+                result = ExecutionEngine(cm, StrategyManager(), tracker).execute(model)
+        finally:
+            manager.context = previous
+        self.assertEqual(result.status, ExecutionStatus.COMPLETED)
+        self.assertEqual(len(SessionProbe.seen), 3)
+        for state in SessionProbe.seen:
+            self.assertEqual(state["cookies"][0]["value"], "logged-in")
+
+
+if __name__ == "__main__":
+    unittest.main()
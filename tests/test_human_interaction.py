@@ -0,0 +1,82 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+import unittest
+
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from synthflow.components.async_human_interaction import AsyncHumanInteraction
+from synthflow.components.human_interaction import HumanInteraction
+from synthflow.core.state_tracker import StateTracker
+
+
+def answer_when_pending(tracker, action, delay=0.0):
+    """Responder that answers the first pending interaction by id"""
+    def run():
+        while tracker.get_pending_interaction() is None:
+            time.sleep(0.001)
+        time.sleep(delay)
+        pending = tracker.get_pending_interaction()
+        tracker.resolve_interaction({"status": "completed", "action": action}, interaction_id=pending["id"])
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread
+
+
+class InteractionHandoffTests(unittest.TestCase):
+    def setUp(self):
+        self.tracker = StateTracker(db_path=None)
+
+    def test_result_before_wait_is_not_lost(self):
+        self.tracker.set_pending_interaction({"id": "fast"})
+        self.tracker.resolve_interaction({"action": "execute"}, interaction_id="fast")
+        self.assertEqual(self.tracker.wait_for_interaction_result(timeout=1, interaction_id="fast"), {"action": "execute"})
+
+    def test_results_go_to_their_own_interaction(self):
+        self.tracker.set_pending_interaction({"id": "a"})
+        self.tracker.set_pending_interaction({"id": "b"})
+        self.tracker.resolve_interaction({"action": "for b"}, interaction_id="b")
+        self.tracker.resolve_interaction({"action": "for a"})  # oldest pending
+        self.assertEqual(self.tracker.wait_for_interaction_result(timeout=1, interaction_id="a"), {"action": "for a"})
+        self.assertEqual(self.tracker.wait_for_interaction_result(timeout=1, interaction_id="b"), {"action": "for b"})
+
+    def test_expired_interaction_ignores_late_result(self):
+        self.tracker.set_pending_interaction({"id": "slow"})
+        self.assertIsNone(self.tracker.wait_for_interaction_result(timeout=0.01, interaction_id="slow"))
+        self.tracker.resolve_interaction({"action": "late"}, interaction_id="slow")
+        self.assertIsNone(self.tracker.take_interaction_result("slow"))
+
+    def test_result_without_pending_interaction_is_rejected(self):
+        self.assertFalse(self.tracker.resolve_interaction({"action": "stray"}))
+        self.assertIsNone(self.tracker.take_interaction_result(None))
+
+        # A later interaction is not answered by the stray result
+        self.tracker.set_pending_interaction({"id": "next"})
+        self.assertIsNone(self.tracker.wait_for_interaction_result(timeout=0.01, interaction_id="next"))
+
+    def test_component_wakes_immediately(self):
+        responder = answer_when_pending(self.tracker, "execute", delay=0.05)
+        start = time.monotonic()
+        result = HumanInteraction().execute({"_tracker": self.tracker}, {"timeout": 5})
+        responder.join()
+        self.assertEqual(result["action"], "execute")
+        self.assertLess(time.monotonic() - start, 0.3)
+
+    def test_async_component_wakes_immediately(self):
+        responder = answer_when_pending(self.tracker, "skip", delay=0.05)
+
+        async def run():
+            return await AsyncHumanInteraction().execute({"_tracker": self.tracker}, {"timeout": 5})
+
+        start = time.monotonic()
+        result = asyncio.run(run())
+        responder.join()
+        self.assertEqual(result["action"], "skip")
+        self.assertLess(time.monotonic() - start, 0.3)
+
+
+if __name__ == "__main__":
+    unittest.main()
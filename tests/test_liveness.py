@@ -0,0 +1,93 @@
+import os
+import sys
+import unittest
+
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from synthflow.core.component_manager import ComponentManager
+from synthflow.core.config_parser import LoopModel, ProcessModel, StepModel
+from synthflow.core.execution_engine import ExecutionEngine, ExecutionStatus
+from synthflow.core.execution_plan import PlanCompiler
+from synthflow.core.liveness import analyze_liveness
+from synthflow.core.state_tracker import StateTracker
+from synthflow.core.strategy_manager import StrategyManager
+
+
+class Echo:
+    def initialize(self, config):
+        pass
+
+    def execute(self, ctx, params):
+        return {"value": params.get("value"), "blob": "x" * 1000}
+
+
+def step(step_id, value=None, **kwargs):
+    return StepModel(id=step_id, type="echo", params={"value": value}, **kwargs)
+
+
+def releases_of(steps):
+    plan = PlanCompiler().compile(ProcessModel(name="p", steps=steps))
+    return analyze_liveness(plan.root)
+
+
+class LivenessAnalysisTests(unittest.TestCase):
+    def test_output_released_after_last_reader(self):
+        releases = releases_of([step("a"), step("b", "${a.output.value}"), step("c"), step("d", "${a.output}")])
+        self.assertEqual(releases["root"], {1: ("b.output",), 2: ("c.output",), 3: ("a.output", "d.output")})
+
+    def test_keep_output_opts_out(self):
+        releases = releases_of([step("a", keep_output=True), step("b")])
+        self.assertEqual(releases["root"], {1: ("b.output",)})
+
+    def test_loop_carried_read_is_kept(self):
+        body = [step("use", "${make.output.value|0}"), step("make")]
+        releases = releases_of([StepModel(id="l", type="loop", loop=LoopModel(type="count", count=3, steps=body))])
+        self.assertNotIn("make.output", sum(releases.get("l.loop", {}).values(), ()))
+        self.assertIn("use.output", releases["l.loop"][0])
+
+    def test_for_each_aggregate_reader_keeps_item_outputs(self):
+        loop = StepModel(id="l", type="loop", loop=LoopModel(type="for_each", items="${rows}", steps=[step("inner")]))
+        self.assertNotIn("l.loop", releases_of([loop, step("after", "${l.output}")]))
+        self.assertEqual(releases_of([loop, step("after")])["l.loop"], {0: ("inner.output",)})
+
+    def test_jumps_disable_release(self):
+        releases = releases_of([step("a", next_step="c"), step("b"), step("c")])
+        self.assertNotIn("root", releases)
+
+
+class OutputRetentionTests(unittest.TestCase):
+    def run_process(self, steps, retention):
+        cm = ComponentManager()
+        cm.register_component("echo", Echo)
+        tracker = StateTracker(storage="memory")
+        model = ProcessModel(name="p", steps=steps, output_retention=retention)
+        result = ExecutionEngine(cm, StrategyManager(), tracker).execute(model)
+        self.assertEqual(result.status, ExecutionStatus.COMPLETED)
+        return tracker
+
+    def test_drop_bounds_context_in_loops(self):
+        body = [step("fetch"), step("parse", "${fetch.output.value}")]
+        steps = [StepModel(id="l", type="loop", loop=LoopModel(type="count", count=20, steps=body)),
+                 step("last", "${l.index|-1}", keep_output=True)]
+        tracker = self.run_process(steps, "drop")
+        self.assertIsNone(tracker.get_context("fetch.output"))
+        self.assertIsNone(tracker.get_context("parse.output"))
+        self.assertIsNotNone(tracker.get_context("last.output"))
+
+        kept = self.run_process(steps, "keep")
+        self.assertIsNotNone(kept.get_context("fetch.output"))
+
+    def test_spill_records_released_values(self):
+        tracker = self.run_process([step("a", "v"), step("b", "${a.output.value}")], "spill")
+        self.assertEqual(tracker.get_all_context().get("a"), {})
+        released = [e for e in tracker.read_timeline() if e.status == "outputs_released"]
+        self.assertEqual(released[-1].details["outputs"]["a.output"]["value"], "v")
+
+    def test_unknown_policy_rejected(self):
+        with self.assertRaises(ValueError):
+            PlanCompiler().compile(ProcessModel(name="p", steps=[step("a")], output_retention="archive"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+import asyncio
+import os
+import sys
+import unittest
+
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from synthflow.components.async_operation_executor import AsyncOperationExecutor
+from synthflow.components.operation_executor import OperationExecutor
+
+
+class FakePage:
+    """Records the Playwright calls; wait_for_selector fails for missing selectors"""
+
+    def __init__(self):
+        self.calls = []
+        self.url = "about:blank"
+
+    def set_default_timeout(self, timeout):
+        pass
+
+    def goto(self, url):
+        self.calls.append(("goto", url))
+        self.url = url
+
+    def fill(self, selector, text):
+        self.calls.append(("fill", selector, text))
+
+    def text_content(self, selector):
+        self.calls.append(("text_content", selector))
+        return f"text of {selector}"
+
+    def wait_for_selector(self, selector, state=None, timeout=None):
+        self.calls.append(("wait_for_selector", selector))
+        if selector == "#missing":
+            raise TimeoutError(f"{selector} not visible")
+
+
+class AsyncFakePage(FakePage):
+    async def goto(self, url):
+        FakePage.goto(self, url)
+
+    async def fill(self, selector, text):
+        FakePage.fill(self, selector, text)
+
+    async def text_content(self, selector):
+        return FakePage.text_content(self, selector)
+
+    async def wait_for_selector(self, selector, state=None, timeout=None):
+        FakePage.wait_for_selector(self, selector, state, timeout)
+
+
+class Session:
+    def __init__(self, page):
+        self.page = page
+
+    def get_page(self):
+        return self.page
+
+
+class AsyncSession(Session):
+    async def get_page(self):
+        return self.page
+
+
+def lav(action, action_value=None, target=None, **verification):
+    params = {"locator": {"value": target}, "action": {"type": action, "value": action_value, "human_like": False}}
+    if verification:
+        params["verification"] = verification
+    return params
+
+
+class OperationExecutorTests(unittest.TestCase):
+    """Both executors run the same shared actions; only the I/O is awaited or not"""
+
+    def run_both(self, params):
+        sync_page, async_page = FakePage(), AsyncFakePage()
+        sync_result = OperationExecutor().execute({"_browser": Session(sync_page)}, params)
+        async_result = asyncio.run(AsyncOperationExecutor().execute({"_browser": AsyncSession(async_page)}, params))
+        self.assertEqual(sync_result, async_result)
+        self.assertEqual(sync_page.calls, async_page.calls)
+        return sync_result, sync_page.calls
+
+    def test_lav_actions_and_verification(self):
+        result, calls = self.run_both(lav("open", "https://example.com", check="url_contains", value="example"))
+        self.assertEqual(result, {"status": "success"})
+        self.assertEqual(calls, [("goto", "https://example.com")])
+
+        result, calls = self.run_both(lav("read_text", target="#title", check="visible", selector="#title"))
+        self.assertEqual(result, {"text": "text of #title", "status": "success"})
+        self.assertEqual(calls, [("text_content", "#title"), ("wait_for_selector", "#title")])
+
+    def test_ignored_verification_failure(self):
+        result, calls = self.run_both(lav("input", "hello", target="#name",
+                                          check="visible", selector="#missing", on_fail="ignore"))
+        self.assertEqual(result, {"status": "success"})
+        self.assertEqual(calls, [("fill", "#name", "hello"), ("wait_for_selector", "#missing")])
+
+    def test_failed_verification_raises(self):
+        params = lav("input", "hello", target="#name", check="visible", selector="#missing")
+        with self.assertRaises(TimeoutError):
+            OperationExecutor().execute({"_browser": Session(FakePage())}, params)
+        with self.assertRaises(TimeoutError):
+            asyncio.run(AsyncOperationExecutor().execute({"_browser": AsyncSession(AsyncFakePage())}, params))
+
+    def test_legacy_actions(self):
+        result, calls = self.run_both({"action": "type", "target": "#q", "value": 42, "human_like": False})
+        self.assertEqual(result, {"status": "success"})
+        self.assertEqual(calls, [("fill", "#q", "42")])
+        result, _ = self.run_both({"action": "hover", "target": "#q", "human_like": False})
+        self.assertEqual(result, {"status": "skipped", "reason": "unknown_action"})
+        with self.assertRaises(ValueError):
+            OperationExecutor().execute({"_browser": Session(FakePage())}, {"action": "click"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import os
+import sys
+import threading
+import time
+import unittest
+
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from synthflow.core.component_manager import ComponentManager
+from synthflow.core.config_parser import ProcessModel, StepModel, BranchModel, ParallelModel
+from synthflow.core.execution_engine import ExecutionEngine, ExecutionStatus
+from synthflow.core.state_tracker import StateTracker
+from synthflow.core.strategy_manager import StrategyManager
+
+
+class Sleeper:
+    # Steps with "meet" wait here for each other: only concurrent steps get through
+    barrier = None
+
+    def initialize(self, config):
+        pass
+
+    def execute(self, ctx, params):
+        if params.get("meet"):
+            Sleeper.barrier.wait(timeout=5)
+        time.sleep(params.get("seconds", 0))
+        if params.get("fail"):
+            raise RuntimeError(f"{params.get('label')} failed")
+        return {"label": params.get("label")}
+
+
+def work(step_id, label, seconds=0.0, fail=False, meet=False):
+    return StepModel(id=step_id, type="sleeper", params={"label": label, "seconds": seconds, "fail": fail, "meet": meet})
+
+
+class ParallelStepTests(unittest.TestCase):
+    def setUp(self):
+        self.cm = ComponentManager()
+        self.cm.register_component("sleeper", Sleeper)
+        self.tracker = StateTracker()
+        self.engine = ExecutionEngine(self.cm, StrategyManager(), self.tracker)
+
+    def run_parallel(self, branches, join="all"):
+        model = ProcessModel(name="parallel", steps=[
+            StepModel(id="par", type="parallel", parallel=ParallelModel(join=join), branches=branches),
+            StepModel(id="after", type="sleeper", params={"label": "${par.read_a.read.output.label}"}),
+        ])
+        return self.engine.execute(model)
+
+    def test_all_join_runs_concurrently_and_namespaces_outputs(self):
+        # Both branches must be running at once to pass the barrier (run one after
+        # the other, the first times out and fails)
+        Sleeper.barrier = threading.Barrier(2)
+        result = self.run_parallel([
+            BranchModel(name="read_a", steps=[work("read", "A", meet=True)]),
+            BranchModel(name="prep_b", steps=[work("prep", "B", meet=True)]),
+        ])
+        self.assertEqual(result.status, ExecutionStatus.COMPLETED)
+        self.assertEqual(self.tracker.get_context("par.prep_b")["prep.output"], {"label": "B"})
+        self.assertEqual(self.tracker.get_context("after.output"), {"label": "A"})
+        self.assertEqual(self.tracker.get_context("par.output")["read_a"]["status"], "completed")
+
+    def test_branch_error_policy(self):
+        result = self.run_parallel([
+            BranchModel(name="read_a", steps=[work("read", "A")]),
+            BranchModel(name="flaky", on_error="continue", steps=[work("x", "X", fail=True)]),
+        ])
+        self.assertEqual(result.status, ExecutionStatus.COMPLETED)
+        self.assertEqual(self.tracker.get_context("par.output")["flaky"]["status"], "failed")
+
+        result = self.run_parallel([
+            BranchModel(name="read_a", steps=[work("read", "A")]),
+            BranchModel(name="broken", steps=[work("x", "X", fail=True)]),
+        ])
+        self.assertEqual(result.status, ExecutionStatus.FAILED)
+
+    def test_first_success_cancels_remaining_branches(self):
+        result = self.run_parallel([
+            BranchModel(name="read_a", steps=[work("read", "A", 0.05)]),
+            BranchModel(name="slow", steps=[work("s1", "S", 0.3), work("s2", "S2")]),
+            BranchModel(name="broken", steps=[work("x", "X", fail=True)]),
+        ], join="first_success")
+        self.assertEqual(result.status, ExecutionStatus.COMPLETED)
+        summary = self.tracker.get_context("par.output")
+        self.assertEqual(summary["read_a"]["status"], "completed")
+        self.assertEqual(summary["slow"]["status"], "cancelled")
+        self.assertIsNone(self.tracker.get_context("s2.output"))
+
+
+if __name__ == "__main__":
+    unittest.main()
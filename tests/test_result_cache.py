@@ -0,0 +1,97 @@
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+import unittest
+
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from synthflow.core.component_manager import ComponentManager
+from synthflow.core.config_parser import ProcessModel, StepModel, CacheModel
+from synthflow.core.execution_engine import ExecutionEngine, ExecutionStatus
+from synthflow.core.result_cache import ResultCache, cache_key, MISS
+from synthflow.core.state_tracker import StateTracker
+from synthflow.core.strategy_manager import StrategyManager
+
+
+class Lookup:
+    calls = []
+
+    def initialize(self, config):
+        pass
+
+    def execute(self, ctx, params):
+        Lookup.calls.append(params["query"])
+        return {"answer": params["query"].upper()}
+
+
+class ResultCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp.name, "cache.db")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_key_ignores_param_order(self):
+        self.assertEqual(cache_key("c", {"a": 1, "b": 2}), cache_key("c", {"b": 2, "a": 1}))
+        self.assertNotEqual(cache_key("c", {"a": 1}), cache_key("d", {"a": 1}))
+
+    def test_ttl_expiry_and_lru_eviction(self):
+        cache = ResultCache(max_entries=2)
+        cache.set("short", 1, ttl=0.05)
+        self.assertEqual(cache.get("short"), 1)
+        time.sleep(0.1)
+        self.assertIs(cache.get("short"), MISS)
+
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        self.assertIs(cache.get("b"), MISS)
+        self.assertEqual(cache.get("a"), 1)
+
+    def test_persisted_entries_survive_a_new_cache(self):
+        ResultCache(db_path=self.db_path).set("k", {"v": [1, 2]}, persist=True, namespace="lookup")
+        cache = ResultCache(db_path=self.db_path)
+        self.assertEqual(cache.get("k"), {"v": [1, 2]})
+
+        cache.invalidate(namespace="lookup")
+        self.assertIs(ResultCache(db_path=self.db_path).get("k"), MISS)
+
+    def test_cached_step_skips_the_component(self):
+        Lookup.calls = []
+        cm = ComponentManager()
+        cm.register_component("lookup", Lookup)
+        cache = ResultCache(db_path=self.db_path)
+        steps = [
+            StepModel(id=f"q{i}", type="lookup", params={"query": "${term}"}, cache=CacheModel(persist=True))
+            for i in range(3)
+        ]
+        tracker = StateTracker(db_path=self.db_path)
+        tracker.set_context("term", "abc")
+        engine = ExecutionEngine(cm, StrategyManager(), tracker, result_cache=cache)
+
+        result = engine.execute(ProcessModel(name="cached", steps=steps))
+        self.assertEqual(result.status, ExecutionStatus.COMPLETED)
+        self.assertEqual(Lookup.calls, ["abc"])
+        self.assertEqual(tracker.get_context("q2.output"), {"answer": "ABC"})
+        hits = [e for e in tracker.get_timeline().events if e.status == "cache_hit"]
+        self.assertEqual(len(hits), 2)
+
+    def test_uncached_runs_leave_the_database_alone(self):
+        cm = ComponentManager()
+        cm.register_component("lookup", Lookup)
+        tracker = StateTracker(db_path=self.db_path)
+        engine = ExecutionEngine(cm, StrategyManager(), tracker)
+        steps = [StepModel(id="q", type="lookup", params={"query": "x"})]
+        self.assertEqual(engine.execute(ProcessModel(name="plain", steps=steps)).status, ExecutionStatus.COMPLETED)
+        self.assertIsNone(engine.result_cache)
+        with sqlite3.connect(self.db_path) as conn:
+            self.assertIsNone(conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'result_cache'").fetchone())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+import os
+import sys
+import unittest
+
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from synthflow.core.component_manager import ComponentManager
+from synthflow.core.config_parser import ProcessModel, StepModel, RetryModel, LoopModel
+from synthflow.core.execution_engine import ExecutionEngine, ExecutionStatus
+from synthflow.core.retry import retry_delay
+from synthflow.core.state_tracker import StateTracker
+from synthflow.core.strategy_manager import StrategyManager
+
+
+class Flaky:
+    failures = {}
+    calls = []
+
+    def initialize(self, config):
+        pass
+
+    def execute(self, ctx, params):
+        label = params.get("label")
+        Flaky.calls.append(label)
+        if Flaky.failures.get(label, 0) > 0:
+            Flaky.failures[label] -= 1
+            raise TimeoutError(f"{label} timed out")
+        if params.get("always_fail"):
+            raise ValueError(f"{label} is broken")
+        return {"label": label}
+
+
+def flaky(step_id, **kwargs):
+    params = {"label": step_id, "always_fail": kwargs.pop("always_fail", False)}
+    return StepModel(id=step_id, type="flaky", params=params, **kwargs)
+
+
+class RetryPolicyTests(unittest.TestCase):
+    def setUp(self):
+        Flaky.failures = {}
+        Flaky.calls = []
+        cm = ComponentManager()
+        cm.register_component("flaky", Flaky)
+        self.tracker = StateTracker()
+        self.engine = ExecutionEngine(cm, StrategyManager(), self.tracker)
+
+    def statuses(self, step_id):
+        return [e.status for e in self.tracker.get_timeline().events if e.step_id == step_id]
+
+    def test_transient_failure_is_retried_with_recovery(self):
+        Flaky.failures = {"open": 2}
+        policy = RetryModel(attempts=3, backoff=0.01, retry_on=["TimeoutError"], recovery=[flaky("reload")])
+        result = self.engine.execute(ProcessModel(name="retry", steps=[flaky("open", retry=policy)]))
+
+        self.assertEqual(result.status, ExecutionStatus.COMPLETED)
+        self.assertEqual(Flaky.calls, ["open", "reload", "open", "reload", "open"])
+        self.assertEqual(self.statuses("open").count("retrying"), 2)
+        retried = [e for e in self.tracker.get_timeline().events if e.status == "retried"][0]
+        self.assertEqual(retried.details["attempts"], 3)
+        self.assertTrue(retried.details["succeeded"])
+
+    def test_non_matching_error_is_not_retried(self):
+        policy = RetryModel(attempts=3, backoff=0, retry_on=["TimeoutError"])
+        result = self.engine.execute(ProcessModel(name="retry", steps=[flaky("bad", retry=policy, always_fail=True)]))
+        self.assertEqual(result.status, ExecutionStatus.FAILED)
+        self.assertEqual(Flaky.calls, ["bad"])
+
+    def test_on_error_skip_ends_current_iteration(self):
+        Flaky.failures = {"first": 1}
+        model = ProcessModel(name="skip", steps=[
+            StepModel(id="loop", type="loop", loop=LoopModel(type="count", count=2, steps=[
+                flaky("first", on_error="skip"),
+                flaky("second"),
+            ])),
+        ])
+        result = self.engine.execute(model)
+        self.assertEqual(result.status, ExecutionStatus.COMPLETED)
+        self.assertEqual(Flaky.calls, ["first", "first", "second"])
+
+    def test_unknown_on_error_is_rejected(self):
+        result = self.engine.execute(ProcessModel(name="bad", steps=[flaky("x", on_error="later")]))
+        self.assertEqual(result.status, ExecutionStatus.FAILED)
+
+    def test_backoff_grows_and_is_capped(self):
+        policy = RetryModel(backoff=1, multiplier=2, max_delay=3, jitter=0)
+        self.assertEqual([retry_delay(policy, n) for n in (1, 2, 3)], [1, 2, 3])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import os
+import sys
+import unittest
+
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from synthflow.core.config_parser import ProcessModel, StepModel, BranchModel, LoopModel
+from synthflow.core.simulation import Simulator, Latency, WORKER
+
+
+def process():
+    return ProcessModel(name="sim", steps=[
+        StepModel(id="open", type="operation_executor"),
+        StepModel(id="review", type="human_interaction"),
+        StepModel(id="route", type="condition", branches=[
+            BranchModel(condition="${review.output.decision} == 'reject'", steps=[StepModel(id="skipped", type="data_entry")]),
+            BranchModel(steps=[StepModel(id="submit", type="operation_executor")]),
+        ]),
+    ])
+
+
+class SimulationTests(unittest.TestCase):
+    def test_traces_follow_the_human_policy(self):
+        sim = Simulator(process(), human_policy={"review": {"action": "execute", "decision": "reject"}})
+        demands, ok = sim.trace()
+        self.assertTrue(ok)
+        self.assertEqual([d.step_id for d in demands], ["open", "review", "skipped"])
+        self.assertEqual(demands[1].resource, "reviewer")
+
+    def test_reviewer_bottleneck_in_virtual_time(self):
+        sim = Simulator(process(), latency={"human_interaction": 10, "open": Latency.fixed(2)}, default_latency=1)
+        report = sim.run(count=4, workers=4, capacities={"reviewer": 1})
+
+        # Each instance: 2s open, 10s review (serialized on one reviewer), 1s submit
+        self.assertEqual(report.makespan, 2 + 4 * 10 + 1)
+        self.assertEqual(report.queue_delay(100), 30)
+        reviewer = report.resources["reviewer"]
+        self.assertAlmostEqual(reviewer.utilisation, 40 / 43)
+        self.assertEqual(reviewer.max_queue, 3)
+        # Workers stay held while their instance waits for the reviewer
+        self.assertAlmostEqual(report.resources[WORKER].utilisation, (13 + 23 + 33 + 43) / (4 * 43))
+        self.assertEqual(report.summary()["instances"], 4)
+
+    def test_worker_limit_queues_instances(self):
+        sim = Simulator(process(), default_latency=1, latency={"human_interaction": 0})
+        report = sim.run(count=3, workers=1)
+        self.assertEqual(report.makespan, 6)
+        self.assertEqual(sorted(report.queue_delays), [0, 2, 4])
+        self.assertAlmostEqual(report.resources[WORKER].utilisation, 1.0)
+
+    def test_while_element_loops_run_the_configured_iterations(self):
+        model = ProcessModel(name="pages", steps=[
+            StepModel(id="pages", type="loop", loop=LoopModel(type="while_element", condition="#next", steps=[
+                StepModel(id="scrape", type="operation_executor"),
+            ])),
+            StepModel(id="done", type="data_entry"),
+        ])
+        demands, ok = Simulator(model, iterations={"#next": 3}).trace()
+        self.assertTrue(ok)
+        self.assertEqual([d.step_id for d in demands], ["scrape"] * 3 + ["done"])
+
+        demands, ok = Simulator(model).trace()
+        self.assertTrue(ok)
+        self.assertEqual([d.step_id for d in demands], ["scrape", "done"])
+
+        sim = Simulator(model, iterations={"#next": [0, 2]}, seed=1)
+        counts = {len(sim.trace()[0]) - 1 for _ in range(20)}
+        self.assertEqual(counts, {0, 2})
+
+    def test_latency_specs(self):
+        self.assertEqual(Latency.parse({"uniform": [1, 1]}).sample(Simulator(process()).rng), 1)
+        self.assertEqual(Latency.parse(3).kind, "fixed")
+        with self.assertRaises(ValueError):
+            Latency.parse({"bogus": 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from synthflow.core.audit_writer import AuditWriter
+from synthflow.core.state_tracker import StateTracker
+
+
+class DeltaSnapshotTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp.name, "audit.db")
+        self.writer = AuditWriter(self.db_path, durability="batch")
+        self.tracker = StateTracker(db_path=self.db_path, audit_writer=self.writer, keyframe_interval=4)
+
+    def tearDown(self):
+        self.writer.close()
+        self.tmp.cleanup()
+
+    def rows(self):
+        with sqlite3.connect(self.db_path) as conn:
+            return conn.execute("SELECT id, snapshot_kind, context_snapshot FROM audit_log ORDER BY id").fetchall()
+
+    def test_rows_hold_only_changed_keys_between_keyframes(self):
+        self.tracker.set_context("big", "x" * 1000)
+        for i in range(6):
+            self.tracker.set_context("i", i)
+            self.tracker.snapshot(f"s{i}", "completed")
+        self.tracker.flush()
+
+        rows = self.rows()
+        self.assertEqual([kind for _, kind, _ in rows], ["full", "delta", "delta", "delta", "full", "delta"])
+        self.assertEqual(rows[1][2], '{"i": 1}')
+
+        # Any event can be rebuilt, whether it is a keyframe or a delta
+        self.assertEqual(self.tracker.reconstruct_context(rows[2][0]), {"big": "x" * 1000, "i": 2})
+        self.assertEqual(self.tracker.reconstruct_context()["i"], 5)
+
+    def test_deleted_keys_stay_deleted_until_the_next_keyframe(self):
+        self.tracker.set_context("page", {"text": "x"})
+        self.tracker.set_context("keep", 1)
+        self.tracker.snapshot("open", "completed")
+        self.tracker.delete_context("page")
+        self.tracker.snapshot("release", "completed")
+        self.tracker.set_context("keep", 2)
+        self.tracker.snapshot("next", "completed")
+        self.tracker.flush()
+
+        rows = self.rows()
+        self.assertEqual([kind for _, kind, _ in rows], ["full", "delta", "delta"])
+        self.assertEqual(rows[1][2], '{"__deleted__": ["page"]}')
+        self.assertEqual(self.tracker.reconstruct_context(rows[0][0]), {"page": {"text": "x"}, "keep": 1})
+        self.assertEqual(self.tracker.reconstruct_context(rows[1][0]), {"keep": 1})
+        self.assertEqual(self.tracker.reconstruct_context(), {"keep": 2})
+
+    def test_restore_forces_a_keyframe(self):
+        self.tracker.set_context("a", 1)
+        self.tracker.snapshot(None, "started")
+        self.tracker.restore_context({"b": 2})
+        self.tracker.snapshot(None, "resumed")
+        self.tracker.flush()
+
+        self.assertEqual([kind for _, kind, _ in self.rows()], ["full", "full"])
+        self.assertEqual(self.tracker.reconstruct_context(), {"b": 2})
+
+
+class BoundedTimelineTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp.name, "audit.db")
+        self.writer = AuditWriter(self.db_path, durability="batch")
+
+    def tearDown(self):
+        self.writer.close()
+        self.tmp.cleanup()
+
+    def test_memory_keeps_only_the_latest_events(self):
+        tracker = StateTracker(db_path=self.db_path, audit_writer=self.writer, timeline_size=5)
+        for i in range(12):
+            tracker.snapshot(f"s{i}", "completed", {"i": i})
+
+        self.assertEqual(len(tracker.get_timeline().events), 5)
+        self.assertEqual([e.step_id for e in tracker.recent_events(2)], ["s10", "s11"])
+        self.assertEqual(tracker.get_current_state().details, {"i": 11})
+
+        # Evicted events are still in the audit store
+        full = tracker.get_timeline(full=True).events
+        self.assertEqual([e.step_id for e in full], [f"s{i}" for i in range(12)])
+
+    def test_memory_only_tracker(self):
+        tracker = StateTracker(db_path=None, timeline_size=3)
+        for i in range(4):
+            tracker.snapshot(f"s{i}", "completed")
+        self.assertEqual([e.step_id for e in tracker.get_timeline(full=True).events], ["s1", "s2", "s3"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+import os
+import sys
+import unittest
+
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from synthflow.core.template import compile_template, compile_value, MISSING
+
+
+class TemplateTests(unittest.TestCase):
+    def setUp(self):
+        self.context = {
+            "id": 7,
+            "total": 10,
+            "step_x.output": {"items": [{"name": "first"}, {"name": "second"}]},
+            "user": {"profile": {"city": "Paris"}},
+        }
+
+    def lookup(self, key):
+        return self.context.get(key)
+
+    def test_single_expression_returns_raw_value(self):
+        self.assertEqual(compile_template("${total}").render(self.lookup), 10)
+        self.assertEqual(compile_template("${step_x.output}").render(self.lookup)["items"][0]["name"], "first")
+
+    def test_deep_dotted_and_indexed_paths(self):
+        self.assertEqual(compile_template("${step_x.output.items[1].name}").render(self.lookup), "second")
+        self.assertEqual(compile_template("${step_x.output.items.0.name}").render(self.lookup), "first")
+        self.assertEqual(compile_template("${user.profile.city}").render(self.lookup), "Paris")
+
+    def test_interpolation(self):
+        self.assertEqual(compile_template("Task ${id} of ${total}").render(self.lookup), "Task 7 of 10")
+
+    def test_defaults_and_missing_values(self):
+        self.assertEqual(compile_template("${missing|3}").render(self.lookup), 3)
+        self.assertEqual(compile_template("${missing|'n/a'}").render(self.lookup), "n/a")
+        self.assertEqual(compile_template("${missing}").render(self.lookup), "${missing}")
+        self.assertIsNone(compile_template("${missing}").render(self.lookup, keep_unresolved=False))
+        self.assertEqual(compile_template("a ${missing} b").render(self.lookup), "a ${missing} b")
+
+    def test_templates_are_cached(self):
+        self.assertIs(compile_template("Task ${id}"), compile_template("Task ${id}"))
+
+    def test_value_template_builds_fresh_containers(self):
+        template = compile_value({"data": {"id": "${id}", "tags": ["${total}", "x"]}})
+        first = template.render(self.lookup)
+        first["data"]["tags"].append("mutated")
+        self.assertEqual(template.render(self.lookup), {"data": {"id": 7, "tags": [10, "x"]}})
+        self.assertEqual(template.refs, ("id", "total"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,8 +3,21 @@ import sys
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "src"))
 
-from synthflow.web.app import app
+from synthflow.core.audit_retention import AuditArchiver, RetentionPolicy, RetentionWorker
+from synthflow.web.app import app, AUDIT_DB_PATH
+
+
+def start_retention():
+    """Archive old audit traces in the background when SYNTHFLOW_RETENTION_DAYS / _TRACES is set"""
+    days = os.environ.get("SYNTHFLOW_RETENTION_DAYS")
+    traces = os.environ.get("SYNTHFLOW_RETENTION_TRACES")
+    if not days and not traces:
+        return
+    policy = RetentionPolicy(max_age_days=float(days) if days else None,
+                             max_traces=int(traces) if traces else None)
+    RetentionWorker(AuditArchiver(AUDIT_DB_PATH), policy).start()
 
 
 if __name__ == "__main__":
+    start_retention()
     app.run(host="0.0.0.0", port=8000)